@@ -0,0 +1,30 @@
+"""
+Move closed projects older than N days (and their assignments) to the archive.
+
+    python archive_projects.py                    # ARCHIVE_AFTER_DAYS (default 180)
+    python archive_projects.py --days 365 --batch-size 50
+
+Uses MONGO_URL / DB_NAME from the environment (.env), like the server;
+--tenant NAME runs against that tenant's database (TENANTS). Meant
+to be run periodically (cron); admins can also trigger POST /api/projects/archive.
+"""
+import argparse
+import asyncio
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lezárt projektek archiválása")
+    parser.add_argument("--days", type=int, default=server.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=server.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    report = asyncio.run(server.archive_closed_projects(args.days, args.batch_size))
+    print(f"Archivált projektek: {report['projects']}  hozzárendelések: {report['assignments']}")
+
+
+if __name__ == "__main__":
+    main()
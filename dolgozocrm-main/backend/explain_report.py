@@ -0,0 +1,51 @@
+"""
+Explain report for the canonical query shapes the backend issues.
+
+    python explain_report.py          # table
+    python explain_report.py --json   # raw report
+
+Uses MONGO_URL / DB_NAME from the environment (.env), like the server;
+--tenant NAME runs against that tenant's database (TENANTS).
+The same data is available to admins at GET /api/diagnostics/queries.
+"""
+import argparse
+import asyncio
+import json
+
+import server
+
+
+def format_table(report) -> str:
+    lines = [f"{'Shape':<28} {'Collection':<16} {'Plan':<34} {'examined':>9} {'returned':>9} {'ms':>6}"]
+    for entry in report:
+        if "error" in entry:
+            lines.append(f"{entry['name']:<28} {entry['collection']:<16} HIBA: {entry['error']}")
+            continue
+        plan = " > ".join(entry["stages"])
+        if entry["indexes"]:
+            plan += f" [{', '.join(entry['indexes'])}]"
+        lines.append(
+            f"{entry['name']:<28} {entry['collection']:<16} {plan:<34} "
+            f"{entry['docs_examined']!s:>9} {entry['n_returned']!s:>9} {entry['execution_ms']!s:>6}"
+        )
+        if entry.get("suggested_index"):
+            lines.append(f"{'':<28} -> javasolt index: {entry['suggested_index']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lekérdezés-formák explain riportja")
+    parser.add_argument("--json", action="store_true", help="print the raw JSON report")
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    report = asyncio.run(server.explain_query_shapes())
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(format_table(report))
+
+
+if __name__ == "__main__":
+    main()
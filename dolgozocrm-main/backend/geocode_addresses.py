@@ -0,0 +1,32 @@
+"""
+Backfill offline geocoding (settlement centre points) for workers and projects.
+
+    python geocode_addresses.py              # only documents never geocoded
+    python geocode_addresses.py --refresh    # recompute all (e.g. new gazetteer)
+
+Uses MONGO_URL / DB_NAME from the environment (.env), like the server;
+--tenant NAME runs against that tenant's database (TENANTS). The gazetteer is
+data/hu_settlements.csv or GAZETTEER_PATH.
+"""
+import argparse
+import asyncio
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Címek geokódolása a település-jegyzék alapján")
+    parser.add_argument("--batch-size", type=int, default=server.GEOCODE_BATCH_SIZE)
+    parser.add_argument("--refresh", action="store_true", help="recompute already geocoded documents too")
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    report = asyncio.run(server.geocode_missing(args.batch_size, args.refresh))
+    print(f"{'Collection':<18} {'scanned':>9} {'located':>9}")
+    for collection, stats in report.items():
+        print(f"{collection:<18} {stats['scanned']:>9} {stats['located']:>9}")
+
+
+if __name__ == "__main__":
+    main()
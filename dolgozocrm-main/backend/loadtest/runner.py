@@ -0,0 +1,214 @@
+"""
+Async load generator for a running Dolgozó CRM backend.
+
+    python -m loadtest --base-url http://localhost:8001 --recruiters 30 --duration 120
+
+Recruiter and admin virtual users run the scenarios in scenarios.py
+concurrently. Every request is recorded under its route template
+(e.g. "PUT /api/projects/{id}/workers/{id}/status"), and the report contains
+throughput, error rate and latency percentiles per route.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from loadtest import scenarios
+
+ADMIN_EMAIL = "admin@dolgozocrm.hu"
+ADMIN_PASSWORD = "admin123"
+RECRUITER_PASSWORD = "terheles123"
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile (also used by the in-process benchmarks)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.errors = 0
+        self.status_codes = Counter()
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+
+class LoadStats:
+    def __init__(self):
+        self.routes = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, route: str, elapsed_ms: float, status_code: int, ok: bool):
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies_ms.append(elapsed_ms)
+        stats.status_codes[status_code] += 1
+        if not ok:
+            stats.errors += 1
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        total_requests = total_errors = 0
+        for route, s in sorted(self.routes.items()):
+            total_requests += s.count
+            total_errors += s.errors
+            routes[route] = {
+                "requests": s.count,
+                "throughput_rps": round(s.count / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(s.errors / s.count, 4) if s.count else 0.0,
+                "p50_ms": round(percentile(s.latencies_ms, 50), 1),
+                "p95_ms": round(percentile(s.latencies_ms, 95), 1),
+                "p99_ms": round(percentile(s.latencies_ms, 99), 1),
+                "max_ms": round(max(s.latencies_ms), 1) if s.latencies_ms else 0.0,
+                "status_codes": dict(s.status_codes),
+            }
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "routes": routes,
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Időtartam: {report['duration_s']}s  Kérések: {report['requests']}  "
+        f"Áteresztés: {report['throughput_rps']} req/s  Hibaarány: {report['error_rate']:.2%}",
+        "",
+        f"{'Route':<52} {'req':>6} {'rps':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}",
+    ]
+    for route, r in report["routes"].items():
+        lines.append(
+            f"{route:<52} {r['requests']:>6} {r['throughput_rps']:>7} {r['error_rate']:>6.1%} "
+            f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}"
+        )
+    return "\n".join(lines)
+
+
+class ApiSession:
+    """One virtual user: an authenticated client that records every request"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: LoadStats):
+        self.client = client
+        self.stats = stats
+        self.token = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def request(self, method: str, route: str, path: str = None, expected=(200,), **kwargs):
+        """`route` is the template used for grouping, `path` the concrete URL"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path or route, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(f"{method} {route}", (time.perf_counter() - start) * 1000, 0, False)
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        ok = response.status_code in expected
+        self.stats.record(f"{method} {route}", elapsed_ms, response.status_code, ok)
+        return response
+
+    async def login(self, email: str, password: str) -> bool:
+        response = await self.request("POST", "/api/auth/login", json={"email": email, "password": password})
+        if response is None or response.status_code != 200:
+            return False
+        self.token = response.json()["token"]
+        return True
+
+
+async def prepare(client: httpx.AsyncClient, recruiters: int) -> dict:
+    """Create the load-test recruiters and project through the public API (idempotent)"""
+    setup = ApiSession(client, LoadStats())
+    if not await setup.login(ADMIN_EMAIL, ADMIN_PASSWORD):
+        await client.post("/api/seed")
+        if not await setup.login(ADMIN_EMAIL, ADMIN_PASSWORD):
+            raise RuntimeError("Admin bejelentkezés sikertelen")
+
+    emails = [f"terheles{i}@dolgozocrm.hu" for i in range(recruiters)]
+    for i, email in enumerate(emails):
+        # 400 = already registered by a previous run
+        await setup.request("POST", "/api/auth/register", expected=(200, 400), json={
+            "email": email, "password": RECRUITER_PASSWORD, "name": f"Terhelés {i}", "role": "user",
+        })
+    users = (await setup.request("GET", "/api/users")).json()
+    recruiter_ids = [u["id"] for u in users if u["email"] in emails]
+
+    project = (await setup.request("POST", "/api/projects", json={
+        "name": f"Terhelési teszt {time.strftime('%Y-%m-%d %H:%M')}",
+        "date": time.strftime("%Y-%m-%d"),
+        "location": "Budapest",
+        "expected_workers": recruiters * 10,
+        "recruiter_ids": recruiter_ids,
+    })).json()
+    worker_types = (await setup.request("GET", "/api/worker-types")).json()
+    statuses = (await setup.request("GET", "/api/statuses")).json()
+    return {
+        "recruiter_emails": emails,
+        "project_id": project["id"],
+        "worker_type_ids": [t["id"] for t in worker_types],
+        "status_ids": [s["id"] for s in statuses],
+    }
+
+
+async def run_load(client: httpx.AsyncClient, recruiters: int, admins: int, duration: float,
+                   think_time: float = 1.0, seed: int = None) -> dict:
+    stats = LoadStats()
+    context = await prepare(client, recruiters)
+    context["think_time"] = think_time
+    deadline = time.perf_counter() + duration
+    rng = random.Random(seed)
+
+    users = []
+    for email in context["recruiter_emails"]:
+        session = ApiSession(client, stats)
+        users.append(scenarios.recruiter_session(
+            session, context, email, RECRUITER_PASSWORD, deadline, random.Random(rng.random())))
+    for _ in range(admins):
+        session = ApiSession(client, stats)
+        users.append(scenarios.admin_session(
+            session, context, ADMIN_EMAIL, ADMIN_PASSWORD, deadline, random.Random(rng.random())))
+
+    stats.started = time.perf_counter()
+    await asyncio.gather(*users)
+    stats.finished = time.perf_counter()
+    return stats.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dolgozó CRM terheléses teszt")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--recruiters", type=int, default=30)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between actions (s)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    async def _run():
+        limits = httpx.Limits(max_connections=args.recruiters + args.admins + 5)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits) as client:
+            return await run_load(client, args.recruiters, args.admins, args.duration,
+                                  args.think_time, args.seed)
+
+    report = asyncio.run(_run())
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,96 @@
+"""
+Virtual-user scripts modelled on Monday-morning traffic.
+
+Recruiters log in once, then keep listing and searching their workers,
+registering new candidates, adding them to the shared project and flipping
+their statuses. Admins repeatedly export everything and look at the stats.
+"""
+import asyncio
+import time
+
+SEARCH_TERMS = ["Kovács", "Nagy", "Szabó", "targonca", "Győr", "3620", "hegesztő"]
+CATEGORIES = ["Felvitt dolgozók", "Hideg jelentkező", "Ingázó", "Szállásos"]
+
+# (action, weight)
+RECRUITER_MIX = [
+    ("list_workers", 35),
+    ("search_workers", 20),
+    ("view_worker", 10),
+    ("create_worker", 10),
+    ("add_to_project", 10),
+    ("flip_status", 10),
+    ("view_project", 5),
+]
+
+
+async def _think(rng, context):
+    mean = context.get("think_time", 1.0)
+    if mean > 0:
+        await asyncio.sleep(rng.expovariate(1 / mean))
+
+
+async def recruiter_session(session, context, email, password, deadline, rng):
+    if not await session.login(email, password):
+        return
+    project_id = context["project_id"]
+    my_workers = []
+    assigned = []
+    actions, weights = zip(*RECRUITER_MIX)
+
+    while time.perf_counter() < deadline:
+        action = rng.choices(actions, weights)[0]
+
+        if action == "list_workers":
+            res = await session.request("GET", "/api/workers")
+            if res is not None and res.status_code == 200:
+                my_workers = [w["id"] for w in res.json()]
+
+        elif action == "search_workers":
+            await session.request("GET", "/api/workers", params={"search": rng.choice(SEARCH_TERMS)})
+
+        elif action == "view_worker" and my_workers:
+            worker_id = rng.choice(my_workers)
+            await session.request("GET", "/api/workers/{id}", f"/api/workers/{worker_id}")
+
+        elif action == "create_worker" or (action == "add_to_project" and not my_workers):
+            res = await session.request("POST", "/api/workers", json={
+                "name": f"Terhelés Jelölt {rng.randrange(10**6)}",
+                "phone": f"+3620{rng.randrange(10**7):07d}",
+                "worker_type_id": rng.choice(context["worker_type_ids"]),
+                "category": rng.choice(CATEGORIES),
+            })
+            if res is not None and res.status_code == 200:
+                my_workers.append(res.json()["id"])
+
+        elif action == "add_to_project":
+            candidates = [w for w in my_workers if w not in assigned]
+            if candidates:
+                worker_id = rng.choice(candidates)
+                res = await session.request(
+                    "POST", "/api/projects/{id}/workers", f"/api/projects/{project_id}/workers",
+                    json={"worker_id": worker_id}, expected=(200, 400, 409))
+                # 409: booked on another project that day
+                if res is not None and res.status_code in (200, 400):
+                    assigned.append(worker_id)
+
+        elif action == "flip_status" and assigned and context["status_ids"]:
+            worker_id = rng.choice(assigned)
+            await session.request(
+                "PUT", "/api/projects/{id}/workers/{id}/status",
+                f"/api/projects/{project_id}/workers/{worker_id}/status",
+                json={"status_id": rng.choice(context["status_ids"])})
+
+        elif action == "view_project":
+            await session.request("GET", "/api/projects/{id}", f"/api/projects/{project_id}")
+
+        await _think(rng, context)
+
+
+async def admin_session(session, context, email, password, deadline, rng):
+    if not await session.login(email, password):
+        return
+    while time.perf_counter() < deadline:
+        await session.request("GET", "/api/export/all")
+        await session.request("GET", "/api/users/stats")
+        await session.request("GET", "/api/projects")
+        await _think(rng, {"think_time": context.get("think_time", 1.0) * 5})
@@ -0,0 +1,31 @@
+"""
+One-off migration: ISO-string timestamps -> BSON datetimes.
+
+    python migrate_datetimes.py                  # default batch size
+    python migrate_datetimes.py --batch-size 200
+
+Uses MONGO_URL / DB_NAME from the environment (.env), like the server;
+--tenant NAME runs against that tenant's database (TENANTS). Safe
+to re-run: documents that are already converted are not selected again.
+"""
+import argparse
+import asyncio
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Időbélyegek átalakítása BSON dátummá")
+    parser.add_argument("--batch-size", type=int, default=server.MIGRATION_BATCH_SIZE)
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    report = asyncio.run(server.migrate_timestamps(args.batch_size))
+    print(f"{'Collection':<18} {'scanned':>9} {'updated':>9} {'skipped':>9}")
+    for collection, stats in report.items():
+        print(f"{collection:<18} {stats['scanned']:>9} {stats['updated']:>9} {stats['skipped']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Recompute the worker availability index (worker_bookings) from the projects
+and their assignments.
+
+    python rebuild_bookings.py
+
+Run once after upgrading (existing assignments have no bookings yet) or to
+repair drift. Workers already assigned to two projects on the same day are
+listed; both assignments stay, but only one of them holds the booking. Uses
+MONGO_URL / DB_NAME from the environment (.env), like the server; --tenant NAME
+runs against that tenant's database (TENANTS). Run it in a quiet period.
+"""
+import argparse
+import asyncio
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dolgozói foglaltság (worker_bookings) újraépítése")
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    async def run():
+        await server.ensure_indexes()
+        return await server.rebuild_worker_bookings()
+
+    report = asyncio.run(run())
+    print(f"Foglalások: {report['bookings']}")
+    for c in report["conflicts"]:
+        print(f"Ütközés: dolgozó {c['worker_id']} – projekt {c['project_id']} ({c['date']})")
+
+
+if __name__ == "__main__":
+    main()
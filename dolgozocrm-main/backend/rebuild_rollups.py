@@ -0,0 +1,30 @@
+"""
+Recompute the recruiter leaderboard rollups from the workers and the
+status-transition log.
+
+    python rebuild_rollups.py
+
+Run once after upgrading (existing workers are not in the rollups yet) or to
+repair drift. Uses MONGO_URL / DB_NAME from the environment (.env), like the
+server; --tenant NAME runs against that tenant's database (TENANTS). Documents
+are replaced one by one, but counter increments made while it runs may be
+overwritten, so run it in a quiet period.
+"""
+import argparse
+import asyncio
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toborzói összesítők újraszámolása")
+    parser.add_argument("--tenant", default=server.DEFAULT_TENANT, choices=sorted(server.TENANTS))
+    args = parser.parse_args()
+    server.use_tenant(args.tenant)
+
+    count = asyncio.run(server.rebuild_recruiter_rollups())
+    print(f"Összesítő dokumentumok: {count}")
+
+
+if __name__ == "__main__":
+    main()
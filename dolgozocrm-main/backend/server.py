@@ -1,21 +1,41 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, CursorType, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 import os
 import logging
+import threading
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from collections import OrderedDict, deque
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+import re
+import csv
+import unicodedata
 import uuid
+import hashlib
+import base64
+import json
 from datetime import datetime, timezone, timedelta
 import jwt
 from passlib.context import CryptContext
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 import io
+try:
+    import numpy as np
+except ImportError:  # the worker index is optional
+    np = None
+from urllib.parse import urlparse
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -24,10 +44,343 @@ load_dotenv(ROOT_DIR / '.env')
 EXPORTS_DIR = ROOT_DIR / "exports"
 EXPORTS_DIR.mkdir(exist_ok=True)
 
+# ==================== DB INSTRUMENTATION ====================
+
+# Requests above these budgets are logged with their DB command profile
+DB_QUERY_BUDGET = int(os.environ.get('DB_QUERY_BUDGET', '50'))
+DB_TIME_BUDGET_MS = float(os.environ.get('DB_TIME_BUDGET_MS', '250'))
+
+# Individual commands slower than this are logged and kept for /api/diagnostics/queries
+SLOW_COMMAND_MS = float(os.environ.get('SLOW_COMMAND_MS', '100'))
+SLOW_COMMANDS = deque(maxlen=200)
+
+class RequestDbStats:
+    """Mongo commands issued while serving one HTTP request"""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.commands = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_command = ""
+        self._lock = threading.Lock()
+
+    def command_finished(self, label: str, duration_ms: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.total_ms += duration_ms
+            if duration_ms >= self.slowest_ms:
+                self.slowest_ms = duration_ms
+                self.slowest_command = label
+
+# Motor copies the caller's context into its executor threads, so the listener
+# sees the stats object of the request that issued the command.
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+SHAPE_FIELDS = ("filter", "sort", "pipeline", "query", "q", "updates", "deletes")
+
+def _query_shape(value):
+    """Replace literal values with "?" so commands group by shape, not by data"""
+    if isinstance(value, dict):
+        return {k: _query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_query_shape(v) for v in value]
+    return "?"
+
+class DbCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        label = f"{event.command_name} {target}" if isinstance(target, str) else event.command_name
+        shape = {k: _query_shape(event.command[k]) for k in SHAPE_FIELDS if k in event.command}
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (label, shape)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        with self._lock:
+            label, shape = self._pending.pop((event.connection_id, event.request_id), (event.command_name, {}))
+        duration_ms = event.duration_micros / 1000
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.command_finished(label, duration_ms)
+        if duration_ms >= SLOW_COMMAND_MS:
+            path = stats.path if stats is not None else ""
+            SLOW_COMMANDS.append({
+                "at": datetime.now(timezone.utc).isoformat(),
+                "command": label,
+                "duration_ms": round(duration_ms, 1),
+                "shape": shape,
+                "path": path
+            })
+            logging.getLogger(__name__).warning(
+                "Slow Mongo command: %s %.1f ms (%s) shape=%s", label, duration_ms, path or "-", shape
+            )
+
+# ==================== METRICS ====================
+
+# Prometheus text exposition, per process (scrape every uvicorn worker)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + "}"
+
+class MetricCounter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class MetricGauge(MetricCounter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class MetricHistogram(MetricCounter):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()]
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, c in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", {**labels, "le": repr(float(bound))}, c
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+METRICS = []
+
+def register_metric(metric):
+    METRICS.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+HTTP_REQUEST_DURATION = register_metric(MetricHistogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+HTTP_REQUESTS = register_metric(MetricCounter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")))
+HTTP_IN_FLIGHT = register_metric(MetricGauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+DB_COMMANDS_PER_REQUEST = register_metric(MetricHistogram(
+    "db_commands_per_request", "Mongo commands issued per HTTP request", ("route",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)))
+MONGO_POOL_CONNECTIONS = register_metric(MetricGauge(
+    "mongo_pool_connections", "Open connections in the Mongo pool", ("address",)))
+MONGO_POOL_CHECKED_OUT = register_metric(MetricGauge(
+    "mongo_pool_checked_out", "Mongo connections currently checked out", ("address",)))
+MONGO_POOL_MAX_SIZE = register_metric(MetricGauge(
+    "mongo_pool_max_size", "Configured maxPoolSize of the Mongo client"))
+MONGO_POOL_CHECKOUT_FAILED = register_metric(MetricCounter(
+    "mongo_pool_checkout_failed_total", "Failed Mongo connection checkouts", ("address", "reason")))
+EXPORT_DURATION = register_metric(MetricHistogram(
+    "export_duration_seconds", "Excel export generation time", ("kind",)))
+PASSWORD_HASH_DURATION = register_metric(MetricHistogram(
+    "password_hash_seconds", "bcrypt hash/verify time", ("operation",)))
+CACHE_LOOKUPS = register_metric(MetricCounter(
+    "cache_lookups_total", "In-process cache lookups by cache and result (hit/miss)", ("cache", "result")))
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    # Pool lifecycle events we don't track (the base class requires them)
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=f"{event.address[0]}:{event.address[1]}")
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=f"{event.address[0]}:{event.address[1]}")
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILED.inc(address=f"{event.address[0]}:{event.address[1]}", reason=event.reason)
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKED_OUT.inc(address=f"{event.address[0]}:{event.address[1]}")
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec(address=f"{event.address[0]}:{event.address[1]}")
+
+# ==================== READ ROUTING ====================
+
+# Query classes: "interactive" reads (lists, detail pages, everything after a
+# write) use the client default and stay on the primary; "reporting" reads
+# (exports, stats, leaderboard, analytics) scan a lot and tolerate some lag, so
+# they can go to secondaries / analytics-tagged nodes with bounded staleness.
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def parse_read_tags(spec: str) -> Optional[List[dict]]:
+    """"nodeType:ANALYTICS,region:eu" -> that tag set, then any member ({}) as fallback"""
+    if not spec.strip():
+        return None
+    tags = dict(pair.split(":", 1) for pair in spec.split(",") if ":" in pair)
+    return [{k.strip(): v.strip() for k, v in tags.items()}, {}]
+
+def build_read_preference(mode: str, max_staleness: int = -1, tags: str = ""):
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == "primary":
+        return Primary()
+    # The server rejects maxStalenessSeconds below 90; -1 means no bound
+    return READ_PREFERENCE_MODES[mode](tag_sets=parse_read_tags(tags), max_staleness=max_staleness)
+
+READ_PREFERENCES = {
+    "interactive": build_read_preference(os.environ.get("INTERACTIVE_READ_PREFERENCE", "primary")),
+    "reporting": build_read_preference(
+        os.environ.get("REPORTING_READ_PREFERENCE", "primary"),
+        int(os.environ.get("REPORTING_MAX_STALENESS_SECONDS", "120")),
+        os.environ.get("REPORTING_READ_TAGS", ""),
+    ),
+}
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, read_preference=READ_PREFERENCES["interactive"],
+                            event_listeners=[DbCommandListener(), PoolMetricsListener()])
+
+# ==================== TENANTS ====================
+
+# One deployment can serve several agencies, each in its own database on the
+# shared Motor client (one connection pool per process). TENANTS maps tenant
+# names to databases ("acme:crm_acme,beta:crm_beta"); requests are routed by
+# the token's "tenant" claim or the first label of the Host header
+# (acme.crm.example.hu). Without TENANTS everything runs in DB_NAME.
+DEFAULT_TENANT = "default"
+TENANTS = {DEFAULT_TENANT: os.environ['DB_NAME']}
+for _entry in filter(None, (e.strip() for e in os.environ.get("TENANTS", "").split(","))):
+    _name, _, _db_name = _entry.partition(":")
+    TENANTS[_name.strip().lower()] = _db_name.strip() or f"dolgozocrm_{_name.strip().lower()}"
+
+_current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+def current_tenant() -> str:
+    return _current_tenant.get()
+
+def use_tenant(tenant: str):
+    """Switch the current context to `tenant` (CLI scripts); returns the reset token"""
+    if tenant not in TENANTS:
+        raise ValueError(f"Ismeretlen ügynökség: {tenant}")
+    return _current_tenant.set(tenant)
+
+class TenantDatabase:
+    """Stands in for a Motor database: collection access resolves against the
+    current tenant's database. All tenants share the Motor client."""
+
+    def __init__(self, motor_client):
+        self._client = motor_client
+        self._databases = {}
+
+    def for_tenant(self, tenant: str):
+        database = self._databases.get(tenant)
+        if database is None:
+            database = self._databases[tenant] = self._client[TENANTS[tenant]]
+        return database
+
+    def __getattr__(self, name):
+        return getattr(self.for_tenant(current_tenant()), name)
+
+    def __getitem__(self, name):
+        return self.for_tenant(current_tenant())[name]
+
+db = TenantDatabase(client)
+
+def control_db():
+    """Database for cross-tenant infrastructure (event bus): the default tenant's"""
+    return db.for_tenant(DEFAULT_TENANT) if isinstance(db, TenantDatabase) else db
+
+def reporting_collection(name: str):
+    """Collection handle for reporting-class reads (see READ_PREFERENCES)"""
+    return db.get_collection(name, read_preference=READ_PREFERENCES["reporting"])
+
+def tenant_from_host(host: str) -> Optional[str]:
+    label = (host or "").split(":")[0].split(".")[0].lower()
+    return label if label in TENANTS and label != DEFAULT_TENANT else None
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'dolgozocrm-secret-key-2024')
@@ -39,6 +392,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 app = FastAPI(title="Dolgozó CRM API")
 api_router = APIRouter(prefix="/api")
@@ -141,9 +495,12 @@ class WorkerResponse(BaseModel):
     notes: str
     tags: List[dict] = []
     project_statuses: List[dict] = []
+    project_count: int = 0
     owner_id: str
     owner_name: str
     created_at: str
+    updated_at: str = ""
+    version: int = 0
 
 class ProjectCreate(BaseModel):
     name: str
@@ -176,11 +533,18 @@ class ProjectResponse(BaseModel):
     owner_id: str = ""
     owner_name: str = ""
     created_at: str
+    updated_at: str = ""
+    version: int = 0
+    is_archived: bool = False
 
 class ProjectWorkerAdd(BaseModel):
     worker_id: str
     status_id: Optional[str] = None
 
+class ProjectWorkersBulkAdd(BaseModel):
+    worker_ids: List[str]
+    status_id: Optional[str] = None
+
 class ProjectRecruiterAdd(BaseModel):
     user_id: str
 
@@ -196,27 +560,118 @@ class WorkerHistoryEntry(BaseModel):
     status_name: str
     notes: str
     updated_at: str
+    is_archived: bool = False
+
+class WorkerHistoryPage(BaseModel):
+    items: List[WorkerHistoryEntry]
+    next_cursor: Optional[str] = None
+    problem_count: Optional[int] = None  # first page only: problem statuses over the whole history, archive included
+
+class NearbyWorkerResponse(WorkerResponse):
+    distance_km: float
+    geo_place: str = ""
+
+class CandidateResponse(WorkerResponse):
+    score: float
+    score_breakdown: Dict[str, float]
+
+class SavedSearchCreate(BaseModel):
+    name: str
+    category: Optional[str] = ""
+    worker_type_id: Optional[str] = ""
+    tag_ids: List[str] = []  # mindegyik jellemző kell
+    position: Optional[str] = ""  # részszöveg, kis/nagybetű nem számít
+    owner_id: Optional[str] = ""  # admin: csak ennek a toborzónak a dolgozói
+
+class SavedSearchResponse(BaseModel):
+    id: str
+    name: str
+    category: str = ""
+    worker_type_id: str = ""
+    tag_ids: List[str] = []
+    position: str = ""
+    owner_id: str = ""
+    worker_count: int = 0
+    created_at: str
+    updated_at: str
 
 # ==================== HELPER FUNCTIONS ====================
 
+# Timestamps are stored as BSON datetimes (UTC) and serialized as ISO 8601
+# strings, exactly as before the migration. Documents not migrated yet may
+# still hold the old ISO strings, which pass through unchanged.
+def to_iso(value) -> str:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return value or ""
+
+def to_date_str(value) -> str:
+    """Project dates are calendar days: serialized as YYYY-MM-DD"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value or ""
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in ("%Y.%m.%d", "%Y. %m. %d.", "%Y/%m/%d"):
+            try:
+                parsed = datetime.strptime(value.strip(), fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def parse_project_date(value: str) -> datetime:
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Érvénytelen dátum (formátum: ÉÉÉÉ-HH-NN)")
+    return parsed.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def serialize_dates(doc: dict) -> dict:
+    """Copy of a worker/project document with response-ready date strings"""
+    out = dict(doc)
+    for field in ("created_at", "updated_at"):
+        if field in out:
+            out[field] = to_iso(out[field])
+    if "date" in out:
+        out["date"] = to_date_str(out["date"])
+    return out
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, operation="hash")
+    return hashed
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    start = time.perf_counter()
+    ok = pwd_context.verify(plain, hashed)
+    PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, operation="verify")
+    return ok
 
 def create_token(user_id: str, email: str, role: str) -> str:
     payload = {
         "user_id": user_id,
         "email": email,
         "role": role,
+        "tenant": current_tenant(),
         "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def user_from_token(token: str) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
         if not user:
             raise HTTPException(status_code=401, detail="Felhasználó nem található")
@@ -226,11 +681,598 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Érvénytelen token")
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await user_from_token(credentials.credentials)
+
+async def get_stream_user(token: Optional[str] = None,
+                          credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Az EventSource nem tud fejlécet küldeni, ezért a token query paraméterben is jöhet"""
+    if credentials:
+        return await user_from_token(credentials.credentials)
+    if token:
+        return await user_from_token(token)
+    raise HTTPException(status_code=401, detail="Not authenticated")
+
 async def require_admin(user: dict = Depends(get_current_user)):
     if user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Csak admin jogosultsággal")
     return user
 
+# ==================== REQUEST LOADERS ====================
+
+class BatchLoader:
+    """DataLoader-style lookup by `id`: every load() issued in the same event-loop
+    tick is collapsed into a single `$in` query, and results are memoized for the
+    rest of the request."""
+
+    def __init__(self, collection: str, projection: Optional[dict] = None):
+        self.collection = collection
+        self.projection = projection or {"_id": 0}
+        self._futures = {}
+        self._queue = []
+        self._scheduled = False
+
+    async def load(self, key: Optional[str]) -> Optional[dict]:
+        if not key:
+            return None
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys) -> List[Optional[dict]]:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def prime(self, doc: dict) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(doc)
+        self._futures[doc["id"]] = future
+
+    def clear(self, key: str) -> None:
+        self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        keys, self._queue, self._scheduled = self._queue, [], False
+        asyncio.ensure_future(self._fetch(keys))
+
+    async def _fetch(self, keys: List[str]) -> None:
+        try:
+            docs = await db[self.collection].find({"id": {"$in": keys}}, self.projection).to_list(None)
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        by_id = {d["id"]: d for d in docs}
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(by_id.get(key))
+
+class RequestLoaders:
+    def __init__(self):
+        self.users = BatchLoader("users", {"_id": 0, "password": 0})
+        self.workers = BatchLoader("workers")
+        self.projects = BatchLoader("projects")
+        self.archived_projects = BatchLoader("projects_archive")
+        self.statuses = BatchLoader("statuses")
+        self.worker_types = BatchLoader("worker_types")
+        self.tags = BatchLoader("tags")
+
+_request_loaders: ContextVar[Optional[RequestLoaders]] = ContextVar("request_loaders", default=None)
+
+def get_loaders() -> RequestLoaders:
+    """Loaders of the current request (installed by the middleware); outside a
+    request every call gets a fresh, unshared set."""
+    return _request_loaders.get() or RequestLoaders()
+
+# ==================== CHANGE TRACKING ====================
+
+# Change counters bumped by write endpoints; used for cache versions and ETags
+REFERENCE_COUNTER = "reference"  # worker types, positions, statuses, tags
+WORKERS_COUNTER = "workers"      # worker documents, their tags and assignments
+PROJECTS_COUNTER = "projects"    # project documents, recruiters and assignments
+
+async def read_counter(name: str) -> int:
+    doc = await db.counters.find_one({"id": name}, {"_id": 0})
+    return doc.get("seq", 0) if doc else 0
+
+async def read_counters(*names: str) -> List[int]:
+    docs = await db.counters.find({"id": {"$in": list(names)}}, {"_id": 0}).to_list(None)
+    seqs = {d["id"]: d.get("seq", 0) for d in docs}
+    return [seqs.get(n, 0) for n in names]
+
+async def bump_counter(name: str) -> int:
+    doc = await db.counters.find_one_and_update(
+        {"id": name}, {"$inc": {"seq": 1}},
+        projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return doc["seq"]
+
+async def record_changes(*counters: str) -> None:
+    await asyncio.gather(*(bump_counter(c) for c in counters))
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+# Change feed: every write to workers, projects and project_workers stamps the
+# document with `change_seq` from one monotonically increasing sequence, and
+# deletes leave a tombstone with the same kind of sequence (see /api/changes).
+# A sequence is allocated before its write commits, so writers can commit out
+# of order. Each allocation is therefore registered in the counter's
+# `inflight` list (in the same atomic update) until the request that made it
+# finishes (change_scope); readers only trust sequences up to
+# settled_change_seq(). Entries older than CHANGE_INFLIGHT_TIMEOUT_SECONDS are
+# left behind by a crashed process and are ignored.
+CHANGE_SEQUENCE = "changes"
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TOMBSTONE_RETENTION_DAYS", "30"))
+CHANGE_INFLIGHT_TIMEOUT_SECONDS = int(os.environ.get("CHANGE_INFLIGHT_TIMEOUT_SECONDS", "300"))
+
+_change_scope: ContextVar[Optional[list]] = ContextVar("change_scope", default=None)
+
+@asynccontextmanager
+async def change_scope():
+    """Sequences allocated inside stay in flight until the scope ends"""
+    seqs = []
+    token = _change_scope.set(seqs)
+    try:
+        yield
+    finally:
+        _change_scope.reset(token)
+        if seqs:
+            await db.counters.update_one({"id": CHANGE_SEQUENCE}, {"$pull": {"inflight": {"seq": {"$in": seqs}}}})
+
+async def next_change_seq() -> int:
+    scope = _change_scope.get()
+    if scope is None:
+        # Outside any scope nobody would release the entry
+        return await bump_counter(CHANGE_SEQUENCE)
+    while True:
+        head = await read_counter(CHANGE_SEQUENCE)
+        try:
+            result = await db.counters.update_one(
+                {"id": CHANGE_SEQUENCE, "seq": head},
+                {"$set": {"seq": head + 1}, "$push": {"inflight": {"seq": head + 1, "at": utc_now()}}},
+                upsert=not head
+            )
+        except DuplicateKeyError:
+            continue  # another writer created the counter first
+        if result.modified_count or result.upserted_id is not None:
+            scope.append(head + 1)
+            return head + 1
+
+async def settled_change_seq() -> int:
+    """Every write stamped at or below this sequence has committed"""
+    doc = await db.counters.find_one({"id": CHANGE_SEQUENCE}, {"_id": 0}) or {}
+    cutoff = utc_now() - timedelta(seconds=CHANGE_INFLIGHT_TIMEOUT_SECONDS)
+    inflight = doc.get("inflight", [])
+    live = [e["seq"] for e in inflight if parse_timestamp(e["at"]) > cutoff]
+    if len(live) < len(inflight):
+        await db.counters.update_one({"id": CHANGE_SEQUENCE}, {"$pull": {"inflight": {"at": {"$lt": cutoff}}}})
+    return min(live) - 1 if live else doc.get("seq", 0)
+
+async def touch(collection: str, ids: List[str]) -> None:
+    """Bump `version`, `updated_at` and `change_seq` of documents whose payload changed"""
+    ids = [i for i in ids if i]
+    if ids:
+        await db[collection].update_many(
+            {"id": {"$in": ids}},
+            {"$inc": {"version": 1}, "$set": {"updated_at": utc_now(), "change_seq": await next_change_seq()}}
+        )
+
+async def record_tombstones(kind: str, entries: List[tuple], archived: bool = False) -> None:
+    """entries: (id, user ids allowed to see the deletion); admins see every tombstone.
+    `archived`: the rows moved to the archive rather than being deleted."""
+    if not entries:
+        return
+    seq, at = await next_change_seq(), utc_now()
+    await db.tombstones.insert_many([
+        {"kind": kind, "id": doc_id, "visible_to": [u for u in visible_to if u], "seq": seq, "at": at,
+         **({"archived": True} if archived else {})}
+        for doc_id, visible_to in entries
+    ])
+
+def project_audience(project: dict) -> List[str]:
+    return [project.get("owner_id", "")] + list(project.get("recruiter_ids", []))
+
+async def assignment_tombstones(assignments: List[dict], archived: bool = False) -> None:
+    """Tombstones for deleted (or archived) project_workers rows, visible to the worker's owner"""
+    workers = await get_loaders().workers.load_many([a["worker_id"] for a in assignments])
+    await record_tombstones("assignment", [
+        (a["id"], [w.get("owner_id", "")] if w else []) for a, w in zip(assignments, workers)
+    ], archived)
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:24] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def conditional_response(request: Optional[Request], response: Optional[Response], etag: str) -> Optional[Response]:
+    """304 when the client already has `etag`, otherwise tag the outgoing response.
+    Both are None when an endpoint is called directly from another endpoint."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request is not None and etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return None
+
+# ==================== RESPONSE CACHE ====================
+
+# Rendered get_project / get_worker payloads. Entries are keyed (entity, scope)
+# where scope carries the role/ownership the payload was filtered for, and
+# every entry stores the fingerprint (entity version + global counters) it was
+# built from: a lookup with a different fingerprint is a miss, so a stale entry
+# can never be served even if another process missed an invalidation. Write
+# endpoints additionally drop the touched entities (invalidate_responses).
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "local").lower()  # off | local | redis
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_PREFIX = "dolgozocrm:rc:"
+
+class NullResponseCache:
+    async def get(self, entity: str, scope: str, fingerprint: str) -> Optional[Any]:
+        return None
+
+    async def set(self, entity: str, scope: str, fingerprint: str, payload: Any) -> None:
+        pass
+
+    async def invalidate(self, *entities: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+class LocalResponseCache(NullResponseCache):
+    """Per-process LRU"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (entity, scope) -> (fingerprint, payload)
+        self.scopes = {}              # entity -> {scope}
+
+    async def get(self, entity, scope, fingerprint):
+        entry = self.entries.get((entity, scope))
+        hit = entry is not None and entry[0] == fingerprint
+        record_cache_lookup("responses_local", hit)
+        if not hit:
+            return None
+        self.entries.move_to_end((entity, scope))
+        return entry[1]
+
+    async def set(self, entity, scope, fingerprint, payload):
+        self.entries[(entity, scope)] = (fingerprint, payload)
+        self.entries.move_to_end((entity, scope))
+        self.scopes.setdefault(entity, set()).add(scope)
+        while len(self.entries) > self.max_entries:
+            (old_entity, old_scope), _ = self.entries.popitem(last=False)
+            self._forget(old_entity, old_scope)
+
+    async def invalidate(self, *entities):
+        for entity in entities:
+            for scope in self.scopes.pop(entity, ()):
+                self.entries.pop((entity, scope), None)
+
+    def _forget(self, entity, scope):
+        scopes = self.scopes.get(entity)
+        if scopes is not None:
+            scopes.discard(scope)
+            if not scopes:
+                del self.scopes[entity]
+
+class RespError(Exception):
+    pass
+
+class RespClient:
+    """Minimal Redis-protocol (RESP2) client: one lazily opened connection per
+    process, commands serialized over it. Works with Redis, Valkey, KeyDB etc."""
+
+    def __init__(self, url: str, timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._reader = self._writer = None
+        self._lock = None
+
+    async def execute(self, *args):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._roundtrip(args), self.timeout)
+            except BaseException:
+                # Half-read replies would desync the stream; start over next time
+                await self.close()
+                raise
+
+    async def _roundtrip(self, args):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            if self.password:
+                await self._command(("AUTH", self.password))
+            if self.db:
+                await self._command(("SELECT", self.db))
+        return await self._command(args)
+
+    async def _command(self, args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._reply()
+
+    async def _reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            return None if size < 0 else (await self._reader.readexactly(size + 2))[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [await self._reply() for _ in range(size)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self._lock = None
+
+class RedisResponseCache(LocalResponseCache):
+    """The local LRU in front of a shared tier: one Redis hash per entity
+    (field = scope), so invalidating an entity is a single DEL for every
+    process. Redis errors only cost a miss; requests never fail on the cache."""
+
+    def __init__(self, url: str, max_entries: int, ttl_seconds: int):
+        super().__init__(max_entries)
+        self.redis = RespClient(url)
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, entity, scope, fingerprint):
+        payload = await super().get(entity, scope, fingerprint)
+        if payload is not None:
+            return payload
+        try:
+            raw = await self.redis.execute("HGET", RESPONSE_CACHE_PREFIX + entity, scope)
+        except (OSError, RespError, asyncio.TimeoutError) as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+        entry = json.loads(raw) if raw else None
+        hit = entry is not None and entry["fingerprint"] == fingerprint
+        record_cache_lookup("responses_shared", hit)
+        if not hit:
+            return None
+        await super().set(entity, scope, fingerprint, entry["payload"])
+        return entry["payload"]
+
+    async def set(self, entity, scope, fingerprint, payload):
+        await super().set(entity, scope, fingerprint, payload)
+        key = RESPONSE_CACHE_PREFIX + entity
+        try:
+            await self.redis.execute("HSET", key, scope, json.dumps({"fingerprint": fingerprint, "payload": payload}))
+            await self.redis.execute("EXPIRE", key, self.ttl_seconds)
+        except (OSError, RespError, asyncio.TimeoutError) as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    async def invalidate(self, *entities):
+        await super().invalidate(*entities)
+        if not entities:
+            return
+        try:
+            await self.redis.execute("DEL", *(RESPONSE_CACHE_PREFIX + e for e in entities))
+        except (OSError, RespError, asyncio.TimeoutError) as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+
+    async def close(self):
+        await self.redis.close()
+
+def build_response_cache():
+    if RESPONSE_CACHE == "redis":
+        return RedisResponseCache(RESPONSE_CACHE_URL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+    if RESPONSE_CACHE == "local":
+        return LocalResponseCache(RESPONSE_CACHE_SIZE)
+    return NullResponseCache()
+
+response_cache = build_response_cache()
+
+def response_entity(kind: str, entity_id: str) -> str:
+    return f"{current_tenant()}:{kind}:{entity_id}"
+
+async def invalidate_responses(projects=(), workers=()) -> None:
+    await response_cache.invalidate(*(response_entity("project", p) for p in set(projects)),
+                                    *(response_entity("worker", w) for w in set(workers)))
+
+# ==================== USER DIRECTORY ====================
+
+# How often each process checks the users change counter (seconds)
+USER_DIRECTORY_REFRESH_SECONDS = float(os.environ.get('USER_DIRECTORY_REFRESH_SECONDS', '5'))
+
+class UserDirectory:
+    """In-memory id -> {id, name, email, role} map used for owner/recruiter names.
+    
+    Reads never touch Mongo. Writers bump the "users" counter; every process
+    polls that counter in the background and reloads when it changed."""
+
+    def __init__(self):
+        self._users = {}
+        self.version = None
+
+    def get(self, user_id: str) -> Optional[dict]:
+        return self._users.get(user_id)
+
+    def put(self, doc: dict) -> None:
+        self._users[doc["id"]] = {k: doc[k] for k in ("id", "name", "email", "role") if k in doc}
+
+    async def reload(self) -> None:
+        version = await read_counter("users")
+        docs = await db.users.find({}, {"_id": 0, "id": 1, "name": 1, "email": 1, "role": 1}).to_list(None)
+        self._users = {}
+        for d in docs:
+            self.put(d)
+        self.version = version
+
+    async def refresh_if_changed(self) -> bool:
+        if await read_counter("users") != self.version:
+            await self.reload()
+            return True
+        return False
+
+    async def invalidate(self) -> None:
+        """Call after any write to the users collection"""
+        await bump_counter("users")
+        await self.reload()
+
+user_directories = {}
+
+def get_user_directory() -> UserDirectory:
+    """The current tenant's directory"""
+    tenant = current_tenant()
+    directory = user_directories.get(tenant)
+    if directory is None:
+        directory = user_directories[tenant] = UserDirectory()
+    return directory
+
+async def _refresh_user_directory_forever():
+    while True:
+        await asyncio.sleep(USER_DIRECTORY_REFRESH_SECONDS)
+        for tenant, directory in list(user_directories.items()):
+            token = _current_tenant.set(tenant)
+            try:
+                await directory.refresh_if_changed()
+            except Exception as e:
+                logging.getLogger(__name__).warning("User directory refresh failed (%s): %s", tenant, e)
+            finally:
+                _current_tenant.reset(token)
+
+async def resolve_users(user_ids: List[str]) -> List[Optional[dict]]:
+    """Directory lookup; ids unknown to this process (e.g. just registered on
+    another worker) fall back to one batched query and are added to the directory."""
+    user_directory = get_user_directory()
+    missing = []
+    for uid in user_ids:
+        hit = user_directory.get(uid) is not None
+        if uid:
+            record_cache_lookup("user_directory", hit)
+        if uid and not hit:
+            missing.append(uid)
+    if missing:
+        for doc in await get_loaders().users.load_many(missing):
+            if doc:
+                user_directory.put(doc)
+    return [user_directory.get(uid) if uid else None for uid in user_ids]
+
+def user_display_name(u: Optional[dict]) -> str:
+    return u.get("name", u["email"]) if u else ""
+
+def user_ref(u: dict) -> dict:
+    return {"id": u["id"], "name": user_display_name(u), "email": u["email"]}
+
+async def load_recruiters(recruiter_ids: List[str]) -> List[dict]:
+    return [user_ref(u) for u in await resolve_users(recruiter_ids) if u]
+
+async def load_owner_name(owner_id: str) -> str:
+    return user_display_name((await resolve_users([owner_id]))[0])
+
+WORKER_STATUS_PREVIEW = 5
+
+async def enrich_workers(workers: List[dict], include_archived: bool = False) -> List[WorkerResponse]:
+    """Type name, tags, project statuses and owner name for a page of workers"""
+    if not workers:
+        return []
+    loaders = get_loaders()
+    
+    # Only the latest few project statuses (and the total) of every worker, in
+    # one aggregation; the full timeline is paged via /workers/{id}/history.
+    # Archived assignments (older by construction) follow the hot ones.
+    def latest_statuses(collection: str):
+        return db[collection].aggregate([
+            {"$match": {"worker_id": {"$in": [w["id"] for w in workers]}}},
+            {"$sort": {"updated_at": -1, "id": -1}},
+            {"$group": {"_id": "$worker_id", "count": {"$sum": 1},
+                        "latest": {"$push": {"project_id": "$project_id",
+                                             "status_id": {"$ifNull": ["$status_id", ""]},
+                                             "notes": {"$ifNull": ["$notes", ""]},
+                                             "updated_at": {"$ifNull": ["$updated_at", ""]}}}}},
+            {"$project": {"count": 1, "latest": {"$slice": ["$latest", WORKER_STATUS_PREVIEW]}}}
+        ]).to_list(None)
+    
+    if include_archived:
+        hot_rows, archived_rows = await asyncio.gather(
+            latest_statuses("project_workers"), latest_statuses("project_workers_archive"))
+    else:
+        hot_rows, archived_rows = await latest_statuses("project_workers"), []
+    pw_by_worker = {}
+    project_counts = {}
+    for archived, rows in ((False, hot_rows), (True, archived_rows)):
+        for row in rows:
+            project_counts[row["_id"]] = project_counts.get(row["_id"], 0) + row["count"]
+            entries = pw_by_worker.setdefault(row["_id"], [])
+            entries.extend((pw, archived) for pw in row["latest"][:WORKER_STATUS_PREVIEW - len(entries)])
+    
+    async def project_status(pw: dict, archived: bool) -> Optional[dict]:
+        project_loader = loaders.archived_projects if archived else loaders.projects
+        project, status = await asyncio.gather(
+            project_loader.load(pw["project_id"]),
+            loaders.statuses.load(pw.get("status_id"))
+        )
+        if not project:
+            return None
+        return {
+            "project_id": project["id"],
+            "project_name": project["name"],
+            "project_date": to_date_str(project.get("date", "")),
+            "status_id": pw.get("status_id", ""),
+            "status_name": status["name"] if status else "Hozzárendelve",
+            "notes": pw.get("notes", ""),
+            "updated_at": to_iso(pw.get("updated_at", "")),
+            "is_archived": archived
+        }
+    
+    async def enrich(w: dict) -> WorkerResponse:
+        type_doc, tags, statuses, owner = await asyncio.gather(
+            loaders.worker_types.load(w.get("worker_type_id")),
+            loaders.tags.load_many(w.get("tag_ids", [])),
+            asyncio.gather(*(project_status(pw, archived) for pw, archived in pw_by_worker.get(w["id"], []))),
+            resolve_users([w.get("owner_id")])
+        )
+        w["worker_type_name"] = type_doc["name"] if type_doc else ""
+        # Position is now free text
+        w["position"] = w.get("position", "")
+        w["position_experience"] = w.get("position_experience", "")
+        w["tags"] = [t for t in tags if t]
+        w["project_statuses"] = [ps for ps in statuses if ps]
+        w["project_count"] = project_counts.get(w["id"], 0)
+        w["owner_name"] = user_display_name(owner[0])
+        return WorkerResponse(**serialize_dates(w))
+    
+    return list(await asyncio.gather(*(enrich(w) for w in workers)))
+
 # ==================== AUTH ENDPOINTS ====================
 
 @api_router.post("/auth/register", response_model=dict)
@@ -249,9 +1291,10 @@ async def register(data: UserCreate, current_user: dict = Depends(require_admin)
         "password": hash_password(data.password),
         "name": data.name or data.email.split("@")[0],
         "role": data.role,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": utc_now()
     }
     await db.users.insert_one(user_doc)
+    await get_user_directory().invalidate()
     return {"message": "Felhasználó létrehozva", "email": data.email}
 
 @api_router.post("/auth/login", response_model=dict)
@@ -278,12 +1321,13 @@ async def get_me(user: dict = Depends(get_current_user)):
         email=user["email"],
         name=user.get("name", ""),
         role=user["role"],
-        created_at=user.get("created_at", "")
+        created_at=to_iso(user.get("created_at", ""))
     )
 
 @api_router.put("/auth/profile")
 async def update_profile(data: ProfileUpdate, user: dict = Depends(get_current_user)):
     await db.users.update_one({"id": user["id"]}, {"$set": {"name": data.name}})
+    await get_user_directory().invalidate()
     return {"message": "Profil frissítve"}
 
 @api_router.put("/auth/password")
@@ -312,6 +1356,7 @@ async def get_worker_types(user: dict = Depends(get_current_user)):
 async def create_worker_type(data: WorkerTypeCreate, user: dict = Depends(require_admin)):
     type_doc = {"id": str(uuid.uuid4()), "name": data.name}
     await db.worker_types.insert_one(type_doc)
+    await bump_counter(REFERENCE_COUNTER)
     return WorkerTypeResponse(**type_doc)
 
 @api_router.delete("/worker-types/{type_id}")
@@ -321,6 +1366,7 @@ async def delete_worker_type(type_id: str, user: dict = Depends(require_admin)):
         raise HTTPException(status_code=404, detail="Típus nem található")
     # Töröljük a típushoz tartozó pozíciókat is
     await db.positions.delete_many({"worker_type_id": type_id})
+    await bump_counter(REFERENCE_COUNTER)
     return {"message": "Típus törölve"}
 
 # ==================== POSITIONS ====================
@@ -333,17 +1379,14 @@ async def get_positions(worker_type_id: Optional[str] = None, user: dict = Depen
         query["worker_type_id"] = worker_type_id
     
     positions = await db.positions.find(query, {"_id": 0}).to_list(100)
+    types = await get_loaders().worker_types.load_many([p.get("worker_type_id") for p in positions])
     
-    result = []
-    for p in positions:
-        type_doc = await db.worker_types.find_one({"id": p.get("worker_type_id")}, {"_id": 0})
-        result.append(PositionResponse(
-            id=p["id"],
-            name=p["name"],
-            worker_type_id=p["worker_type_id"],
-            worker_type_name=type_doc["name"] if type_doc else ""
-        ))
-    return result
+    return [PositionResponse(
+        id=p["id"],
+        name=p["name"],
+        worker_type_id=p["worker_type_id"],
+        worker_type_name=type_doc["name"] if type_doc else ""
+    ) for p, type_doc in zip(positions, types)]
 
 @api_router.post("/positions", response_model=PositionResponse)
 async def create_position(data: PositionCreate, user: dict = Depends(require_admin)):
@@ -358,6 +1401,7 @@ async def create_position(data: PositionCreate, user: dict = Depends(require_adm
         "worker_type_id": data.worker_type_id
     }
     await db.positions.insert_one(position_doc)
+    await bump_counter(REFERENCE_COUNTER)
     return PositionResponse(**position_doc, worker_type_name=type_doc["name"])
 
 @api_router.delete("/positions/{position_id}")
@@ -365,6 +1409,7 @@ async def delete_position(position_id: str, user: dict = Depends(require_admin))
     result = await db.positions.delete_one({"id": position_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Pozíció nem található")
+    await bump_counter(REFERENCE_COUNTER)
     return {"message": "Pozíció törölve"}
 
 # ==================== STATUSES ====================
@@ -378,6 +1423,7 @@ async def get_statuses(user: dict = Depends(get_current_user)):
 async def create_status(data: StatusCreate, user: dict = Depends(require_admin)):
     status_doc = {"id": str(uuid.uuid4()), "name": data.name}
     await db.statuses.insert_one(status_doc)
+    await bump_counter(REFERENCE_COUNTER)
     return StatusResponse(**status_doc)
 
 @api_router.delete("/statuses/{status_id}")
@@ -385,6 +1431,7 @@ async def delete_status(status_id: str, user: dict = Depends(require_admin)):
     result = await db.statuses.delete_one({"id": status_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Státusz nem található")
+    await bump_counter(REFERENCE_COUNTER)
     return {"message": "Státusz törölve"}
 
 # ==================== TAGS ====================
@@ -398,6 +1445,7 @@ async def get_tags(user: dict = Depends(get_current_user)):
 async def create_tag(data: TagCreate, user: dict = Depends(require_admin)):
     tag_doc = {"id": str(uuid.uuid4()), "name": data.name, "color": data.color}
     await db.tags.insert_one(tag_doc)
+    await bump_counter(REFERENCE_COUNTER)
     return TagResponse(**tag_doc)
 
 @api_router.delete("/tags/{tag_id}")
@@ -405,8 +1453,43 @@ async def delete_tag(tag_id: str, user: dict = Depends(require_admin)):
     result = await db.tags.delete_one({"id": tag_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Jellemző nem található")
+    await bump_counter(REFERENCE_COUNTER)
     return {"message": "Jellemző törölve"}
 
+# ==================== BOOTSTRAP ====================
+
+@api_router.get("/bootstrap")
+async def bootstrap(request: Request, user: dict = Depends(get_current_user)):
+    """Frontend indulás: aktuális felhasználó + összes törzsadat egy kérésben (ETag-gel)"""
+    reference_version, users_version = await read_counters(REFERENCE_COUNTER, "users")
+    etag = make_etag("bootstrap", user["id"], user["role"], reference_version, users_version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    types, positions, statuses, tags = await asyncio.gather(
+        db.worker_types.find({}, {"_id": 0}).to_list(100),
+        db.positions.find({}, {"_id": 0}).to_list(1000),
+        db.statuses.find({}, {"_id": 0}).to_list(100),
+        db.tags.find({}, {"_id": 0}).to_list(100)
+    )
+    positions_by_type = {}
+    for p in positions:
+        positions_by_type.setdefault(p["worker_type_id"], []).append({"id": p["id"], "name": p["name"]})
+    
+    bundle = {
+        "user": (await get_me(user)).model_dump(),
+        "worker_types": [
+            {**WorkerTypeResponse(**t).model_dump(), "positions": positions_by_type.get(t["id"], [])}
+            for t in types
+        ],
+        "statuses": [StatusResponse(**s).model_dump() for s in statuses],
+        "tags": [TagResponse(**t).model_dump() for t in tags]
+    }
+    if user["role"] == "admin":
+        bundle["users"] = [u.model_dump() for u in await get_users(user)]
+    return JSONResponse(content=bundle, headers=headers)
+
 # ==================== USERS (Admin) ====================
 
 @api_router.get("/users", response_model=List[UserResponse])
@@ -417,29 +1500,531 @@ async def get_users(user: dict = Depends(require_admin)):
         email=u["email"],
         name=u.get("name", ""),
         role=u["role"],
-        created_at=u.get("created_at", "")
+        created_at=to_iso(u.get("created_at", ""))
     ) for u in users]
 
 @api_router.get("/users/stats")
 async def get_user_stats(user: dict = Depends(require_admin)):
-    """Toborzónként hány dolgozót vitt fel"""
-    pipeline = [
-        {"$group": {"_id": "$owner_id", "count": {"$sum": 1}}},
-    ]
-    stats = await db.workers.aggregate(pipeline).to_list(100)
+    """Toborzónként hány dolgozót vitt fel (a recruiter_rollups összesítőiből)"""
+    if await read_counter(ROLLUPS_BUILT_COUNTER):
+        stats = await reporting_collection("recruiter_rollups").find({"day": ""}, {"_id": 0, "user_id": 1, "worker_count": 1}).to_list(None)
+    else:
+        # Amíg az összesítők nem épültek fel, élő számlálás
+        stats = await reporting_collection("workers").aggregate([
+            {"$group": {"_id": "$owner_id", "worker_count": {"$sum": 1}}},
+            {"$project": {"_id": 0, "user_id": "$_id", "worker_count": 1}}
+        ]).to_list(None)
+    owners = await resolve_users([s["user_id"] for s in stats])
     
     result = []
-    for s in stats:
-        owner = await db.users.find_one({"id": s["_id"]}, {"_id": 0, "password": 0})
-        if owner:
+    for s, owner in zip(stats, owners):
+        if owner and s.get("worker_count", 0) > 0:
             result.append({
-                "user_id": s["_id"],
-                "user_name": owner.get("name", owner["email"]),
+                "user_id": s["user_id"],
+                "user_name": user_display_name(owner),
                 "user_email": owner["email"],
-                "worker_count": s["count"]
+                "worker_count": s["worker_count"]
             })
     return result
 
+# ==================== WORKER INDEX ====================
+
+# Optional in-memory, column-oriented copy of the fields admins slice the
+# worker base by. Categorical fields are dictionary-encoded into int32 columns,
+# tags and project statuses (a worker can have several) are packed bitsets
+# with one bit per row. Filters and facet counts are a handful of vector
+# operations; the page is then hydrated from Mongo by id. Every write path
+# stamps change_seq (see the change feed), so each process catches up with a
+# few indexed queries when the change sequence moved.
+WORKER_INDEX_ENABLED = os.environ.get("WORKER_INDEX", "off").lower() in ("1", "on", "true") and np is not None
+# Catch-up stops at settled_change_seq(), so a write that committed after a
+# later one is still read on the next refresh instead of being skipped
+# Full builds run in a background task; a request waits at most
+# WORKER_INDEX_WAIT_SECONDS for the first one and otherwise gets a 503
+WORKER_INDEX_RELOAD_SECONDS = float(os.environ.get("WORKER_INDEX_RELOAD_SECONDS", "3600"))
+WORKER_INDEX_WAIT_SECONDS = float(os.environ.get("WORKER_INDEX_WAIT_SECONDS", "2"))
+WORKER_INDEX_COLUMNS = ("category", "worker_type_id", "owner_id")
+WORKER_INDEX_SETS = {"tag_id": "tags", "status_id": "statuses"}
+# Candidate ranking (/api/projects/{id}/candidates): weighted sum of per-worker
+# features, each scaled to 0..1 (reliability to -1..1)
+CANDIDATE_WEIGHTS = {"worker_type": 3.0, "position": 2.0, "tags": 2.0, "reliability": 2.0, "recency": 1.0}
+CANDIDATE_RECENCY_DAYS = 90
+WORKER_INDEX_PROJECTION = {"_id": 0, "id": 1, "created_at": 1, "tag_ids": 1, "position": 1,
+                           **{name: 1 for name in WORKER_INDEX_COLUMNS}}
+
+class Dictionary:
+    """value <-> dense int code"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def popcount(packed) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(packed).sum())
+    return int(np.unpackbits(packed).sum())
+
+class WorkerIndex:
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.size = 0
+        self.rows = {}          # worker id -> row
+        self.ids = []           # row -> worker id
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.columns = {name: np.zeros(capacity, dtype=np.int32) for name in (*WORKER_INDEX_COLUMNS, "position")}
+        self.dictionaries = {name: Dictionary() for name in (*WORKER_INDEX_COLUMNS, "position", "tags", "statuses")}
+        # Candidate ranking features: outcomes of current assignments, last activity
+        self.placements = np.zeros(capacity, dtype=np.int32)
+        self.no_shows = np.zeros(capacity, dtype=np.int32)
+        self.last_active = np.zeros(capacity, dtype=np.float64)
+        self.outcomes = {}      # status id -> +1 (placement) / -1 (no-show)
+        self.bitsets = {"tags": [], "statuses": []}  # code -> packed bits over rows
+        self.row_tags = {}      # row -> set of tag codes
+        self.assignments = {}   # assignment id -> (row, status code)
+        self.status_refs = {}   # (row, status code) -> number of assignments
+        self.applied_seq = 0    # every change up to here is applied (settled_change_seq)
+        self.loaded_at = None
+        self.lock = None
+        self.build_task = None
+
+    # ---- maintenance ----
+
+    def _grow(self):
+        def extend(array):
+            return np.concatenate([array, np.zeros_like(array)])
+        self.capacity *= 2
+        for name in ("alive", "created", "placements", "no_shows", "last_active"):
+            setattr(self, name, extend(getattr(self, name)))
+        for name, column in self.columns.items():
+            self.columns[name] = extend(column)
+        for bitsets in self.bitsets.values():
+            for code, bits in enumerate(bitsets):
+                bitsets[code] = np.concatenate([bits, np.zeros(self.capacity // 8 - len(bits), dtype=np.uint8)])
+
+    def _set_bit(self, family: str, code: int, row: int, on: bool):
+        bitsets = self.bitsets[family]
+        while len(bitsets) <= code:
+            bitsets.append(np.zeros(self.capacity // 8, dtype=np.uint8))
+        if on:
+            bitsets[code][row >> 3] |= np.uint8(1 << (row & 7))
+        else:
+            bitsets[code][row >> 3] &= np.uint8(~(1 << (row & 7)) & 0xFF)
+
+    def upsert_worker(self, w: dict):
+        row = self.rows.get(w["id"])
+        if row is None:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.rows[w["id"]] = self.size
+            self.ids.append(w["id"])
+            self.size += 1
+        self.alive[row] = True
+        created = parse_timestamp(w.get("created_at"))
+        self.created[row] = created.timestamp() if created else 0.0
+        self.last_active[row] = max(self.last_active[row], self.created[row])
+        for name in (*WORKER_INDEX_COLUMNS, "position"):
+            self.columns[name][row] = self.dictionaries[name].encode(w.get(name) or "")
+        tags = {self.dictionaries["tags"].encode(t) for t in w.get("tag_ids", [])}
+        previous = self.row_tags.get(row, set())
+        for code in previous - tags:
+            self._set_bit("tags", code, row, False)
+        for code in tags - previous:
+            self._set_bit("tags", code, row, True)
+        self.row_tags[row] = tags
+
+    def remove_worker(self, worker_id: str):
+        row = self.rows.get(worker_id)
+        if row is not None:
+            self.alive[row] = False
+
+    def upsert_assignment(self, pw: dict):
+        row = self.rows.get(pw["worker_id"])
+        if row is None:
+            return
+        self.remove_assignment(pw["id"])
+        code = self.dictionaries["statuses"].encode(pw.get("status_id") or "")
+        self.assignments[pw["id"]] = (row, code)
+        refs = self.status_refs.get((row, code), 0)
+        self.status_refs[(row, code)] = refs + 1
+        if not refs:
+            self._set_bit("statuses", code, row, True)
+        self._record_outcome(row, pw)
+
+    def add_archived_assignment(self, pw: dict):
+        """Archived assignments only feed the ranking features"""
+        row = self.rows.get(pw["worker_id"])
+        if row is not None:
+            self._record_outcome(row, pw)
+
+    def _record_outcome(self, row: int, pw: dict):
+        self._count_outcome(row, pw.get("status_id") or "", 1)
+        updated = parse_timestamp(pw.get("updated_at"))
+        if updated:
+            self.last_active[row] = max(self.last_active[row], updated.timestamp())
+
+    def _count_outcome(self, row: int, status_id: str, n: int):
+        outcome = self.outcomes.get(status_id)
+        if outcome == 1:
+            self.placements[row] += n
+        elif outcome == -1:
+            self.no_shows[row] += n
+
+    def remove_assignment(self, assignment_id: str, archived: bool = False):
+        """An archived assignment leaves the status filters but keeps counting
+        towards the worker's outcomes"""
+        entry = self.assignments.pop(assignment_id, None)
+        if entry is None:
+            return
+        if not archived:
+            self._count_outcome(entry[0], self.dictionaries["statuses"].values[entry[1]], -1)
+        refs = self.status_refs.pop(entry, 1) - 1
+        if refs:
+            self.status_refs[entry] = refs
+        else:
+            self._set_bit("statuses", entry[1], entry[0], False)
+
+    async def load(self):
+        """Full build (first use, and periodically as a safety net). Queries keep
+        using the current contents until the new build is swapped in."""
+        fresh = WorkerIndex()
+        fresh.applied_seq = await settled_change_seq()
+        # Statuses added later count as neutral until the next full reload
+        async for status_doc in db.statuses.find({}, {"_id": 0, "id": 1, "name": 1}):
+            if status_doc["name"] in PLACEMENT_STATUSES:
+                fresh.outcomes[status_doc["id"]] = 1
+            elif status_doc["name"] in NO_SHOW_STATUSES:
+                fresh.outcomes[status_doc["id"]] = -1
+        async for w in db.workers.find({}, WORKER_INDEX_PROJECTION):
+            fresh.upsert_worker(w)
+        async for pw in db.project_workers.find({}, {"_id": 0, "id": 1, "worker_id": 1, "status_id": 1,
+                                                     "updated_at": 1}):
+            fresh.upsert_assignment(pw)
+        async for pw in db.project_workers_archive.find({}, {"_id": 0, "worker_id": 1, "status_id": 1,
+                                                             "updated_at": 1}):
+            fresh.add_archived_assignment(pw)
+        async with self._locked():
+            # Writes that landed during the scan
+            await fresh.catch_up(fresh.applied_seq)
+            fresh.applied_seq = max(fresh.applied_seq, await settled_change_seq())
+            fresh.loaded_at = time.monotonic()
+            fresh.lock, fresh.build_task = self.lock, self.build_task
+            self.__dict__.update(fresh.__dict__)
+
+    async def catch_up(self, since: int):
+        workers, assignments, tombstones = await asyncio.gather(
+            db.workers.find({"change_seq": {"$gt": since}}, {**WORKER_INDEX_PROJECTION, "change_seq": 1}).to_list(None),
+            db.project_workers.find({"change_seq": {"$gt": since}},
+                                    {"_id": 0, "id": 1, "worker_id": 1, "status_id": 1, "updated_at": 1,
+                                     "change_seq": 1}).to_list(None),
+            db.tombstones.find({"seq": {"$gt": since}, "kind": {"$in": ["worker", "assignment"]}},
+                               {"_id": 0, "kind": 1, "id": 1, "seq": 1, "archived": 1}).to_list(None)
+        )
+        for w in workers:
+            self.upsert_worker(w)
+        for pw in assignments:
+            self.upsert_assignment(pw)
+        current = {("worker", d["id"]): d["change_seq"] for d in workers}
+        current.update({("assignment", d["id"]): d["change_seq"] for d in assignments})
+        for t in tombstones:
+            if current.get((t["kind"], t["id"]), -1) < t["seq"]:
+                if t["kind"] == "worker":
+                    self.remove_worker(t["id"])
+                else:
+                    self.remove_assignment(t["id"], t.get("archived", False))
+
+    def _locked(self) -> asyncio.Lock:
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        return self.lock
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def start_build(self) -> asyncio.Task:
+        """Full build in a background task (at most one at a time)"""
+        if self.build_task is None or self.build_task.done():
+            self.build_task = asyncio.create_task(self._build())
+        return self.build_task
+
+    async def _build(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logging.getLogger(__name__).warning("Worker index build failed (%s): %s", current_tenant(), e)
+
+    async def refresh(self):
+        """Catch up with the writes since the last call; full builds only start here"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > WORKER_INDEX_RELOAD_SECONDS:
+            self.start_build()
+        if self.loaded_at is None:
+            return
+        async with self._locked():
+            settled = await settled_change_seq()
+            if settled <= self.applied_seq:
+                return
+            await self.catch_up(self.applied_seq)
+            self.applied_seq = settled
+
+    # ---- queries ----
+
+    def _mask(self, dimension: str, value: str):
+        n = self.size
+        if dimension in WORKER_INDEX_SETS:
+            family = WORKER_INDEX_SETS[dimension]
+            code = self.dictionaries[family].codes.get(value)
+            if code is None or code >= len(self.bitsets[family]):
+                return np.zeros(n, dtype=bool)
+            return np.unpackbits(self.bitsets[family][code], count=n, bitorder="little").view(bool)
+        code = self.dictionaries[dimension].codes.get(value)
+        if code is None:
+            return np.zeros(n, dtype=bool)
+        return self.columns[dimension][:n] == code
+
+    def _masks(self, filters: dict) -> dict:
+        return {dim: self._mask(dim, value) for dim, value in filters.items() if value}
+
+    def _combine(self, masks: dict, skip: Optional[str] = None, scope: Optional[dict] = None):
+        mask = self.alive[:self.size].copy()
+        for dim, m in masks.items():
+            if dim != skip:
+                mask &= m
+        for dim, value in (scope or {}).items():
+            mask &= self._mask(dim, value)
+        return mask
+
+    def _ids(self, mask, offset: int, limit: int) -> List[str]:
+        rows = np.flatnonzero(mask)
+        # Newest first, like the Mongo listing
+        rows = rows[np.argsort(-self.created[rows], kind="stable")][offset:offset + limit]
+        return [self.ids[r] for r in rows]
+
+    def search(self, filters: dict, scope: Optional[dict] = None, offset: int = 0, limit: int = 1000):
+        mask = self._combine(self._masks(filters), scope=scope)
+        return int(mask.sum()), self._ids(mask, offset, limit)
+
+    def facets(self, filters: dict, scope: Optional[dict] = None) -> dict:
+        """Counts per value of every dimension, with the other dimensions'
+        filters applied. `scope` (access restriction) always applies."""
+        masks = self._masks(filters)
+        result = {}
+        for dim in WORKER_INDEX_COLUMNS:
+            mask = self._combine(masks, skip=dim, scope=scope)
+            counts = np.bincount(self.columns[dim][:self.size][mask], minlength=len(self.dictionaries[dim].values))
+            values = self.dictionaries[dim].values
+            result[dim] = {values[code]: int(c) for code, c in enumerate(counts) if c and values[code]}
+        for dim, family in WORKER_INDEX_SETS.items():
+            packed = np.packbits(self._combine(masks, skip=dim, scope=scope), bitorder="little")
+            values = self.dictionaries[family].values
+            counts = {}
+            for code, bits in enumerate(self.bitsets[family]):
+                c = popcount(bits[:len(packed)] & packed)
+                if c and values[code]:
+                    counts[values[code]] = c
+            result[dim] = counts
+        return result
+
+    def rank(self, criteria: dict, scope: Optional[dict] = None, exclude=(), limit: int = 50,
+             now: Optional[float] = None):
+        """Top `limit` workers by weighted feature score, as (ids, scores,
+        per-feature contributions). `criteria`: worker_type_id, position
+        (substring), tag_ids; `exclude` holds unavailable worker ids."""
+        n = self.size
+        eligible = self._combine({}, scope=scope)
+        for worker_id in exclude:
+            row = self.rows.get(worker_id)
+            if row is not None:
+                eligible[row] = False
+        features = {}
+        if criteria.get("worker_type_id"):
+            features["worker_type"] = self._mask("worker_type_id", criteria["worker_type_id"]).astype(np.float32)
+        if criteria.get("position"):
+            wanted = fold(criteria["position"])
+            codes = [code for code, value in enumerate(self.dictionaries["position"].values)
+                     if value and wanted in fold(value)]
+            features["position"] = np.isin(self.columns["position"][:n], codes).astype(np.float32)
+        if criteria.get("tag_ids"):
+            held = np.zeros(n, dtype=np.float32)
+            for tag_id in criteria["tag_ids"]:
+                held += self._mask("tag_id", tag_id)
+            features["tags"] = held / len(criteria["tag_ids"])
+        placements, no_shows = self.placements[:n], self.no_shows[:n]
+        features["reliability"] = ((placements - no_shows) / (placements + no_shows + 1)).astype(np.float32)
+        days = ((now or time.time()) - self.last_active[:n]) / 86400
+        features["recency"] = np.exp(-np.maximum(days, 0) / CANDIDATE_RECENCY_DAYS).astype(np.float32)
+
+        score = np.zeros(n, dtype=np.float32)
+        for name, values in features.items():
+            score += CANDIDATE_WEIGHTS[name] * values
+        score[~eligible] = -np.inf
+        k = min(limit, int(eligible.sum()))
+        if not k:
+            return [], [], []
+        top = np.argpartition(-score, k - 1)[:k]
+        # Best first; ties go to the newer worker
+        top = top[np.lexsort((-self.created[top], -score[top]))]
+        breakdown = [{name: round(float(CANDIDATE_WEIGHTS[name] * values[r]), 3) for name, values in features.items()}
+                     for r in top]
+        return [self.ids[r] for r in top], [round(float(score[r]), 3) for r in top], breakdown
+
+worker_indexes = {}
+
+async def get_worker_index() -> Optional[WorkerIndex]:
+    """The current tenant's index, caught up with the latest writes, or None
+    while its first build is still running"""
+    tenant = current_tenant()
+    index = worker_indexes.get(tenant)
+    if index is None:
+        index = worker_indexes[tenant] = WorkerIndex()
+    await index.refresh()
+    if not index.ready:
+        await asyncio.wait([index.build_task], timeout=WORKER_INDEX_WAIT_SECONDS)
+    return index if index.ready else None
+
+def worker_index_building() -> HTTPException:
+    return HTTPException(status_code=503, detail="A dolgozó-index épül, próbáld újra néhány másodperc múlva",
+                         headers={"Retry-After": "5"})
+
+# ==================== GEOCODING ====================
+
+# Offline geocoding: worker addresses and project locations are matched against
+# a bundled settlement gazetteer (data/hu_settlements.csv: name,lat,lon,county,
+# postcodes — every settlement of the KSH list with its postcodes separated by
+# spaces; source: the MIT-licensed "magyar" package). GAZETTEER_PATH can point to
+# another list in the same format (the postcodes column is optional). The
+# settlement centre is stored in `geo` as a GeoJSON point (2dsphere index) and
+# the matched name in `geo_place` ("" and null when nothing matched).
+GAZETTEER_PATH = Path(os.environ.get("GAZETTEER_PATH", ROOT_DIR / "data" / "hu_settlements.csv"))
+GAZETTEER_ALIASES = {"bp": "budapest"}
+# "Eger utca", "Szeged krt." – a settlement name followed by one of these is a street
+STREET_TYPES = {"utca", "u", "ut", "ucca", "ter", "tere", "krt", "korut", "koz", "sor", "sugarut", "fasor",
+                "setany", "rakpart", "lakotelep", "ltp", "park", "dulo", "liget", "lejto", "utja"}
+GEOCODE_BATCH_SIZE = 500
+NEARBY_DEFAULT_RADIUS_KM = 30
+
+def fold(text: str) -> str:
+    """Lower-case without accents, so 'Győr' and 'gyor' compare equal"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def place_words(text: str) -> List[str]:
+    return re.findall(r"[^\W\d_]+", fold(text))
+
+class Gazetteer:
+    def __init__(self, path: Path):
+        self.places = {}    # folded name -> [(name, lon, lat)]; "Komló" and "Kömlő" fold alike
+        self.postcodes = {}  # "7621" -> [(name, lon, lat)]; small villages share postcodes
+        self.max_words = 1
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                words = place_words(row["name"])
+                place = (row["name"], float(row["lon"]), float(row["lat"]))
+                self.places.setdefault(" ".join(words), []).append(place)
+                for code in (row.get("postcodes") or "").split():
+                    self.postcodes.setdefault(code, []).append(place)
+                self.max_words = max(self.max_words, len(words))
+
+    def lookup(self, text: str) -> Optional[tuple]:
+        """(name, lon, lat) of the settlement named in `text`. In order: a
+        postcode leading the address or one of its comma-separated parts, a
+        part that is only a settlement name, a settlement at the start of the
+        address or at the end of its last part, and only then any words that
+        are not a street name ("Eger utca 5, Pécs" is in Pécs)."""
+        text = text or ""
+        parts = [part for part in re.split(r"[,;\n]", text) if part.strip()]
+        for part in parts:
+            code = re.match(r"\s*(?:H-?)?(\d{4})\b", part)
+            if code and code.group(1) in self.postcodes:
+                candidates, words = self.postcodes[code.group(1)], place_words(text)
+                named = [p for p in candidates if self._named(words, p)]
+                return (named or candidates)[0]
+        phrases = [place_words(part) for part in parts]
+        for words in phrases:
+            place = self._find(words, text)
+            if place:
+                return place
+        if phrases:
+            starts = [(phrases[0], 0, size) for size in range(len(phrases[0]), 0, -1)]
+            ends = [(phrases[-1], len(phrases[-1]) - size, size) for size in range(len(phrases[-1]), 0, -1)]
+            for words, i, size in starts + ends:
+                place = self._find_at(words, i, size, text)
+                if place:
+                    return place
+            for words in phrases:
+                for i in range(len(words)):
+                    for size in range(min(self.max_words, len(words) - i), 0, -1):
+                        place = self._find_at(words, i, size, text)
+                        if place:
+                            return place
+        # Budapesti irányítószám (1011–1239) település nélkül, postcodes oszlop nélküli jegyzékkel
+        if re.match(r"\s*1[0-2]\d\d\b", text):
+            return self._find(["budapest"], text)
+        return None
+
+    def _find_at(self, words: List[str], i: int, size: int, text: str) -> Optional[tuple]:
+        """words[i:i+size] as a settlement, unless a street type follows it"""
+        if size > self.max_words or (i + size < len(words) and words[i + size] in STREET_TYPES):
+            return None
+        return self._find(words[i:i + size], text)
+
+    def _find(self, words: List[str], text: str) -> Optional[tuple]:
+        key = " ".join(words)
+        places = self.places.get(GAZETTEER_ALIASES.get(key, key))
+        if not places:
+            return None
+        # Names that differ only in accents: the spelling used in the text wins
+        exact = [p for p in places if p[0].casefold() in text.casefold()]
+        return (exact or places)[0]
+
+    @staticmethod
+    def _named(words: List[str], place: tuple) -> bool:
+        name = place_words(place[0])
+        return any(words[i:i + len(name)] == name for i in range(len(words)))
+
+_gazetteer = None
+
+def gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(GAZETTEER_PATH)
+    return _gazetteer
+
+def geo_fields(text: Optional[str]) -> dict:
+    place = gazetteer().lookup(text or "")
+    if not place:
+        return {"geo": None, "geo_place": ""}
+    name, lon, lat = place
+    return {"geo": {"type": "Point", "coordinates": [lon, lat]}, "geo_place": name}
+
+async def geocode_missing(batch_size: int = GEOCODE_BATCH_SIZE, refresh: bool = False) -> dict:
+    """Backfill geo fields for workers and projects (refresh: recompute all,
+    e.g. after switching to a larger gazetteer)"""
+    report = {}
+    for collection, field in (("workers", "address"), ("projects", "location")):
+        stats = report[collection] = {"scanned": 0, "located": 0}
+        query = {} if refresh else {"geo_place": {"$exists": False}}
+        last_id = None
+        while True:
+            page = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+            docs = await db[collection].find(page, {"_id": 1, field: 1}).sort("_id", 1).limit(batch_size).to_list(None)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            updates = [(d["_id"], geo_fields(d.get(field))) for d in docs]
+            await db[collection].bulk_write([UpdateOne({"_id": _id}, {"$set": fields}) for _id, fields in updates],
+                                            ordered=False)
+            stats["scanned"] += len(docs)
+            stats["located"] += sum(1 for _, fields in updates if fields["geo_place"])
+    return report
+
 # ==================== WORKERS ====================
 
 @api_router.get("/workers", response_model=List[WorkerResponse])
@@ -449,8 +2034,26 @@ async def get_workers(
     worker_type_id: Optional[str] = None,
     tag_id: Optional[str] = None,
     owner_id: Optional[str] = None,
+    status_id: Optional[str] = None,
+    include_archived: bool = False,
+    request: Request = None,
+    response: Response = None,
     user: dict = Depends(get_current_user)
 ):
+    versions = await read_counters(WORKERS_COUNTER, PROJECTS_COUNTER, REFERENCE_COUNTER, "users")
+    etag = make_etag("workers", user["id"], user["role"], search, category, worker_type_id, tag_id, owner_id,
+                     status_id, include_archived, *versions)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    index = await get_worker_index() if WORKER_INDEX_ENABLED and not search else None
+    if index is not None:
+        # Szűrés a memóriában, Mongóból csak az oldal dolgozói jönnek
+        _, ids = index.search(*worker_filters(user, category, worker_type_id, tag_id, owner_id, status_id))
+        docs = {w["id"]: w for w in await db.workers.find({"id": {"$in": ids}}, {"_id": 0}).to_list(None)}
+        return await enrich_workers([docs[i] for i in ids if i in docs], include_archived)
+    
     query = {}
     
     # Toborzó csak saját dolgozóit látja
@@ -465,6 +2068,8 @@ async def get_workers(
         query["worker_type_id"] = worker_type_id
     if tag_id:
         query["tag_ids"] = tag_id
+    if status_id:
+        query["id"] = {"$in": await db.project_workers.distinct("worker_id", {"status_id": status_id})}
     if search:
         query["$or"] = [
             {"name": {"$regex": search, "$options": "i"}},
@@ -476,106 +2081,150 @@ async def get_workers(
         ]
     
     workers = await db.workers.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    
-    # Enrich with type names, tags, project statuses
-    result = []
-    for w in workers:
-        # Get type name
-        type_doc = await db.worker_types.find_one({"id": w.get("worker_type_id")}, {"_id": 0})
-        w["worker_type_name"] = type_doc["name"] if type_doc else ""
-        
-        # Position is now free text
-        w["position"] = w.get("position", "")
-        w["position_experience"] = w.get("position_experience", "")
-        
-        # Get tags
-        tag_ids = w.get("tag_ids", [])
-        tags = []
-        for tid in tag_ids:
-            tag = await db.tags.find_one({"id": tid}, {"_id": 0})
-            if tag:
-                tags.append(tag)
-        w["tags"] = tags
-        
-        # Get project statuses
-        project_workers = await db.project_workers.find(
-            {"worker_id": w["id"]}, {"_id": 0}
-        ).sort("updated_at", -1).to_list(100)
-        
-        project_statuses = []
-        for pw in project_workers:
-            project = await db.projects.find_one({"id": pw["project_id"]}, {"_id": 0})
-            status = await db.statuses.find_one({"id": pw.get("status_id")}, {"_id": 0})
-            if project:
-                project_statuses.append({
-                    "project_id": project["id"],
-                    "project_name": project["name"],
-                    "project_date": project.get("date", ""),
-                    "status_id": pw.get("status_id", ""),
-                    "status_name": status["name"] if status else "Hozzárendelve",
-                    "notes": pw.get("notes", ""),
-                    "updated_at": pw.get("updated_at", "")
-                })
-        w["project_statuses"] = project_statuses
-        
-        # Get owner name
-        owner = await db.users.find_one({"id": w.get("owner_id")}, {"_id": 0, "password": 0})
-        w["owner_name"] = owner.get("name", owner["email"]) if owner else ""
-        
-        result.append(WorkerResponse(**w))
-    
-    return result
+    return await enrich_workers(workers, include_archived)
+
+def worker_filters(user: dict, category, worker_type_id, tag_id, owner_id, status_id):
+    """(filters, scope) for the worker index"""
+    filters = {"category": category, "worker_type_id": worker_type_id, "tag_id": tag_id, "status_id": status_id}
+    if user["role"] == "admin":
+        return {**filters, "owner_id": owner_id}, {}
+    # Toborzó csak saját dolgozóit látja (a darabszámokban is)
+    return filters, {"owner_id": user["id"]}
+
+@api_router.get("/workers/facets")
+async def get_worker_facets(
+    category: Optional[str] = None,
+    worker_type_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    status_id: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=1000),
+    user: dict = Depends(get_current_user)
+):
+    """Találatok száma, egy oldalnyi dolgozó-azonosító és értékenkénti darabszámok minden szűrőre"""
+    if not WORKER_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="A dolgozó-index nincs bekapcsolva (WORKER_INDEX)")
+    index = await get_worker_index()
+    if index is None:
+        raise worker_index_building()
+    filters, scope = worker_filters(user, category, worker_type_id, tag_id, owner_id, status_id)
+    total, ids = index.search(filters, scope, offset, limit)
+    return {"total": total, "ids": ids, "facets": index.facets(filters, scope)}
 
 @api_router.get("/workers/{worker_id}", response_model=WorkerResponse)
-async def get_worker(worker_id: str, user: dict = Depends(get_current_user)):
+async def get_worker(worker_id: str, user: dict = Depends(get_current_user), include_archived: bool = False,
+                     request: Request = None, response: Response = None):
     query = {"id": worker_id}
     if user["role"] != "admin":
         query["owner_id"] = user["id"]
     
+    # Csak a verziót olvassuk, amíg el nem dől, hogy kell-e a teljes válasz
+    head, versions = await asyncio.gather(
+        db.workers.find_one(query, {"_id": 0, "id": 1, "version": 1}),
+        read_counters(PROJECTS_COUNTER, REFERENCE_COUNTER, "users")
+    )
+    if not head:
+        raise HTTPException(status_code=404, detail="Dolgozó nem található")
+    etag = make_etag("worker", worker_id, head.get("version", 0), include_archived, *versions)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    # Same payload for everyone allowed to see the worker; only the archive flag varies
+    entity, scope = response_entity("worker", worker_id), "archived" if include_archived else "hot"
+    cached = await response_cache.get(entity, scope, etag)
+    if cached is not None:
+        return WorkerResponse(**cached)
+    
     w = await db.workers.find_one(query, {"_id": 0})
     if not w:
         raise HTTPException(status_code=404, detail="Dolgozó nem található")
     
-    # Enrich
-    type_doc = await db.worker_types.find_one({"id": w.get("worker_type_id")}, {"_id": 0})
-    w["worker_type_name"] = type_doc["name"] if type_doc else ""
-    
-    # Position is now free text
-    w["position"] = w.get("position", "")
-    w["position_experience"] = w.get("position_experience", "")
-    
-    tag_ids = w.get("tag_ids", [])
-    tags = []
-    for tid in tag_ids:
-        tag = await db.tags.find_one({"id": tid}, {"_id": 0})
-        if tag:
-            tags.append(tag)
-    w["tags"] = tags
-    
-    project_workers = await db.project_workers.find(
-        {"worker_id": w["id"]}, {"_id": 0}
-    ).sort("updated_at", -1).to_list(100)
-    
-    project_statuses = []
-    for pw in project_workers:
-        project = await db.projects.find_one({"id": pw["project_id"]}, {"_id": 0})
-        status = await db.statuses.find_one({"id": pw.get("status_id")}, {"_id": 0})
-        if project:
-            project_statuses.append({
-                "project_id": project["id"],
-                "project_name": project["name"],
-                "project_date": project.get("date", ""),
-                "status_id": pw.get("status_id", ""),
-                "status_name": status["name"] if status else "Hozzárendelve",
-                "notes": pw.get("notes", ""),
-                "updated_at": pw.get("updated_at", "")
-            })
-    w["project_statuses"] = project_statuses
+    result = (await enrich_workers([w], include_archived))[0]
+    await response_cache.set(entity, scope, etag, result.model_dump(mode="json"))
+    return result
+
+HISTORY_PAGE_SIZE = 20
+PROBLEM_STATUSES = {"Nem jelent meg", "Nem felelt meg", "Lemondta"}
+
+def encode_history_cursor(pw: dict, archived: bool) -> str:
+    raw = json.dumps([archived, to_iso(pw.get("updated_at")), pw["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_history_cursor(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        archived, updated_at, pw_id = json.loads(raw)
+        return bool(archived), (parse_timestamp(updated_at) or updated_at, str(pw_id))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Érvénytelen lapozási token")
+
+async def history_rows(worker_id: str, archived: bool, after, limit: int) -> List[dict]:
+    """One page of a worker's assignments, newest first, keyset-paginated on (updated_at, id)"""
+    match = {"worker_id": worker_id}
+    if after:
+        updated_at, pw_id = after
+        match["$or"] = [{"updated_at": {"$lt": updated_at}}, {"updated_at": updated_at, "id": {"$lt": pw_id}}]
+    return await db["project_workers_archive" if archived else "project_workers"].aggregate([
+        {"$match": match},
+        {"$sort": {"updated_at": -1, "id": -1}},
+        {"$limit": limit},
+        {"$lookup": {"from": "projects_archive" if archived else "projects",
+                     "localField": "project_id", "foreignField": "id", "as": "project"}},
+        {"$lookup": {"from": "statuses", "localField": "status_id", "foreignField": "id", "as": "status"}},
+        {"$project": {"_id": 0, "id": 1, "project_id": 1, "status_id": 1, "notes": 1, "updated_at": 1,
+                      "project": {"$arrayElemAt": ["$project", 0]},
+                      "status_name": {"$arrayElemAt": ["$status.name", 0]}}}
+    ]).to_list(None)
+
+@api_router.get("/workers/{worker_id}/history", response_model=WorkerHistoryPage)
+async def get_worker_history(worker_id: str, limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=100),
+                             cursor: Optional[str] = None, include_archived: bool = False,
+                             user: dict = Depends(get_current_user)):
+    """Dolgozó projekt-előzményei, legújabb elöl, lapozva (next_cursor)"""
+    query = {"id": worker_id}
+    if user["role"] != "admin":
+        query["owner_id"] = user["id"]
+    if not await db.workers.find_one(query, {"_id": 0, "id": 1}):
+        raise HTTPException(status_code=404, detail="Dolgozó nem található")
     
-    owner = await db.users.find_one({"id": w.get("owner_id")}, {"_id": 0, "password": 0})
-    w["owner_name"] = owner.get("name", owner["email"]) if owner else ""
+    start_archived, after = decode_history_cursor(cursor) if cursor else (False, None)
+    # The hot assignments come first, then (if requested) the archived ones
+    rows = []
+    for archived in ([False, True] if include_archived else [False]):
+        if archived < start_archived or len(rows) > limit:
+            continue
+        page = await history_rows(worker_id, archived, after if archived == start_archived else None,
+                                  limit + 1 - len(rows))
+        rows.extend((pw, archived) for pw in page)
     
-    return WorkerResponse(**w)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [WorkerHistoryEntry(
+        project_id=pw["project_id"],
+        project_name=pw["project"]["name"],
+        project_date=to_date_str(pw["project"].get("date", "")),
+        status_id=pw.get("status_id", ""),
+        status_name=pw.get("status_name") or "Hozzárendelve",
+        notes=pw.get("notes", ""),
+        updated_at=to_iso(pw.get("updated_at", "")),
+        is_archived=archived
+    ) for pw, archived in rows if pw.get("project")]
+    problem_count = None if cursor else await count_problem_assignments(worker_id)
+    return WorkerHistoryPage(items=items, next_cursor=encode_history_cursor(*rows[-1]) if has_more else None,
+                             problem_count=problem_count)
+
+async def count_problem_assignments(worker_id: str) -> int:
+    """Assignments of the worker in a problem status (no-show, failed, cancelled),
+    archived ones included"""
+    status_ids = await db.statuses.distinct("id", {"name": {"$in": list(PROBLEM_STATUSES)}})
+    if not status_ids:
+        return 0
+    query = {"worker_id": worker_id, "status_id": {"$in": status_ids}}
+    counts = await asyncio.gather(db.project_workers.count_documents(query),
+                                  db.project_workers_archive.count_documents(query))
+    return sum(counts)
 
 @api_router.post("/workers", response_model=WorkerResponse)
 async def create_worker(data: WorkerCreate, user: dict = Depends(get_current_user)):
@@ -591,21 +2240,29 @@ async def create_worker(data: WorkerCreate, user: dict = Depends(get_current_use
         "position_experience": data.position_experience or "",
         "category": data.category,
         "address": data.address or "",
+        **geo_fields(data.address),
         "email": data.email or "",
         "experience": data.experience or "",
         "notes": data.notes or "",
         "tag_ids": [],
         "owner_id": user["id"],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": utc_now(),
+        "updated_at": utc_now(),
+        "version": 1,
+        "change_seq": await next_change_seq()
     }
     await db.workers.insert_one(worker_doc)
+    await record_changes(WORKERS_COUNTER)
+    await bump_recruiter_rollups(user["id"], {"workers_added": 1},
+                                 {"worker_count": 1, category_field(data.category): 1})
+    await sync_saved_searches(worker_doc)
     
     worker_doc["worker_type_name"] = ""
     worker_doc["tags"] = []
     worker_doc["project_statuses"] = []
     worker_doc["owner_name"] = user.get("name", user["email"])
     
-    return WorkerResponse(**worker_doc)
+    return WorkerResponse(**serialize_dates(worker_doc))
 
 @api_router.put("/workers/{worker_id}", response_model=WorkerResponse)
 async def update_worker(worker_id: str, data: WorkerUpdate, user: dict = Depends(get_current_user)):
@@ -618,20 +2275,45 @@ async def update_worker(worker_id: str, data: WorkerUpdate, user: dict = Depends
         raise HTTPException(status_code=404, detail="Dolgozó nem található")
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    if "address" in update_data:
+        update_data.update(geo_fields(update_data["address"]))
     if update_data:
-        await db.workers.update_one({"id": worker_id}, {"$set": update_data})
+        update_data["updated_at"] = utc_now()
+        update_data["change_seq"] = await next_change_seq()
+        await db.workers.update_one({"id": worker_id}, {"$set": update_data, "$inc": {"version": 1}})
+        await record_changes(WORKERS_COUNTER)
+        if update_data.get("category", worker["category"]) != worker["category"]:
+            await bump_recruiter_rollups(worker["owner_id"], {}, {
+                category_field(worker["category"]): -1, category_field(update_data["category"]): 1})
+        await invalidate_responses(workers=[worker_id])
+        await sync_saved_searches({**worker, **update_data})
     
     return await get_worker(worker_id, user)
 
 @api_router.delete("/workers/{worker_id}")
 async def delete_worker(worker_id: str, user: dict = Depends(require_admin)):
     """Csak admin törölhet"""
-    result = await db.workers.delete_one({"id": worker_id})
-    if result.deleted_count == 0:
+    worker = await db.workers.find_one_and_delete({"id": worker_id})
+    if not worker:
         raise HTTPException(status_code=404, detail="Dolgozó nem található")
+    await bump_recruiter_rollups(worker.get("owner_id", ""), {},
+                                 {"worker_count": -1, category_field(worker.get("category", "")): -1})
     
     # Töröljük a projekt kapcsolatokat is
-    await db.project_workers.delete_many({"worker_id": worker_id})
+    assignments = await db.project_workers.find(
+        {"worker_id": worker_id}, {"_id": 0, "id": 1, "project_id": 1}
+    ).to_list(None)
+    await asyncio.gather(
+        db.project_workers.delete_many({"worker_id": worker_id}),
+        db.project_workers_archive.delete_many({"worker_id": worker_id}),
+        db.worker_bookings.delete_many({"worker_id": worker_id})
+    )
+    await record_tombstones("worker", [(worker_id, [worker.get("owner_id", "")])])
+    await sync_saved_searches(worker, deleted=True)
+    await record_tombstones("assignment", [(a["id"], [worker.get("owner_id", "")]) for a in assignments])
+    await touch("projects", [a["project_id"] for a in assignments])
+    await record_changes(WORKERS_COUNTER, PROJECTS_COUNTER)
+    await invalidate_responses([a["project_id"] for a in assignments], [worker_id])
     
     return {"message": "Dolgozó törölve"}
 
@@ -645,10 +2327,16 @@ async def add_tag_to_worker(worker_id: str, tag_id: str, user: dict = Depends(ge
     if not worker:
         raise HTTPException(status_code=404, detail="Dolgozó nem található")
     
-    await db.workers.update_one(
+    updated = await db.workers.find_one_and_update(
         {"id": worker_id},
-        {"$addToSet": {"tag_ids": tag_id}}
+        {"$addToSet": {"tag_ids": tag_id}, "$inc": {"version": 1},
+         "$set": {"updated_at": utc_now(), "change_seq": await next_change_seq()}},
+        projection={"_id": 0}, return_document=ReturnDocument.AFTER
     )
+    await record_changes(WORKERS_COUNTER)
+    await invalidate_responses(workers=[worker_id])
+    if updated:
+        await sync_saved_searches(updated)
     return {"message": "Jellemző hozzáadva"}
 
 @api_router.delete("/workers/{worker_id}/tags/{tag_id}")
@@ -661,66 +2349,301 @@ async def remove_tag_from_worker(worker_id: str, tag_id: str, user: dict = Depen
     if not worker:
         raise HTTPException(status_code=404, detail="Dolgozó nem található")
     
-    await db.workers.update_one(
+    updated = await db.workers.find_one_and_update(
         {"id": worker_id},
-        {"$pull": {"tag_ids": tag_id}}
+        {"$pull": {"tag_ids": tag_id}, "$inc": {"version": 1},
+         "$set": {"updated_at": utc_now(), "change_seq": await next_change_seq()}},
+        projection={"_id": 0}, return_document=ReturnDocument.AFTER
     )
+    await record_changes(WORKERS_COUNTER)
+    await invalidate_responses(workers=[worker_id])
+    if updated:
+        await sync_saved_searches(updated)
     return {"message": "Jellemző eltávolítva"}
 
+# ==================== AVAILABILITY ====================
+
+# worker_bookings holds one row per (worker, project day) with an assignment:
+# {worker_id, date, project_id}. The unique (worker_id, date) index is the
+# double-booking check, so two concurrent assignments of one worker to
+# different projects on the same day cannot both succeed. Kept current by the
+# assignment, removal, project date change, delete and archive paths;
+# rebuild_worker_bookings() backfills it from project_workers.
+DUPLICATE_KEY = 11000
+# Extra workers read per availability page to cover the booked ones
+AVAILABILITY_PAGE_SLACK = 20
+
+async def book_workers(project: dict, worker_ids: List[str]) -> List[str]:
+    """Book the workers for the project's day. Returns the ids already booked
+    on another project that day; those are left unbooked."""
+    if not worker_ids:
+        return []
+    now = utc_now()
+    try:
+        await db.worker_bookings.bulk_write([UpdateOne(
+            {"worker_id": worker_id, "date": project["date"], "project_id": project["id"]},
+            {"$setOnInsert": {"created_at": now}},
+            upsert=True
+        ) for worker_id in worker_ids], ordered=False)
+    except BulkWriteError as e:
+        errors = e.details["writeErrors"]
+        if any(err["code"] != DUPLICATE_KEY for err in errors):
+            raise
+        return [worker_ids[err["index"]] for err in errors]
+    return []
+
+async def release_bookings(project: dict, worker_ids: List[str]) -> None:
+    """Undo book_workers when the assignments could not be written"""
+    if worker_ids:
+        await db.worker_bookings.delete_many(
+            {"worker_id": {"$in": worker_ids}, "date": project["date"], "project_id": project["id"]})
+
+async def booking_conflicts(date: datetime, worker_ids: List[str], project_id: str) -> List[dict]:
+    """Who of these workers is booked on another project that day, and where"""
+    bookings = await db.worker_bookings.find(
+        {"worker_id": {"$in": worker_ids}, "date": date, "project_id": {"$ne": project_id}}, {"_id": 0}
+    ).to_list(None)
+    projects = await get_loaders().projects.load_many([b["project_id"] for b in bookings])
+    return [{"worker_id": b["worker_id"], "project_id": b["project_id"], "project_name": p["name"] if p else ""}
+            for b, p in zip(bookings, projects)]
+
+async def move_bookings(project: dict, date: datetime) -> None:
+    """Project date change: the whole roster moves, or nothing does (409).
+    The caller moves them back with restore_bookings if the project write fails."""
+    worker_ids = await db.worker_bookings.distinct("worker_id", {"project_id": project["id"]})
+    conflicts = await booking_conflicts(date, worker_ids, project["id"])
+    if conflicts:
+        raise HTTPException(status_code=409,
+                            detail=f"Az új napon {len(conflicts)} dolgozó már másik projekten dolgozik")
+    try:
+        await db.worker_bookings.update_many({"project_id": project["id"]}, {"$set": {"date": date}})
+    except DuplicateKeyError:
+        # A worker was booked on the new day after the check; update_many may
+        # have moved part of the roster already
+        await restore_bookings(project)
+        raise HTTPException(status_code=409, detail="Az új napon egy dolgozó időközben másik projektre került")
+
+async def restore_bookings(project: dict) -> None:
+    """Put the project's bookings back on its stored date"""
+    await db.worker_bookings.update_many({"project_id": project["id"], "date": {"$ne": project["date"]}},
+                                         {"$set": {"date": project["date"]}})
+
+async def rebuild_worker_bookings() -> dict:
+    """Recompute worker_bookings from the projects and their assignments
+    (backfill / repair job). Existing double bookings are reported, not fixed."""
+    await db.worker_bookings.delete_many({})
+    report = {"bookings": 0, "conflicts": []}
+    async for project in db.projects.find({}, {"_id": 0, "id": 1, "date": 1}).sort("date", 1):
+        worker_ids = await db.project_workers.distinct("worker_id", {"project_id": project["id"]})
+        clashes = await book_workers(project, worker_ids)
+        report["bookings"] += len(worker_ids) - len(clashes)
+        report["conflicts"] += [{"worker_id": w, "project_id": project["id"], "date": to_date_str(project["date"])}
+                                for w in clashes]
+    return report
+
+@api_router.get("/availability", response_model=List[WorkerResponse])
+async def get_availability(
+    date: str,
+    worker_type_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_archived: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    """Az adott napon egy projektre sem beosztott dolgozók, legújabb elöl"""
+    day = parse_project_date(date)
+    query = {}
+    # Toborzó csak saját dolgozóit látja
+    if user["role"] != "admin":
+        query["owner_id"] = user["id"]
+    if worker_type_id:
+        query["worker_type_id"] = worker_type_id
+    # Pages of the newest workers from the (worker_type_id | owner_id, created_at)
+    # index, each checked against that day's bookings by worker id. At most
+    # limit + (bookings on that day) workers are read.
+    free, after = [], None
+    while len(free) < limit:
+        page_query = dict(query)
+        if after:
+            page_query["$or"] = [{"created_at": {"$lt": after[0]}},
+                                 {"created_at": after[0], "id": {"$lt": after[1]}}]
+        page = await db.workers.find(page_query, {"_id": 0}).sort(
+            [("created_at", -1), ("id", -1)]).limit(limit - len(free) + AVAILABILITY_PAGE_SLACK).to_list(None)
+        if not page:
+            break
+        booked = set(await db.worker_bookings.distinct(
+            "worker_id", {"worker_id": {"$in": [w["id"] for w in page]}, "date": day}))
+        free.extend(w for w in page if w["id"] not in booked)
+        after = (page[-1]["created_at"], page[-1]["id"])
+    return await enrich_workers(free[:limit], include_archived)
+
 # ==================== PROJECTS ====================
 
+async def assignment_counts(project_ids: List[str], collection: str = "project_workers") -> dict:
+    if not project_ids:
+        return {}
+    rows = await db[collection].aggregate([
+        {"$match": {"project_id": {"$in": project_ids}}},
+        {"$group": {"_id": "$project_id", "count": {"$sum": 1}}}
+    ]).to_list(None)
+    return {r["_id"]: r["count"] for r in rows}
+
+async def build_project_response(p: dict, worker_count: int) -> ProjectResponse:
+    recruiter_ids = p.get("recruiter_ids", [])
+    owner_id = p.get("owner_id", "")
+    recruiters, owner_name = await asyncio.gather(load_recruiters(recruiter_ids), load_owner_name(owner_id))
+    return ProjectResponse(
+        id=p["id"],
+        name=p["name"],
+        date=to_date_str(p["date"]),
+        location=p.get("location", ""),
+        notes=p.get("notes", ""),
+        is_closed=p.get("is_closed", False),
+        worker_count=worker_count,
+        expected_workers=p.get("expected_workers", 0),
+        recruiter_ids=recruiter_ids,
+        recruiters=recruiters,
+        owner_id=owner_id,
+        owner_name=owner_name,
+        created_at=to_iso(p.get("created_at", "")),
+        updated_at=to_iso(p.get("updated_at", "")),
+        version=p.get("version", 0),
+        is_archived=p.get("is_archived", False)
+    )
+
 @api_router.get("/projects", response_model=List[ProjectResponse])
-async def get_projects(user: dict = Depends(get_current_user)):
+async def get_projects(include_archived: bool = False, user: dict = Depends(get_current_user),
+                       request: Request = None, response: Response = None):
     """Toborzó csak azokat a projekteket látja, ahol ő hozta létre VAGY hozzá van rendelve"""
-    projects = await db.projects.find({}, {"_id": 0}).sort("date", -1).to_list(1000)
+    versions = await read_counters(PROJECTS_COUNTER, "users")
+    etag = make_etag("projects", user["id"], user["role"], include_archived, *versions)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    result = []
-    for p in projects:
-        count = await db.project_workers.count_documents({"project_id": p["id"]})
-        
-        recruiter_ids = p.get("recruiter_ids", [])
-        owner_id = p.get("owner_id", "")
+    async def load(projects_coll: str, assignments_coll: str) -> List[dict]:
+        projects = await db[projects_coll].find({}, {"_id": 0}).sort("date", -1).to_list(1000)
         
         # Ha toborzó, csak azokat mutassa ahol ő hozta létre VAGY hozzá van rendelve
         if user["role"] != "admin":
-            if owner_id != user["id"] and user["id"] not in recruiter_ids:
-                continue
-        
-        # Get recruiter names
-        recruiters = []
-        for rid in recruiter_ids:
-            r = await db.users.find_one({"id": rid}, {"_id": 0, "password": 0})
-            if r:
-                recruiters.append({"id": r["id"], "name": r.get("name", r["email"]), "email": r["email"]})
-        
-        # Get owner name
-        owner_name = ""
-        if owner_id:
-            owner = await db.users.find_one({"id": owner_id}, {"_id": 0, "password": 0})
-            if owner:
-                owner_name = owner.get("name", owner["email"])
-        
-        result.append(ProjectResponse(
-            id=p["id"],
-            name=p["name"],
-            date=p["date"],
-            location=p.get("location", ""),
-            notes=p.get("notes", ""),
-            is_closed=p.get("is_closed", False),
-            worker_count=count,
-            expected_workers=p.get("expected_workers", 0),
-            recruiter_ids=recruiter_ids,
-            recruiters=recruiters,
-            owner_id=owner_id,
-            owner_name=owner_name,
-            created_at=p.get("created_at", "")
-        ))
+            projects = [p for p in projects
+                        if p.get("owner_id", "") == user["id"] or user["id"] in p.get("recruiter_ids", [])]
+        counts.update(await assignment_counts([p["id"] for p in projects], assignments_coll))
+        return projects
     
-    return result
+    counts = {}
+    projects = await load("projects", "project_workers")
+    if include_archived:
+        for p in await load("projects_archive", "project_workers_archive"):
+            p["is_archived"] = True
+            projects.append(p)
+        projects.sort(key=lambda p: to_date_str(p["date"]), reverse=True)
+    
+    return list(await asyncio.gather(*(build_project_response(p, counts.get(p["id"], 0)) for p in projects)))
+
+async def build_roster_entry(pw: dict, w: dict) -> dict:
+    """One row of a project's roster (also pushed as-is in worker_added events)"""
+    loaders = get_loaders()
+    status, type_doc, owner = await asyncio.gather(
+        loaders.statuses.load(pw.get("status_id")),
+        loaders.worker_types.load(w.get("worker_type_id")),
+        resolve_users([w.get("owner_id")])
+    )
+    return {
+        "id": w["id"],
+        "name": w["name"],
+        "phone": w["phone"],
+        "category": w["category"],
+        "worker_type_name": type_doc["name"] if type_doc else "",
+        "status_id": pw.get("status_id", ""),
+        "status_name": status["name"] if status else "Hozzárendelve",
+        "notes": pw.get("notes", ""),
+        "added_by": user_display_name(owner[0]),
+        "added_at": to_iso(pw.get("created_at", ""))
+    }
+
+CALENDAR_MAX_DAYS = 366
+
+@api_router.get("/projects/calendar")
+async def get_project_calendar(from_date: Optional[str] = Query(None, alias="from"),
+                               to_date: Optional[str] = Query(None, alias="to"),
+                               user: dict = Depends(get_current_user),
+                               request: Request = None, response: Response = None):
+    """Napi bontás a [from, to] intervallumra: várt és beosztott létszám projektenként"""
+    today = utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = parse_project_date(from_date) if from_date else today.replace(day=1)
+    if to_date:
+        end = parse_project_date(to_date)
+    else:
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    if end < start:
+        raise HTTPException(status_code=400, detail="A 'to' dátum nem lehet korábbi a 'from' dátumnál")
+    if (end - start).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Legfeljebb {CALENDAR_MAX_DAYS} napos intervallum kérhető")
+    
+    versions = await read_counters(PROJECTS_COUNTER)
+    etag = make_etag("calendar", start.date(), end.date(), user["id"], user["role"], *versions)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    match = {"date": {"$gte": start, "$lt": end + timedelta(days=1)}}
+    if user["role"] != "admin":
+        match["$or"] = [{"owner_id": user["id"]}, {"recruiter_ids": user["id"]}]
+    # Archived projects are all in the past, so only past ranges read the archive
+    sources = [("projects", "project_workers", False)]
+    if start < utc_now():
+        sources.append(("projects_archive", "project_workers_archive", True))
+    results = await asyncio.gather(*(calendar_days(match, *source) for source in sources))
+    
+    days = {}
+    for rows in results:
+        for r in rows:
+            day = days.setdefault(r["_id"], {"date": r["_id"], "expected": 0, "assigned": 0, "projects": []})
+            day["expected"] += r["expected"]
+            day["assigned"] += r["assigned"]
+            day["projects"].extend(r["projects"])
+    if len(results) > 1:
+        for day in days.values():
+            day["projects"].sort(key=lambda p: p["name"])
+    return {
+        "from": start.date().isoformat(),
+        "to": end.date().isoformat(),
+        "days": [days[d] for d in sorted(days)]
+    }
+
+async def calendar_days(match: dict, collection: str, assignments: str, archived: bool) -> List[dict]:
+    """Per-day expected/assigned headcount and projects of one project collection"""
+    return await db[collection].aggregate([
+        {"$match": match},
+        {"$lookup": {"from": assignments, "localField": "id", "foreignField": "project_id", "as": "assigned"}},
+        {"$project": {"_id": 0, "id": 1, "name": 1, "location": 1, "date": 1, "is_closed": 1,
+                      "expected_workers": {"$ifNull": ["$expected_workers", 0]},
+                      "worker_count": {"$size": "$assigned"}}},
+        {"$sort": {"date": 1, "name": 1}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+            "expected": {"$sum": "$expected_workers"},
+            "assigned": {"$sum": "$worker_count"},
+            "projects": {"$push": {"id": "$id", "name": "$name", "location": "$location",
+                                   "is_closed": "$is_closed", "expected_workers": "$expected_workers",
+                                   "worker_count": "$worker_count", "archived": {"$literal": archived}}}
+        }},
+        {"$sort": {"_id": 1}}
+    ]).to_list(None)
 
 @api_router.get("/projects/{project_id}")
-async def get_project(project_id: str, user: dict = Depends(get_current_user)):
-    p = await db.projects.find_one({"id": project_id}, {"_id": 0})
+async def get_project(project_id: str, user: dict = Depends(get_current_user),
+                      request: Request = None, response: Response = None):
+    loaders = get_loaders()
+    p, versions = await asyncio.gather(
+        loaders.projects.load(project_id),
+        read_counters(WORKERS_COUNTER, REFERENCE_COUNTER, "users")
+    )
+    # Archivált projekt közvetlen hivatkozással továbbra is megnyitható (csak olvasásra)
+    archived = False
+    if not p:
+        p = await loaders.archived_projects.load(project_id)
+        archived = p is not None
     if not p:
         raise HTTPException(status_code=404, detail="Projekt nem található")
     
@@ -730,52 +2653,47 @@ async def get_project(project_id: str, user: dict = Depends(get_current_user)):
     if user["role"] != "admin" and owner_id != user["id"] and user["id"] not in recruiter_ids:
         raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
     
-    # Get workers
-    pw_list = await db.project_workers.find({"project_id": project_id}, {"_id": 0}).to_list(1000)
-    
-    workers = []
-    for pw in pw_list:
-        w = await db.workers.find_one({"id": pw["worker_id"]}, {"_id": 0})
-        if w:
-            # Toborzó csak saját dolgozóit látja a projektben
-            if user["role"] != "admin" and w.get("owner_id") != user["id"]:
-                continue
-            status = await db.statuses.find_one({"id": pw.get("status_id")}, {"_id": 0})
-            type_doc = await db.worker_types.find_one({"id": w.get("worker_type_id")}, {"_id": 0})
-            owner = await db.users.find_one({"id": w.get("owner_id")}, {"_id": 0, "password": 0})
-            workers.append({
-                "id": w["id"],
-                "name": w["name"],
-                "phone": w["phone"],
-                "category": w["category"],
-                "worker_type_name": type_doc["name"] if type_doc else "",
-                "status_id": pw.get("status_id", ""),
-                "status_name": status["name"] if status else "Hozzárendelve",
-                "notes": pw.get("notes", ""),
-                "added_by": owner.get("name", owner["email"]) if owner else "",
-                "added_at": pw.get("created_at", "")
-            })
+    # A névsor toborzónként szűrt, ezért a felhasználó is része az ETag-nek
+    etag = make_etag("project", project_id, p.get("version", 0), user["id"], user["role"], *versions)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    total_count = await db.project_workers.count_documents({"project_id": project_id})
+    # Adminok ugyanazt a teljes névsort látják, toborzók a sajátjukat
+    entity = response_entity("project", project_id)
+    scope = "admin" if user["role"] == "admin" else f"recruiter:{user['id']}"
+    fingerprint = make_etag(project_id, p.get("version", 0), archived, *versions)
+    cached = await response_cache.get(entity, scope, fingerprint)
+    if cached is not None:
+        return cached
     
-    # Get recruiter names
-    recruiters = []
-    for rid in recruiter_ids:
-        r = await db.users.find_one({"id": rid}, {"_id": 0, "password": 0})
-        if r:
-            recruiters.append({"id": r["id"], "name": r.get("name", r["email"]), "email": r["email"]})
+    # Get workers
+    assignments = db.project_workers_archive if archived else db.project_workers
+    pw_list = await assignments.find({"project_id": project_id}, {"_id": 0}).to_list(1000)
     
-    # Get owner name
-    owner_name = ""
-    if owner_id:
-        owner = await db.users.find_one({"id": owner_id}, {"_id": 0, "password": 0})
-        if owner:
-            owner_name = owner.get("name", owner["email"])
+    async def roster_entry(pw: dict) -> Optional[dict]:
+        w = await loaders.workers.load(pw["worker_id"])
+        if not w:
+            return None
+        # Toborzó csak saját dolgozóit látja a projektben
+        if user["role"] != "admin" and w.get("owner_id") != user["id"]:
+            return None
+        return await build_roster_entry(pw, w)
     
-    return {
+    entries, recruiters, owner_name = await asyncio.gather(
+        asyncio.gather(*(roster_entry(pw) for pw in pw_list)),
+        load_recruiters(recruiter_ids),
+        load_owner_name(owner_id)
+    )
+    workers = [e for e in entries if e]
+    total_count = len(pw_list)
+    if total_count >= 1000:
+        total_count = await assignments.count_documents({"project_id": project_id})
+    
+    result = {
         "id": p["id"],
         "name": p["name"],
-        "date": p["date"],
+        "date": to_date_str(p["date"]),
         "location": p.get("location", ""),
         "notes": p.get("notes", ""),
         "is_closed": p.get("is_closed", False),
@@ -786,8 +2704,90 @@ async def get_project(project_id: str, user: dict = Depends(get_current_user)):
         "owner_id": owner_id,
         "owner_name": owner_name,
         "workers": workers,
-        "created_at": p.get("created_at", "")
+        "created_at": to_iso(p.get("created_at", "")),
+        "updated_at": to_iso(p.get("updated_at", "")),
+        "version": p.get("version", 0),
+        "is_archived": archived
     }
+    await response_cache.set(entity, scope, fingerprint, result)
+    return result
+
+@api_router.get("/projects/{project_id}/nearby-workers", response_model=List[NearbyWorkerResponse])
+async def get_nearby_workers(
+    project_id: str,
+    radius_km: float = Query(NEARBY_DEFAULT_RADIUS_KM, gt=0, le=500),
+    category: Optional[str] = None,
+    worker_type_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_archived: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    """Dolgozók a projekt helyszínétől adott távolságon belül, a legközelebbi elöl"""
+    p = await get_loaders().projects.load(project_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Projekt nem található")
+    if user["role"] != "admin" and p.get("owner_id") != user["id"] and user["id"] not in p.get("recruiter_ids", []):
+        raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
+    if not p.get("geo"):
+        raise HTTPException(status_code=400, detail="A projekt helyszíne nem azonosítható (település a helyszínben)")
+    
+    query = {}
+    # Toborzó csak saját dolgozóit látja
+    if user["role"] != "admin":
+        query["owner_id"] = user["id"]
+    if category:
+        query["category"] = category
+    if worker_type_id:
+        query["worker_type_id"] = worker_type_id
+    if tag_id:
+        query["tag_ids"] = tag_id
+    rows = await db.workers.aggregate([
+        {"$geoNear": {"near": p["geo"], "key": "geo", "distanceField": "distance_m",
+                      "maxDistance": radius_km * 1000, "query": query, "spherical": True}},
+        {"$limit": limit},
+        {"$project": {"_id": 0}}
+    ]).to_list(None)
+    workers = await enrich_workers([dict(r) for r in rows], include_archived)
+    return [NearbyWorkerResponse(**w.model_dump(), distance_km=round(r["distance_m"] / 1000, 1),
+                                 geo_place=r.get("geo_place", "")) for w, r in zip(workers, rows)]
+
+@api_router.get("/projects/{project_id}/candidates", response_model=List[CandidateResponse])
+async def get_project_candidates(
+    project_id: str,
+    worker_type_id: Optional[str] = None,
+    position: Optional[str] = None,
+    tag_id: List[str] = Query([]),
+    limit: int = Query(50, ge=1, le=500),
+    include_archived: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    """Javasolt dolgozók a projektre: típus/pozíció egyezés, jellemzők, korábbi
+    kimenetelek (megfelelt / nem jelent meg) és frissesség alapján pontozva.
+    Aki már a projekten van vagy aznap másik projekten dolgozik, kimarad."""
+    if np is None:
+        raise HTTPException(status_code=503, detail="A pontozáshoz szükséges numpy nincs telepítve")
+    p = await get_loaders().projects.load(project_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Projekt nem található")
+    if user["role"] != "admin" and p.get("owner_id") != user["id"] and user["id"] not in p.get("recruiter_ids", []):
+        raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
+    
+    # Aznap bárhova (erre a projektre is) beosztott dolgozók kimaradnak
+    index, booked = await asyncio.gather(
+        get_worker_index(),
+        db.worker_bookings.distinct("worker_id", {"date": p["date"]})
+    )
+    if index is None:
+        raise worker_index_building()
+    # Toborzó csak saját dolgozói közül kap javaslatot
+    scope = {"owner_id": user["id"]} if user["role"] != "admin" else None
+    criteria = {"worker_type_id": worker_type_id, "position": position, "tag_ids": tag_id}
+    ids, scores, breakdown = index.rank(criteria, scope, booked, limit)
+    docs = {w["id"]: w for w in await db.workers.find({"id": {"$in": ids}}, {"_id": 0}).to_list(None)}
+    ranked = [(docs[i], s, b) for i, s, b in zip(ids, scores, breakdown) if i in docs]
+    workers = await enrich_workers([d for d, _, _ in ranked], include_archived)
+    return [CandidateResponse(**w.model_dump(), score=s, score_breakdown=b) for w, (_, s, b) in zip(workers, ranked)]
 
 @api_router.post("/projects", response_model=ProjectResponse)
 async def create_project(data: ProjectCreate, user: dict = Depends(require_admin)):
@@ -795,19 +2795,24 @@ async def create_project(data: ProjectCreate, user: dict = Depends(require_admin
     project_doc = {
         "id": str(uuid.uuid4()),
         "name": data.name,
-        "date": data.date,
+        "date": parse_project_date(data.date),
         "location": data.location or "",
+        **geo_fields(data.location),
         "notes": data.notes or "",
         "expected_workers": data.expected_workers,
         "recruiter_ids": data.recruiter_ids,  # Hozzárendelt toborzók
         "is_closed": False,
         "owner_id": user["id"],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": utc_now(),
+        "updated_at": utc_now(),
+        "version": 1,
+        "change_seq": await next_change_seq()
     }
     await db.projects.insert_one(project_doc)
+    await record_changes(PROJECTS_COUNTER)
     
     owner_name = user.get("name", user["email"])
-    return ProjectResponse(**project_doc, worker_count=0, recruiters=[], owner_name=owner_name)
+    return ProjectResponse(**serialize_dates(project_doc), worker_count=0, recruiters=[], owner_name=owner_name)
 
 @api_router.put("/projects/{project_id}", response_model=ProjectResponse)
 async def update_project(project_id: str, data: ProjectUpdate, user: dict = Depends(get_current_user)):
@@ -816,28 +2821,37 @@ async def update_project(project_id: str, data: ProjectUpdate, user: dict = Depe
         raise HTTPException(status_code=404, detail="Projekt nem található")
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    if "date" in update_data:
+        update_data["date"] = parse_project_date(update_data["date"])
+        if update_data["date"] != project["date"]:
+            await move_bookings(project, update_data["date"])
+    if "location" in update_data:
+        update_data.update(geo_fields(update_data["location"]))
     if update_data:
-        await db.projects.update_one({"id": project_id}, {"$set": update_data})
+        update_data["updated_at"] = utc_now()
+        try:
+            update_data["change_seq"] = await next_change_seq()
+            await db.projects.update_one({"id": project_id}, {"$set": update_data, "$inc": {"version": 1}})
+        except Exception:
+            if "date" in update_data:
+                await restore_bookings(project)
+            raise
+        await record_changes(PROJECTS_COUNTER)
+        # Akik kikerültek a toborzók közül, azoknak a projekt "törlődik"
+        dropped = set(project.get("recruiter_ids", [])) - set(update_data.get("recruiter_ids", project.get("recruiter_ids", [])))
+        dropped.discard(project.get("owner_id", ""))
+        if dropped:
+            await record_tombstones("project", [(project_id, sorted(dropped))])
+        await invalidate_responses([project_id])
     
     updated = await db.projects.find_one({"id": project_id}, {"_id": 0})
-    count = await db.project_workers.count_documents({"project_id": project_id})
-    
-    # Get recruiters
-    recruiters = []
-    for rid in updated.get("recruiter_ids", []):
-        r = await db.users.find_one({"id": rid}, {"_id": 0, "password": 0})
-        if r:
-            recruiters.append({"id": r["id"], "name": r.get("name", r["email"]), "email": r["email"]})
-    
-    # Get owner name
-    owner_name = ""
-    owner_id = updated.get("owner_id", "")
-    if owner_id:
-        owner = await db.users.find_one({"id": owner_id}, {"_id": 0, "password": 0})
-        if owner:
-            owner_name = owner.get("name", owner["email"])
+    count, recruiters, owner_name = await asyncio.gather(
+        db.project_workers.count_documents({"project_id": project_id}),
+        load_recruiters(updated.get("recruiter_ids", [])),
+        load_owner_name(updated.get("owner_id", ""))
+    )
     
-    return ProjectResponse(**updated, worker_count=count, recruiters=recruiters, owner_name=owner_name)
+    return ProjectResponse(**serialize_dates(updated), worker_count=count, recruiters=recruiters, owner_name=owner_name)
 
 @api_router.post("/projects/{project_id}/recruiters")
 async def add_recruiter_to_project(project_id: str, data: ProjectRecruiterAdd, user: dict = Depends(require_admin)):
@@ -852,29 +2866,48 @@ async def add_recruiter_to_project(project_id: str, data: ProjectRecruiterAdd, u
     
     await db.projects.update_one(
         {"id": project_id},
-        {"$addToSet": {"recruiter_ids": data.user_id}}
+        {"$addToSet": {"recruiter_ids": data.user_id}, "$inc": {"version": 1},
+         "$set": {"updated_at": utc_now(), "change_seq": await next_change_seq()}}
     )
+    await record_changes(PROJECTS_COUNTER)
+    await invalidate_responses([project_id])
     return {"message": "Toborzó hozzárendelve a projekthez"}
 
 @api_router.delete("/projects/{project_id}/recruiters/{user_id}")
 async def remove_recruiter_from_project(project_id: str, user_id: str, user: dict = Depends(require_admin)):
     """Admin eltávolít egy toborzót a projektből"""
-    result = await db.projects.update_one(
+    project = await db.projects.find_one_and_update(
         {"id": project_id},
-        {"$pull": {"recruiter_ids": user_id}}
+        {"$pull": {"recruiter_ids": user_id}, "$inc": {"version": 1},
+         "$set": {"updated_at": utc_now(), "change_seq": await next_change_seq()}}
     )
-    if result.matched_count == 0:
+    if not project:
         raise HTTPException(status_code=404, detail="Projekt nem található")
+    if user_id in project.get("recruiter_ids", []) and user_id != project.get("owner_id"):
+        await record_tombstones("project", [(project_id, [user_id])])
+    await record_changes(PROJECTS_COUNTER)
+    await invalidate_responses([project_id])
     return {"message": "Toborzó eltávolítva a projektről"}
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str, user: dict = Depends(require_admin)):
     """Csak admin törölhet projektet"""
-    result = await db.projects.delete_one({"id": project_id})
-    if result.deleted_count == 0:
+    project = await db.projects.find_one_and_delete({"id": project_id})
+    if not project:
         raise HTTPException(status_code=404, detail="Projekt nem található")
     
-    await db.project_workers.delete_many({"project_id": project_id})
+    assignments = await db.project_workers.find(
+        {"project_id": project_id}, {"_id": 0, "id": 1, "worker_id": 1}
+    ).to_list(None)
+    await asyncio.gather(
+        db.project_workers.delete_many({"project_id": project_id}),
+        db.worker_bookings.delete_many({"project_id": project_id})
+    )
+    await record_tombstones("project", [(project_id, project_audience(project))])
+    await assignment_tombstones(assignments)
+    await touch("workers", [a["worker_id"] for a in assignments])
+    await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+    await invalidate_responses([project_id], [a["worker_id"] for a in assignments])
     return {"message": "Projekt törölve"}
 
 @api_router.post("/projects/{project_id}/workers")
@@ -893,27 +2926,121 @@ async def add_worker_to_project(project_id: str, data: ProjectWorkerAdd, user: d
     })
     if existing:
         raise HTTPException(status_code=400, detail="Dolgozó már hozzá van rendelve")
+    if await book_workers(project, [data.worker_id]):
+        conflicts = await booking_conflicts(project["date"], [data.worker_id], project_id)
+        where = conflicts[0]["project_name"] if conflicts else ""
+        raise HTTPException(status_code=409, detail=f"A dolgozó ezen a napon már be van osztva: {where}".rstrip(": "))
     
-    pw_doc = {
-        "id": str(uuid.uuid4()),
-        "project_id": project_id,
-        "worker_id": data.worker_id,
-        "status_id": data.status_id or "",
-        "added_by": user["id"],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.project_workers.insert_one(pw_doc)
+    try:
+        pw_doc = {
+            "id": str(uuid.uuid4()),
+            "project_id": project_id,
+            "worker_id": data.worker_id,
+            "status_id": data.status_id or "",
+            "added_by": user["id"],
+            "created_at": utc_now(),
+            "updated_at": utc_now(),
+            "status_since": utc_now(),
+            "change_seq": await next_change_seq()
+        }
+        await db.project_workers.insert_one(pw_doc)
+    except Exception:
+        await release_bookings(project, [data.worker_id])
+        raise
+    await record_transition(project_id, data.worker_id, None, pw_doc["status_id"], None, user["id"])
+    await asyncio.gather(touch("projects", [project_id]), touch("workers", [data.worker_id]))
+    await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+    await invalidate_responses([project_id], [data.worker_id])
+    await event_hub.publish(project_channel(project_id), {
+        "type": "worker_added", "project_id": project_id, "owner_id": worker.get("owner_id", ""),
+        "worker": await build_roster_entry(pw_doc, worker)
+    })
     return {"message": "Dolgozó hozzáadva a projekthez"}
 
+@api_router.post("/projects/{project_id}/workers/bulk")
+async def add_workers_to_project(project_id: str, data: ProjectWorkersBulkAdd, user: dict = Depends(get_current_user)):
+    """Több dolgozó hozzárendelése egyszerre; aki aznap már máshol dolgozik, kimarad"""
+    project = await db.projects.find_one({"id": project_id})
+    if not project:
+        raise HTTPException(status_code=404, detail="Projekt nem található")
+    if (user["role"] != "admin" and project.get("owner_id") != user["id"]
+            and user["id"] not in project.get("recruiter_ids", [])):
+        raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
+    
+    worker_ids = list(dict.fromkeys(data.worker_ids))
+    # Toborzó csak a saját dolgozóit adhatja hozzá; a többi not_found
+    worker_query = {"id": {"$in": worker_ids}}
+    if user["role"] != "admin":
+        worker_query["owner_id"] = user["id"]
+    workers, existing = await asyncio.gather(
+        db.workers.find(worker_query, {"_id": 0}).to_list(None),
+        db.project_workers.distinct("worker_id", {"project_id": project_id, "worker_id": {"$in": worker_ids}})
+    )
+    found = {w["id"]: w for w in workers}
+    candidates = [w for w in worker_ids if w in found and w not in existing]
+    clashes = await book_workers(project, candidates)
+    conflicts = await booking_conflicts(project["date"], clashes, project_id) if clashes else []
+    added = [w for w in candidates if w not in set(clashes)]
+    
+    pw_docs = []
+    try:
+        for worker_id in added:
+            pw_docs.append({
+                "id": str(uuid.uuid4()),
+                "project_id": project_id,
+                "worker_id": worker_id,
+                "status_id": data.status_id or "",
+                "added_by": user["id"],
+                "created_at": utc_now(),
+                "updated_at": utc_now(),
+                "status_since": utc_now(),
+                "change_seq": await next_change_seq()
+            })
+        if pw_docs:
+            await db.project_workers.insert_many(pw_docs)
+    except Exception:
+        written = await db.project_workers.distinct("worker_id", {"project_id": project_id, "worker_id": {"$in": added}})
+        await release_bookings(project, [w for w in added if w not in written])
+        raise
+    if pw_docs:
+        for pw_doc in pw_docs:
+            await record_transition(project_id, pw_doc["worker_id"], None, pw_doc["status_id"], None, user["id"])
+        await asyncio.gather(touch("projects", [project_id]), touch("workers", added))
+        await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+        await invalidate_responses([project_id], added)
+        for pw_doc in pw_docs:
+            worker = found[pw_doc["worker_id"]]
+            await event_hub.publish(project_channel(project_id), {
+                "type": "worker_added", "project_id": project_id, "owner_id": worker.get("owner_id", ""),
+                "worker": await build_roster_entry(pw_doc, worker)
+            })
+    return {
+        "added": added,
+        "already_assigned": [w for w in worker_ids if w in found and w in existing],
+        "conflicts": conflicts,
+        "not_found": [w for w in worker_ids if w not in found]
+    }
+
 @api_router.delete("/projects/{project_id}/workers/{worker_id}")
 async def remove_worker_from_project(project_id: str, worker_id: str, user: dict = Depends(get_current_user)):
-    result = await db.project_workers.delete_one({
+    removed = await db.project_workers.find_one_and_delete({
         "project_id": project_id,
         "worker_id": worker_id
     })
-    if result.deleted_count == 0:
+    if not removed:
         raise HTTPException(status_code=404, detail="Kapcsolat nem található")
+    await db.worker_bookings.delete_one({"project_id": project_id, "worker_id": worker_id})
+    await assignment_tombstones([removed])
+    await record_transition(project_id, worker_id, removed.get("status_id", ""), REMOVED_STAGE,
+                            status_entered_at(removed), user["id"])
+    await asyncio.gather(touch("projects", [project_id]), touch("workers", [worker_id]))
+    await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+    await invalidate_responses([project_id], [worker_id])
+    worker = await get_loaders().workers.load(worker_id)
+    await event_hub.publish(project_channel(project_id), {
+        "type": "worker_removed", "project_id": project_id, "worker_id": worker_id,
+        "owner_id": worker.get("owner_id", "") if worker else ""
+    })
     return {"message": "Dolgozó eltávolítva a projektről"}
 
 @api_router.put("/projects/{project_id}/workers/{worker_id}/status")
@@ -925,23 +3052,719 @@ async def update_worker_status_in_project(
 ):
     update_fields = {
         "status_id": data.status_id,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": utc_now(),
+        "change_seq": await next_change_seq()
     }
     if data.notes is not None:
         update_fields["notes"] = data.notes
     
-    result = await db.project_workers.update_one(
+    # Pipeline update: status_since moves only when the status really changes,
+    # decided on the stored document in the same write
+    previous = await db.project_workers.find_one_and_update(
         {"project_id": project_id, "worker_id": worker_id},
-        {"$set": update_fields}
+        [{"$set": {
+            **{field: {"$literal": value} for field, value in update_fields.items()},
+            "status_since": {"$cond": [{"$ne": [{"$ifNull": ["$status_id", ""]}, {"$literal": data.status_id}]},
+                                       update_fields["updated_at"], "$status_since"]}
+        }}],
+        return_document=ReturnDocument.BEFORE
     )
-    if result.matched_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Kapcsolat nem található")
+    if previous.get("status_id", "") != data.status_id:
+        await record_transition(project_id, worker_id, previous.get("status_id", ""), data.status_id,
+                                status_entered_at(previous), user["id"])
+    await asyncio.gather(touch("projects", [project_id]), touch("workers", [worker_id]))
+    await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+    await invalidate_responses([project_id], [worker_id])
+    loaders = get_loaders()
+    worker, status_doc = await asyncio.gather(loaders.workers.load(worker_id), loaders.statuses.load(data.status_id))
+    await event_hub.publish(project_channel(project_id), {
+        "type": "status_changed", "project_id": project_id, "worker_id": worker_id,
+        "owner_id": worker.get("owner_id", "") if worker else "",
+        "status_id": data.status_id,
+        "status_name": status_doc["name"] if status_doc else "Hozzárendelve",
+        "notes": update_fields.get("notes", previous.get("notes", ""))
+    })
     return {"message": "Státusz frissítve"}
 
+# ==================== SAVED SEARCHES ====================
+
+# Named filters with materialized membership: saved_search_members holds one
+# row per (search, worker) and the search document its worker_count. Worker
+# writes re-evaluate only the changed worker against the searches that can see
+# it (sync_saved_searches), so opening a saved list is one indexed read.
+SAVED_SEARCH_FILTERS = ("category", "worker_type_id", "tag_ids", "position")
+
+def saved_search_query(search: dict) -> dict:
+    query = {}
+    if search.get("scope_owner_id"):
+        query["owner_id"] = search["scope_owner_id"]
+    if search.get("category"):
+        query["category"] = search["category"]
+    if search.get("worker_type_id"):
+        query["worker_type_id"] = search["worker_type_id"]
+    if search.get("tag_ids"):
+        query["tag_ids"] = {"$all": search["tag_ids"]}
+    if search.get("position"):
+        query["position"] = {"$regex": re.escape(search["position"]), "$options": "i"}
+    return query
+
+def saved_search_matches(search: dict, worker: dict) -> bool:
+    """Python twin of saved_search_query for a single worker"""
+    return ((not search.get("scope_owner_id") or worker.get("owner_id") == search["scope_owner_id"])
+            and (not search.get("category") or worker.get("category") == search["category"])
+            and (not search.get("worker_type_id") or worker.get("worker_type_id") == search["worker_type_id"])
+            and set(search.get("tag_ids", [])) <= set(worker.get("tag_ids", []))
+            and (not search.get("position")
+                 or search["position"].casefold() in (worker.get("position") or "").casefold()))
+
+def saved_search_response(search: dict) -> SavedSearchResponse:
+    return SavedSearchResponse(
+        **{k: search.get(k) or "" for k in ("id", "name", "category", "worker_type_id", "position")},
+        tag_ids=search.get("tag_ids", []),
+        owner_id=search.get("scope_owner_id", ""),
+        worker_count=search.get("worker_count", 0),
+        created_at=to_iso(search.get("created_at", "")),
+        updated_at=to_iso(search.get("updated_at", ""))
+    )
+
+async def sync_saved_searches(worker: dict, deleted: bool = False) -> None:
+    """Re-evaluate one worker against every saved search that can see it.
+    Counts move only by the rows this call actually inserted or deleted."""
+    searches, rows = await asyncio.gather(
+        db.saved_searches.find({"scope_owner_id": {"$in": ["", worker.get("owner_id", "")]}}, {"_id": 0}).to_list(None),
+        db.saved_search_members.find({"worker_id": worker["id"]}, {"_id": 0, "search_id": 1}).to_list(None)
+    )
+    current = {r["search_id"] for r in rows}
+    wanted = set() if deleted else {s["id"] for s in searches if saved_search_matches(s, worker)}
+    joined = sorted(wanted - current)
+    left = sorted(current - wanted)
+    deltas = {}
+    if joined:
+        result = await db.saved_search_members.bulk_write([UpdateOne(
+            {"search_id": search_id, "worker_id": worker["id"]},
+            {"$setOnInsert": {"worker_created_at": worker.get("created_at")}},
+            upsert=True
+        ) for search_id in joined], ordered=False)
+        for i in result.upserted_ids:
+            deltas[joined[i]] = 1
+    if left:
+        removed = await asyncio.gather(*(
+            db.saved_search_members.delete_one({"search_id": search_id, "worker_id": worker["id"]})
+            for search_id in left))
+        deltas.update({search_id: -1 for search_id, r in zip(left, removed) if r.deleted_count})
+    if deltas:
+        now = utc_now()
+        await db.saved_searches.bulk_write([
+            UpdateOne({"id": search_id}, {"$inc": {"worker_count": n}, "$set": {"updated_at": now}})
+            for search_id, n in deltas.items()
+        ], ordered=False)
+
+async def load_saved_search(search_id: str, user: dict) -> dict:
+    search = await db.saved_searches.find_one({"id": search_id}, {"_id": 0})
+    if not search:
+        raise HTTPException(status_code=404, detail="Mentett keresés nem található")
+    if search["user_id"] != user["id"] and user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a mentett kereséshez")
+    return search
+
+@api_router.get("/saved-searches", response_model=List[SavedSearchResponse])
+async def get_saved_searches(user: dict = Depends(get_current_user)):
+    searches = await db.saved_searches.find({"user_id": user["id"]}, {"_id": 0}).sort("name", 1).to_list(None)
+    return [saved_search_response(s) for s in searches]
+
+@api_router.post("/saved-searches", response_model=SavedSearchResponse)
+async def create_saved_search(data: SavedSearchCreate, user: dict = Depends(get_current_user)):
+    if not data.name.strip():
+        raise HTTPException(status_code=400, detail="A mentett keresés neve kötelező")
+    search = {
+        "id": str(uuid.uuid4()),
+        "user_id": user["id"],
+        "name": data.name.strip(),
+        "category": data.category or "",
+        "worker_type_id": data.worker_type_id or "",
+        "tag_ids": sorted(set(data.tag_ids)),
+        "position": (data.position or "").strip(),
+        # Toborzó csak saját dolgozóira menthet keresést
+        "scope_owner_id": (data.owner_id or "") if user["role"] == "admin" else user["id"],
+        "worker_count": 0,
+        "created_at": utc_now(),
+        "updated_at": utc_now()
+    }
+    await db.saved_searches.insert_one(search)
+    
+    # Kezdeti tagság egy lekérdezéssel; ami közben változik, azt a sync_saved_searches hozza
+    members = await db.workers.find(saved_search_query(search), {"_id": 0, "id": 1, "created_at": 1}).to_list(None)
+    if members:
+        await db.saved_search_members.bulk_write([UpdateOne(
+            {"search_id": search["id"], "worker_id": w["id"]},
+            {"$setOnInsert": {"worker_created_at": w.get("created_at")}},
+            upsert=True
+        ) for w in members], ordered=False)
+    search["worker_count"] = await db.saved_search_members.count_documents({"search_id": search["id"]})
+    await db.saved_searches.update_one({"id": search["id"]}, {"$set": {"worker_count": search["worker_count"]}})
+    return saved_search_response(search)
+
+@api_router.delete("/saved-searches/{search_id}")
+async def delete_saved_search(search_id: str, user: dict = Depends(get_current_user)):
+    await load_saved_search(search_id, user)
+    await db.saved_searches.delete_one({"id": search_id})
+    await db.saved_search_members.delete_many({"search_id": search_id})
+    return {"message": "Mentett keresés törölve"}
+
+@api_router.get("/saved-searches/{search_id}/workers", response_model=List[WorkerResponse])
+async def get_saved_search_workers(search_id: str, include_archived: bool = False,
+                                   user: dict = Depends(get_current_user)):
+    """A mentett keresés dolgozói, legújabb elöl (a tagság előre kiszámolt)"""
+    await load_saved_search(search_id, user)
+    rows = await db.saved_search_members.find(
+        {"search_id": search_id}, {"_id": 0, "worker_id": 1}
+    ).sort("worker_created_at", -1).limit(1000).to_list(None)
+    workers = await get_loaders().workers.load_many([r["worker_id"] for r in rows])
+    return await enrich_workers([w for w in workers if w], include_archived)
+
+# ==================== CHANGE FEED ====================
+
+CHANGE_FEED_PAGE_SIZE = 500
+
+def encode_change_token(seq: int) -> str:
+    return f"{seq}-{int(time.time())}"
+
+def decode_change_token(token: Optional[str]) -> int:
+    """Tokens carry their issue time: past the tombstone retention the client
+    could have missed deletions and must reload everything (410)."""
+    if not token:
+        return 0
+    try:
+        seq, issued = (int(part) for part in token.split("-"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Érvénytelen változás-token")
+    if seq and time.time() - issued > TOMBSTONE_RETENTION_DAYS * 86400:
+        raise HTTPException(status_code=410, detail="A token lejárt, teljes újratöltés szükséges")
+    return seq
+
+@api_router.get("/changes")
+async def get_changes(since: Optional[str] = None, limit: int = Query(CHANGE_FEED_PAGE_SIZE, ge=1, le=5000),
+                      user: dict = Depends(get_current_user)):
+    """Dolgozók, projektek és hozzárendelések, amelyek a token óta változtak (törlések: `deleted`)"""
+    seq = decode_change_token(since)
+    # Only sequences whose writes have all committed; the rest come next time
+    settled = max(seq, await settled_change_seq())
+    is_admin = user["role"] == "admin"
+    sources = {
+        "workers": ("workers", {} if is_admin else {"owner_id": user["id"]}, "change_seq"),
+        "projects": ("projects", {} if is_admin else
+                     {"$or": [{"owner_id": user["id"]}, {"recruiter_ids": user["id"]}]}, "change_seq"),
+        # Toborzó csak a saját dolgozóinak hozzárendeléseit látja
+        "assignments": ("project_workers", None if is_admin else {"worker.owner_id": user["id"]}, "change_seq"),
+        "deleted": ("tombstones", {} if is_admin else {"visible_to": user["id"]}, "seq"),
+    }
+    
+    async def fetch(collection, query, field, exact_seq=None):
+        match = {field: {"$gt": seq, "$lte": settled} if exact_seq is None else exact_seq}
+        if collection == "project_workers" and query:
+            # Ownership lives on the worker: join before the limit so a page
+            # never counts other recruiters' rows
+            pipeline = [
+                {"$match": match},
+                {"$sort": {field: 1}},
+                {"$lookup": {"from": "workers", "localField": "worker_id", "foreignField": "id", "as": "worker"}},
+                {"$match": query},
+                {"$project": {"_id": 0, "worker": 0}}
+            ]
+            if exact_seq is None:
+                pipeline.append({"$limit": limit + 1})
+            return await db[collection].aggregate(pipeline).to_list(None)
+        cursor = db[collection].find({**(query or {}), **match}, {"_id": 0}).sort(field, 1)
+        if exact_seq is None:
+            cursor = cursor.limit(limit + 1)
+        return await cursor.to_list(None)
+    
+    results = dict(zip(sources, await asyncio.gather(*(fetch(*src) for src in sources.values()))))
+    
+    # Pages end on a sequence boundary: below the smallest last sequence of any
+    # truncated source every source is complete
+    truncated = [rows[-1][sources[name][2]] for name, rows in results.items() if len(rows) > limit]
+    if truncated:
+        cutoff = min(truncated)
+        below = {name: [r for r in rows if r[sources[name][2]] < cutoff] for name, rows in results.items()}
+        if any(below.values()):
+            results, next_seq = below, cutoff - 1
+        else:
+            # One write stamped more documents than a page: return that sequence whole
+            results = dict(zip(sources, await asyncio.gather(
+                *(fetch(*src, exact_seq=cutoff) for src in sources.values()))))
+            next_seq = cutoff
+    else:
+        next_seq = settled
+    
+    # A tombstone older than a later re-grant of the same document is void
+    upserted = {(kind, d["id"]): d["change_seq"] for kind, name in
+                (("worker", "workers"), ("project", "projects"), ("assignment", "assignments"))
+                for d in results[name]}
+    deleted = [t for t in results["deleted"] if upserted.get((t["kind"], t["id"]), -1) < t["seq"]]
+    
+    assignments = results["assignments"]
+    counts = await assignment_counts([p["id"] for p in results["projects"]])
+    workers, projects = await asyncio.gather(
+        enrich_workers(results["workers"]),
+        asyncio.gather(*(build_project_response(p, counts.get(p["id"], 0)) for p in results["projects"]))
+    )
+    return {
+        "since": since or "",
+        "next": encode_change_token(next_seq),
+        "has_more": bool(truncated),
+        "workers": workers,
+        "projects": list(projects),
+        "assignments": [{
+            "id": a["id"],
+            "project_id": a["project_id"],
+            "worker_id": a["worker_id"],
+            "status_id": a.get("status_id", ""),
+            "notes": a.get("notes", ""),
+            "created_at": to_iso(a.get("created_at", "")),
+            "updated_at": to_iso(a.get("updated_at", ""))
+        } for a in assignments],
+        "deleted": [{"kind": t["kind"], "id": t["id"]} for t in deleted]
+    }
+
+# ==================== LIVE EVENTS ====================
+
+# Roster changes are pushed to open project pages over server-sent events.
+# EventHub fans events out to the subscribers of this process; the bus decides
+# how events reach the hubs: LocalEventBus (single process, default) or
+# MongoEventBus (every uvicorn worker tails a capped collection).
+EVENT_BUS = os.environ.get("EVENT_BUS", "local")
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+EVENT_QUEUE_SIZE = 100
+
+SSE_SUBSCRIBERS = register_metric(MetricGauge(
+    "dolgozocrm_sse_subscribers", "Open server-sent event streams"))
+
+def project_channel(project_id: str) -> str:
+    return f"{current_tenant()}:project:{project_id}"
+
+class LocalEventBus:
+    def __init__(self):
+        self.deliver = None
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, event: dict):
+        self.deliver(channel, event)
+
+class MongoEventBus:
+    """Cross-process bus: events are inserted into a capped collection that a
+    background task in every process tails (tailable, await-data cursor)."""
+
+    def __init__(self, collection: str = "events", size_bytes: int = 16 * 1024 * 1024):
+        self.collection = collection
+        self.size_bytes = size_bytes
+        self.deliver = None
+        self._task = None
+
+    async def start(self):
+        database = control_db()
+        if self.collection not in await database.list_collection_names():
+            try:
+                await database.create_collection(self.collection, capped=True, size=self.size_bytes)
+            except Exception as e:
+                # Another worker created it first
+                logger.info("Event collection not created: %s", e)
+        self._task = asyncio.create_task(self._tail())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def publish(self, channel: str, event: dict):
+        await control_db()[self.collection].insert_one({"channel": channel, "event": event})
+
+    async def _tail(self):
+        events = control_db()[self.collection]
+        last = await events.find_one({}, sort=[("$natural", -1)])
+        last_id = last["_id"] if last else None
+        while True:
+            try:
+                query = {"_id": {"$gt": last_id}} if last_id else {}
+                cursor = events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                async for doc in cursor:
+                    last_id = doc["_id"]
+                    self.deliver(doc["channel"], doc["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Event bus tail failed: %s", e)
+            await asyncio.sleep(1)
+
+class EventHub:
+    def __init__(self, bus=None):
+        self.bus = bus or LocalEventBus()
+        self.bus.deliver = self.dispatch
+        self._subscribers = {}
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        SSE_SUBSCRIBERS.inc()
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(channel)
+        if queues and queue in queues:
+            queues.discard(queue)
+            SSE_SUBSCRIBERS.dec()
+            if not queues:
+                del self._subscribers[channel]
+
+    def dispatch(self, channel: str, event: dict):
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and tell it to reload the page data
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    async def publish(self, channel: str, event: dict):
+        try:
+            await self.bus.publish(channel, event)
+        except Exception as e:
+            # Live updates are best effort; the write itself already succeeded
+            logger.warning("Event publish failed on %s: %s", channel, e)
+
+event_hub = EventHub(MongoEventBus() if EVENT_BUS == "mongo" else LocalEventBus())
+
+async def project_event_stream(request: Optional[Request], channel: str, user: dict):
+    queue = event_hub.subscribe(channel)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if request is not None and await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            # Toborzó csak saját dolgozóinak változásait kapja
+            owner_id = event.get("owner_id")
+            if user["role"] != "admin" and owner_id and owner_id != user["id"]:
+                continue
+            payload = {k: v for k, v in event.items() if k != "owner_id"}
+            yield f"event: {event['type']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    finally:
+        event_hub.unsubscribe(channel, queue)
+
+@api_router.get("/projects/{project_id}/events")
+async def project_events(project_id: str, request: Request, user: dict = Depends(get_stream_user)):
+    """SSE: worker_added / worker_removed / status_changed / resync események a projekt névsoráról"""
+    p = await db.projects.find_one({"id": project_id}, {"_id": 0, "owner_id": 1, "recruiter_ids": 1})
+    if not p:
+        raise HTTPException(status_code=404, detail="Projekt nem található")
+    if (user["role"] != "admin" and p.get("owner_id") != user["id"]
+            and user["id"] not in p.get("recruiter_ids", [])):
+        raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
+    return StreamingResponse(
+        project_event_stream(request, project_channel(project_id), user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ==================== STATUS TRANSITIONS ====================
+
+# Every status change of an assignment is appended to status_transitions, and
+# status_rollups is incremented in the same request, so analytics never read
+# the raw log. Rollup documents are keyed by (project_id, status_id, day):
+# project_id "" aggregates all projects, day "" holds the all-time totals.
+NO_STATUS_STAGE = "none"
+REMOVED_STAGE = "removed"
+STAGE_NAMES = {NO_STATUS_STAGE: "Hozzárendelve", REMOVED_STAGE: "Eltávolítva"}
+
+def stage_key(status_id: Optional[str]) -> str:
+    return status_id or NO_STATUS_STAGE
+
+def status_entered_at(pw: dict):
+    """When the assignment entered its current status (older rows: best guess)"""
+    return pw.get("status_since") or pw.get("updated_at") or pw.get("created_at")
+
+async def record_transition(project_id: str, worker_id: str, from_status: Optional[str], to_status: str,
+                            entered_at, user_id: str) -> None:
+    """from_status is None for a new assignment; to_status is REMOVED_STAGE on removal"""
+    at = utc_now()
+    entered = parse_timestamp(entered_at)
+    duration = max(0.0, (at - entered).total_seconds()) if from_status is not None and entered else None
+    await db.status_transitions.insert_one({
+        "id": str(uuid.uuid4()),
+        "project_id": project_id,
+        "worker_id": worker_id,
+        "from_status_id": None if from_status is None else stage_key(from_status),
+        "to_status_id": stage_key(to_status),
+        "seconds_in_previous": duration,
+        "by": user_id,
+        "at": at
+    })
+    
+    day = at.date().isoformat()
+    ops = []
+    for scope in (project_id, ""):
+        if from_status is not None:
+            inc = {"exited": 1, f"exits.{stage_key(to_status)}": 1}
+            if duration is not None:
+                inc["seconds_in_stage"] = duration
+                inc["timed_exits"] = 1
+            ops.append(UpdateOne({"project_id": scope, "status_id": stage_key(from_status), "day": ""},
+                                 {"$inc": inc}, upsert=True))
+        if to_status != REMOVED_STAGE:
+            for bucket in ("", day):
+                ops.append(UpdateOne({"project_id": scope, "status_id": stage_key(to_status), "day": bucket},
+                                     {"$inc": {"entered": 1}}, upsert=True))
+    await db.status_rollups.bulk_write(ops, ordered=False)
+    await record_recruiter_outcome(worker_id, from_status, to_status, at)
+
+@api_router.get("/analytics/status-flow")
+async def get_status_flow(project_id: Optional[str] = None,
+                          from_date: Optional[str] = Query(None, alias="from"),
+                          to_date: Optional[str] = Query(None, alias="to"),
+                          user: dict = Depends(get_current_user)):
+    """Státuszonkénti átfutási idő és konverzió (projektre vagy összesítve), napi belépésekkel"""
+    if project_id:
+        loaders = get_loaders()
+        p = await loaders.projects.load(project_id) or await loaders.archived_projects.load(project_id)
+        if not p:
+            raise HTTPException(status_code=404, detail="Projekt nem található")
+        if (user["role"] != "admin" and p.get("owner_id") != user["id"]
+                and user["id"] not in p.get("recruiter_ids", [])):
+            raise HTTPException(status_code=403, detail="Nincs hozzáférésed ehhez a projekthez")
+    elif user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin jogosultság szükséges")
+    
+    end = parse_project_date(to_date) if to_date else utc_now()
+    start = parse_project_date(from_date) if from_date else end - timedelta(days=29)
+    rows = await reporting_collection("status_rollups").find({
+        "project_id": project_id or "",
+        "$or": [{"day": ""}, {"day": {"$gte": start.date().isoformat(), "$lte": end.date().isoformat()}}]
+    }, {"_id": 0}).to_list(None)
+    
+    status_ids = {r["status_id"] for r in rows}
+    for r in rows:
+        status_ids.update(r.get("exits", {}))
+    status_docs = await get_loaders().statuses.load_many([s for s in status_ids if s not in STAGE_NAMES])
+    names = {**{s["id"]: s["name"] for s in status_docs if s}, **STAGE_NAMES}
+    
+    stages = []
+    for r in sorted((r for r in rows if r["day"] == ""), key=lambda r: -r.get("entered", 0)):
+        exited = r.get("exited", 0)
+        timed = r.get("timed_exits", 0)
+        stages.append({
+            "status_id": r["status_id"],
+            "status_name": names.get(r["status_id"], ""),
+            "entered": r.get("entered", 0),
+            "exited": exited,
+            "current": r.get("entered", 0) - exited,
+            "avg_days_in_stage": round(r.get("seconds_in_stage", 0) / timed / 86400, 2) if timed else None,
+            "conversions": sorted(({
+                "to_status_id": to,
+                "to_status_name": names.get(to, ""),
+                "count": count,
+                "rate": round(count / exited, 4)
+            } for to, count in r.get("exits", {}).items()), key=lambda c: -c["count"])
+        })
+    daily = sorted(({"day": r["day"], "status_id": r["status_id"], "status_name": names.get(r["status_id"], ""),
+                     "entered": r.get("entered", 0)} for r in rows if r["day"]),
+                   key=lambda d: (d["day"], d["status_name"]))
+    return {"project_id": project_id, "from": start.date().isoformat(), "to": end.date().isoformat(),
+            "stages": stages, "daily": daily}
+
+# ==================== RECRUITER ROLLUPS ====================
+
+# Per-recruiter counters in recruiter_rollups, keyed by (user_id, day): day ""
+# holds the totals (including the current worker count and category mix),
+# dated documents the per-day activity. Updated on the write paths; the
+# leaderboard only reads these documents. Outcomes are credited to the
+# recruiter who owns the worker. A tenant's first request in a process starts
+# the one-time backfill in the background (ROLLUPS_BUILT_COUNTER is set by every
+# full rebuild); a lease on the counter document keeps it to one process.
+ROLLUPS_BUILT_COUNTER = "recruiter_rollups_built"
+ROLLUP_BACKFILL_LEASE_SECONDS = int(os.environ.get("ROLLUP_BACKFILL_LEASE_SECONDS", "600"))
+PLACEMENT_STATUSES = {"Dolgozik", "Megfelelt"}
+NO_SHOW_STATUSES = {"Nem jelent meg"}
+
+def category_field(category: str) -> str:
+    return "categories." + (category or "-").replace(".", "\uff0e").replace("$", "\uff04")
+
+async def bump_recruiter_rollups(user_id: str, daily: dict, totals: Optional[dict] = None,
+                                 at: Optional[datetime] = None) -> None:
+    """`daily` is added to both the day document and the totals, `totals` only to the latter"""
+    if not user_id:
+        return
+    ops = [UpdateOne({"user_id": user_id, "day": ""}, {"$inc": {**daily, **(totals or {})}}, upsert=True)]
+    if daily:
+        day = (at or utc_now()).date().isoformat()
+        ops.append(UpdateOne({"user_id": user_id, "day": day}, {"$inc": daily}, upsert=True))
+    await db.recruiter_rollups.bulk_write(ops, ordered=False)
+
+async def record_recruiter_outcome(worker_id: str, from_status: Optional[str], to_status: str, at: datetime) -> None:
+    if to_status in (REMOVED_STAGE, ""):
+        return
+    loaders = get_loaders()
+    worker, before, after = await asyncio.gather(
+        loaders.workers.load(worker_id), loaders.statuses.load(from_status), loaders.statuses.load(to_status)
+    )
+    if not worker or not after:
+        return
+    before_name = before["name"] if before else ""
+    daily = {}
+    if after["name"] in PLACEMENT_STATUSES and before_name not in PLACEMENT_STATUSES:
+        daily["placements"] = 1
+    if after["name"] in NO_SHOW_STATUSES and before_name not in NO_SHOW_STATUSES:
+        daily["no_shows"] = 1
+    if daily:
+        await bump_recruiter_rollups(worker.get("owner_id", ""), daily, at=at)
+
+async def rebuild_recruiter_rollups() -> int:
+    """Recompute recruiter_rollups from workers and status_transitions (backfill / repair job).
+
+    Documents are replaced one by one (upsert), so the collection is never
+    empty and concurrent $inc upserts cannot collide with the rebuild. Keys
+    that no longer have data are deleted, unless they appeared while it ran.
+    """
+    previous = {(d["user_id"], d["day"]) for d in await db.recruiter_rollups.find(
+        {}, {"_id": 0, "user_id": 1, "day": 1}).to_list(None)}
+    statuses = await db.statuses.find({}, {"_id": 0}).to_list(None)
+    placement_ids = [s["id"] for s in statuses if s["name"] in PLACEMENT_STATUSES]
+    no_show_ids = [s["id"] for s in statuses if s["name"] in NO_SHOW_STATUSES]
+    docs = {}
+    
+    def doc(user_id, day):
+        return docs.setdefault((user_id, day), {"user_id": user_id, "day": day})
+    
+    def add(target, field, n):
+        target[field] = target.get(field, 0) + n
+    
+    added = await db.workers.aggregate([
+        {"$match": {"created_at": {"$type": "date"}}},
+        {"$group": {"_id": {"owner": "$owner_id",
+                            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}},
+                    "count": {"$sum": 1}}}
+    ]).to_list(None)
+    for row in added:
+        add(doc(row["_id"]["owner"], row["_id"]["day"]), "workers_added", row["count"])
+        add(doc(row["_id"]["owner"], ""), "workers_added", row["count"])
+    mix = await db.workers.aggregate([
+        {"$group": {"_id": {"owner": "$owner_id", "category": "$category"}, "count": {"$sum": 1}}}
+    ]).to_list(None)
+    for row in mix:
+        totals = doc(row["_id"]["owner"], "")
+        add(totals, "worker_count", row["count"])
+        totals.setdefault("categories", {})[category_field(row["_id"].get("category", "")).split(".", 1)[1]] = row["count"]
+    
+    for field, target_ids in (("placements", placement_ids), ("no_shows", no_show_ids)):
+        outcomes = await db.status_transitions.aggregate([
+            {"$match": {"to_status_id": {"$in": target_ids}, "from_status_id": {"$nin": target_ids}}},
+            {"$lookup": {"from": "workers", "localField": "worker_id", "foreignField": "id", "as": "worker"}},
+            {"$unwind": "$worker"},
+            {"$group": {"_id": {"owner": "$worker.owner_id",
+                                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$at"}}},
+                        "count": {"$sum": 1}}}
+        ]).to_list(None)
+        for row in outcomes:
+            add(doc(row["_id"]["owner"], row["_id"]["day"]), field, row["count"])
+            add(doc(row["_id"]["owner"], ""), field, row["count"])
+    
+    if docs:
+        await db.recruiter_rollups.bulk_write([
+            ReplaceOne({"user_id": user_id, "day": day}, d, upsert=True) for (user_id, day), d in docs.items()
+        ], ordered=False)
+    stale = {}
+    for user_id, day in previous - docs.keys():
+        stale.setdefault(user_id, []).append(day)
+    for user_id, days in stale.items():
+        await db.recruiter_rollups.delete_many({"user_id": user_id, "day": {"$in": days}})
+    await bump_counter(ROLLUPS_BUILT_COUNTER)
+    return len(docs)
+
+async def backfill_recruiter_rollups() -> bool:
+    """The one-time backfill, run in the background. Only the process holding
+    the lease on the counter document rebuilds; False when another one has it
+    or the rollups are already built."""
+    now = utc_now()
+    try:
+        await db.counters.find_one_and_update(
+            {"id": ROLLUPS_BUILT_COUNTER, "seq": {"$not": {"$gt": 0}},
+             "$or": [{"lease_until": {"$exists": False}}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"lease_until": now + timedelta(seconds=ROLLUP_BACKFILL_LEASE_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    try:
+        await rebuild_recruiter_rollups()
+    except Exception as e:
+        logger.warning("Recruiter rollup backfill failed (%s): %s", current_tenant(), e)
+        return False
+    finally:
+        await db.counters.update_one({"id": ROLLUPS_BUILT_COUNTER}, {"$unset": {"lease_until": ""}})
+    return True
+
+def _week_key(day: str) -> str:
+    year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+    return f"{year}-W{week:02d}"
+
+@api_router.get("/users/leaderboard")
+async def get_recruiter_leaderboard(from_date: Optional[str] = Query(None, alias="from"),
+                                    to_date: Optional[str] = Query(None, alias="to"),
+                                    period: str = "day",
+                                    user: dict = Depends(require_admin)):
+    """Toborzói ranglista: felvitt dolgozók, elhelyezések, meg nem jelenések, kategória-megoszlás"""
+    if period not in ("day", "week"):
+        raise HTTPException(status_code=400, detail="A period értéke 'day' vagy 'week' lehet")
+    end = parse_project_date(to_date) if to_date else utc_now()
+    start = parse_project_date(from_date) if from_date else end - timedelta(days=29)
+    rows = await reporting_collection("recruiter_rollups").find({
+        "$or": [{"day": ""}, {"day": {"$gte": start.date().isoformat(), "$lte": end.date().isoformat()}}]
+    }, {"_id": 0}).to_list(None)
+    
+    board = {}
+    for r in rows:
+        entry = board.setdefault(r["user_id"], {"workers_added": 0, "placements": 0, "no_shows": 0,
+                                                 "worker_count": 0, "category_mix": {}, "series": {}})
+        if r["day"] == "":
+            entry["worker_count"] = r.get("worker_count", 0)
+            entry["category_mix"] = {k: v for k, v in r.get("categories", {}).items() if v > 0}
+            continue
+        bucket = r["day"] if period == "day" else _week_key(r["day"])
+        point = entry["series"].setdefault(bucket, {"workers_added": 0, "placements": 0, "no_shows": 0})
+        for field in ("workers_added", "placements", "no_shows"):
+            entry[field] += r.get(field, 0)
+            point[field] += r.get(field, 0)
+    
+    owners = await resolve_users(list(board))
+    result = []
+    for (user_id, entry), owner in zip(board.items(), owners):
+        if not owner:
+            continue
+        result.append({
+            "user_id": user_id,
+            "user_name": user_display_name(owner),
+            "user_email": owner["email"],
+            **{k: entry[k] for k in ("worker_count", "workers_added", "placements", "no_shows", "category_mix")},
+            "series": [{"period": k, **v} for k, v in sorted(entry["series"].items())]
+        })
+    result.sort(key=lambda e: (-e["placements"], -e["workers_added"], e["user_name"]))
+    return {"from": start.date().isoformat(), "to": end.date().isoformat(), "period": period, "recruiters": result}
+
 # ==================== EXCEL EXPORT ====================
 
 async def generate_excel_for_user(user_id: str, user_name: str):
     """Generate Excel file for a specific recruiter with workers grouped by category"""
+    started = time.perf_counter()
     wb = Workbook()
     
     # Styles
@@ -959,9 +3782,10 @@ async def generate_excel_for_user(user_id: str, user_name: str):
     
     # Remove default sheet
     wb.remove(wb.active)
+    workers_source = reporting_collection("workers")
     
     for cat in categories:
-        workers = await db.workers.find(
+        workers = await workers_source.find(
             {"owner_id": user_id, "category": cat}, {"_id": 0}
         ).sort("name", 1).to_list(1000)
         
@@ -981,8 +3805,8 @@ async def generate_excel_for_user(user_id: str, user_name: str):
             cell.alignment = Alignment(horizontal="center")
         
         # Data
-        for row, worker in enumerate(workers, 2):
-            type_doc = await db.worker_types.find_one({"id": worker.get("worker_type_id")}, {"_id": 0})
+        types = await get_loaders().worker_types.load_many([w.get("worker_type_id") for w in workers])
+        for row, (worker, type_doc) in enumerate(zip(workers, types), 2):
             type_name = type_doc["name"] if type_doc else ""
             
             ws.cell(row=row, column=1, value=worker["name"]).border = border
@@ -991,7 +3815,7 @@ async def generate_excel_for_user(user_id: str, user_name: str):
             ws.cell(row=row, column=4, value=worker.get("address", "")).border = border
             ws.cell(row=row, column=5, value=type_name).border = border
             ws.cell(row=row, column=6, value=worker.get("experience", "")).border = border
-            ws.cell(row=row, column=7, value=worker.get("created_at", "")[:10]).border = border
+            ws.cell(row=row, column=7, value=to_iso(worker.get("created_at", ""))[:10]).border = border
         
         # Auto-width columns
         for col in ws.columns:
@@ -1015,6 +3839,7 @@ async def generate_excel_for_user(user_id: str, user_name: str):
     filename = f"{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     filepath = EXPORTS_DIR / filename
     wb.save(filepath)
+    EXPORT_DURATION.observe(time.perf_counter() - started, kind="user")
     
     return filepath, filename
 
@@ -1049,6 +3874,7 @@ async def export_user_workers_excel(user_id: str, admin: dict = Depends(require_
 @api_router.get("/export/all")
 async def export_all_workers_excel(admin: dict = Depends(require_admin)):
     """Admin exports all workers grouped by recruiter and category"""
+    started = time.perf_counter()
     wb = Workbook()
     
     # Styles
@@ -1063,13 +3889,14 @@ async def export_all_workers_excel(admin: dict = Depends(require_admin)):
     )
     
     # Get all users
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(100)
+    users = await reporting_collection("users").find({}, {"_id": 0, "password": 0}).to_list(100)
+    workers_source = reporting_collection("workers")
     
     # Remove default sheet
     wb.remove(wb.active)
     
     for u in users:
-        workers = await db.workers.find({"owner_id": u["id"]}, {"_id": 0}).sort("category", 1).to_list(1000)
+        workers = await workers_source.find({"owner_id": u["id"]}, {"_id": 0}).sort("category", 1).to_list(1000)
         
         if not workers:
             continue
@@ -1092,8 +3919,8 @@ async def export_all_workers_excel(admin: dict = Depends(require_admin)):
             cell.border = border
         
         # Data
-        for row, worker in enumerate(workers, 2):
-            type_doc = await db.worker_types.find_one({"id": worker.get("worker_type_id")}, {"_id": 0})
+        types = await get_loaders().worker_types.load_many([w.get("worker_type_id") for w in workers])
+        for row, (worker, type_doc) in enumerate(zip(workers, types), 2):
             type_name = type_doc["name"] if type_doc else ""
             
             ws.cell(row=row, column=1, value=worker["name"]).border = border
@@ -1102,7 +3929,7 @@ async def export_all_workers_excel(admin: dict = Depends(require_admin)):
             ws.cell(row=row, column=4, value=worker["category"]).border = border
             ws.cell(row=row, column=5, value=type_name).border = border
             ws.cell(row=row, column=6, value=worker.get("address", "")).border = border
-            ws.cell(row=row, column=7, value=worker.get("created_at", "")[:10]).border = border
+            ws.cell(row=row, column=7, value=to_iso(worker.get("created_at", ""))[:10]).border = border
         
         # Auto-width
         for col in ws.columns:
@@ -1123,6 +3950,7 @@ async def export_all_workers_excel(admin: dict = Depends(require_admin)):
     filename = f"osszes_dolgozo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     filepath = EXPORTS_DIR / filename
     wb.save(filepath)
+    EXPORT_DURATION.observe(time.perf_counter() - started, kind="all")
     
     return FileResponse(
         path=filepath,
@@ -1147,7 +3975,7 @@ async def seed_data():
         "password": hash_password("admin123"),
         "name": "Admin",
         "role": "admin",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": utc_now()
     }
     await db.users.insert_one(admin_doc)
     
@@ -1158,9 +3986,10 @@ async def seed_data():
         "password": hash_password("toborzo123"),
         "name": "Teszt Toborzó",
         "role": "user",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": utc_now()
     }
     await db.users.insert_one(recruiter_doc)
+    await get_user_directory().invalidate()
     
     # Worker types with positions
     type_positions = {
@@ -1197,9 +4026,346 @@ async def seed_data():
     ]
     for t in tags:
         await db.tags.insert_one({"id": str(uuid.uuid4()), **t})
+    await bump_counter(REFERENCE_COUNTER)
     
     return {"message": "Seed adatok létrehozva", "admin_email": "admin@dolgozocrm.hu", "admin_password": "admin123"}
 
+# ==================== INDEXES ====================
+
+# (collection, keys[, options]) created at startup; create_index is a no-op when present
+INDEXES = [
+    ("workers", [("id", 1)], {"unique": True}),
+    ("projects", [("id", 1)], {"unique": True}),
+    ("users", [("id", 1)], {"unique": True}),
+    ("projects", [("date", 1)]),
+    ("project_workers", [("project_id", 1)]),
+    ("project_workers", [("worker_id", 1), ("updated_at", -1), ("id", -1)]),
+    ("projects_archive", [("id", 1)]),
+    ("projects_archive", [("date", -1)]),
+    ("project_workers_archive", [("project_id", 1)]),
+    ("project_workers_archive", [("worker_id", 1), ("updated_at", -1), ("id", -1)]),
+    ("status_transitions", [("project_id", 1), ("at", -1)]),
+    ("status_transitions", [("worker_id", 1), ("at", -1)]),
+    ("status_transitions", [("at", -1)]),
+    ("status_rollups", [("project_id", 1), ("status_id", 1), ("day", 1)], {"unique": True}),
+    ("recruiter_rollups", [("user_id", 1), ("day", 1)], {"unique": True}),
+    ("recruiter_rollups", [("day", 1)]),
+    ("workers", [("change_seq", 1)]),
+    ("projects", [("change_seq", 1)]),
+    ("project_workers", [("change_seq", 1)]),
+    ("tombstones", [("seq", 1)]),
+    ("tombstones", [("at", 1)], {"expireAfterSeconds": TOMBSTONE_RETENTION_DAYS * 86400}),
+    ("workers", [("geo", "2dsphere")]),
+    ("projects", [("geo", "2dsphere")]),
+    ("saved_searches", [("user_id", 1), ("name", 1)]),
+    ("saved_searches", [("scope_owner_id", 1)]),
+    ("saved_search_members", [("search_id", 1), ("worker_id", 1)], {"unique": True}),
+    ("saved_search_members", [("search_id", 1), ("worker_created_at", -1)]),
+    ("saved_search_members", [("worker_id", 1)]),
+    ("counters", [("id", 1)], {"unique": True}),
+    ("worker_bookings", [("worker_id", 1), ("date", 1)], {"unique": True}),
+    ("worker_bookings", [("date", 1), ("worker_id", 1)]),
+    ("worker_bookings", [("project_id", 1), ("worker_id", 1)]),
+    ("workers", [("worker_type_id", 1), ("created_at", -1)]),
+    ("workers", [("owner_id", 1), ("created_at", -1)]),
+    ("workers", [("created_at", -1)]),
+]
+
+async def ensure_indexes():
+    for collection, keys, *options in INDEXES:
+        await db[collection].create_index(keys, **(options[0] if options else {}))
+
+_ready_tenants = set()
+_tenant_locks = {}
+rollup_backfills = {}
+
+async def ensure_tenant_ready(tenant: str) -> None:
+    """First request of a tenant in this process: indexes, user directory, and
+    the one-time recruiter rollup backfill started in the background"""
+    if tenant in _ready_tenants:
+        return
+    lock = _tenant_locks.setdefault(tenant, asyncio.Lock())
+    async with lock:
+        if tenant in _ready_tenants:
+            return
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            logger.warning("Index creation failed (%s): %s", tenant, e)
+        try:
+            await get_user_directory().reload()
+        except Exception as e:
+            logger.warning("User directory initial load failed (%s): %s", tenant, e)
+        try:
+            if not await read_counter(ROLLUPS_BUILT_COUNTER):
+                rollup_backfills[tenant] = asyncio.create_task(backfill_recruiter_rollups())
+        except Exception as e:
+            logger.warning("Recruiter rollup backfill could not start (%s): %s", tenant, e)
+        _ready_tenants.add(tenant)
+
+# ==================== ARCHIVE ====================
+
+# Closed projects whose date is older than this move to projects_archive, and
+# their assignments to project_workers_archive. Archived data is read-only and
+# only returned by list endpoints when include_archived=true.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "100"))
+
+async def archive_closed_projects(older_than_days: int = ARCHIVE_AFTER_DAYS,
+                                  batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """Move closed projects older than the cutoff, batch by batch.
+
+    Each batch is copied (upsert by id) before it is deleted from the hot
+    collections, so an interrupted run never loses data and re-running it is safe.
+    """
+    cutoff = utc_now() - timedelta(days=older_than_days)
+    report = {"projects": 0, "assignments": 0}
+    while True:
+        projects = await db.projects.find(
+            {"is_closed": True, "date": {"$lt": cutoff}}, {"_id": 0}
+        ).sort("date", 1).to_list(batch_size)
+        if not projects:
+            break
+        project_ids = [p["id"] for p in projects]
+        assignments = await db.project_workers.find({"project_id": {"$in": project_ids}}, {"_id": 0}).to_list(None)
+        archived_at = utc_now()
+        
+        await db.projects_archive.bulk_write(
+            [ReplaceOne({"id": p["id"]}, {**p, "archived_at": archived_at}, upsert=True) for p in projects],
+            ordered=False
+        )
+        if assignments:
+            await db.project_workers_archive.bulk_write(
+                [ReplaceOne({"id": pw["id"]}, pw, upsert=True) for pw in assignments], ordered=False
+            )
+            await db.project_workers.delete_many({"id": {"$in": [pw["id"] for pw in assignments]}})
+        await db.projects.delete_many({"id": {"$in": project_ids}})
+        # Archived days are in the past; their bookings are no longer needed
+        await db.worker_bookings.delete_many({"project_id": {"$in": project_ids}})
+        # A scope per batch, so a long run does not hold back the change feed
+        async with change_scope():
+            await record_tombstones("project", [(p["id"], project_audience(p)) for p in projects])
+            await assignment_tombstones(assignments, archived=True)
+            # A dolgozók project_statuses listája megváltozott
+            await touch("workers", list({pw["worker_id"] for pw in assignments}))
+        await invalidate_responses(project_ids, [pw["worker_id"] for pw in assignments])
+        report["projects"] += len(projects)
+        report["assignments"] += len(assignments)
+    
+    if report["projects"]:
+        await record_changes(PROJECTS_COUNTER, WORKERS_COUNTER)
+    return report
+
+@api_router.post("/projects/archive")
+async def archive_projects(older_than_days: Optional[int] = None, user: dict = Depends(require_admin)):
+    """Lezárt, régi projektek archiválása"""
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    if days < 0:
+        raise HTTPException(status_code=400, detail="Érvénytelen napszám")
+    return await archive_closed_projects(days)
+
+# ==================== TIMESTAMP MIGRATION ====================
+
+# Fields that used to be stored as ISO strings, per collection
+TIMESTAMP_FIELDS = {
+    "users": ["created_at"],
+    "workers": ["created_at", "updated_at"],
+    "projects": ["created_at", "updated_at", "date"],
+    "project_workers": ["created_at", "updated_at"],
+}
+MIGRATION_BATCH_SIZE = int(os.environ.get("MIGRATION_BATCH_SIZE", "500"))
+
+async def migrate_timestamps(batch_size: int = MIGRATION_BATCH_SIZE) -> dict:
+    """Convert string timestamps to BSON datetimes in place, batch by batch.
+
+    Idempotent and resumable: only documents still holding a string are
+    selected, and batches are walked in _id order. Unparseable values are left
+    untouched and counted under "skipped".
+    """
+    report = {}
+    for collection, fields in TIMESTAMP_FIELDS.items():
+        coll = db[collection]
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        projection = {"_id": 1, **{field: 1 for field in fields}}
+        stats = {"scanned": 0, "updated": 0, "skipped": 0}
+        last_id = None
+        while True:
+            batch_query = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+            docs = await coll.find(batch_query, projection).sort("_id", 1).to_list(batch_size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            ops = []
+            for doc in docs:
+                stats["scanned"] += 1
+                changes = {}
+                for field in fields:
+                    value = doc.get(field)
+                    if not isinstance(value, str):
+                        continue
+                    parsed = parse_timestamp(value)
+                    if parsed is None:
+                        stats["skipped"] += 1
+                    elif field == "date":
+                        changes[field] = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+                    else:
+                        changes[field] = parsed
+                if changes:
+                    ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+            if ops:
+                result = await coll.bulk_write(ops, ordered=False)
+                stats["updated"] += result.modified_count
+        report[collection] = stats
+    return report
+
+# ==================== QUERY DIAGNOSTICS ====================
+
+# Canonical query shapes issued by the endpoints above. Sample values are taken
+# from the live data so the planner sees realistic selectivity.
+# (name, collection, kind, builder(samples) -> find/aggregate spec, suggested index)
+QUERY_SHAPES = [
+    ("login_user_by_email", "users", "find", lambda s: {"filter": {"email": s["email"]}}, "email"),
+    ("auth_user_by_id", "users", "find", lambda s: {"filter": {"id": s["user_id"]}}, "id"),
+    ("workers_all", "workers", "find",
+     lambda s: {"filter": {}, "sort": {"created_at": -1}}, "created_at"),
+    ("workers_by_owner", "workers", "find",
+     lambda s: {"filter": {"owner_id": s["owner_id"]}, "sort": {"created_at": -1}}, "owner_id, created_at"),
+    ("workers_by_owner_category", "workers", "find",
+     lambda s: {"filter": {"owner_id": s["owner_id"], "category": s["category"]}, "sort": {"created_at": -1}},
+     "owner_id, category, created_at"),
+    ("workers_by_category", "workers", "find",
+     lambda s: {"filter": {"category": s["category"]}, "sort": {"created_at": -1}}, "category, created_at"),
+    ("workers_by_type", "workers", "find",
+     lambda s: {"filter": {"worker_type_id": s["worker_type_id"]}, "sort": {"created_at": -1}},
+     "worker_type_id, created_at"),
+    ("workers_by_tag", "workers", "find",
+     lambda s: {"filter": {"tag_ids": s["tag_id"]}, "sort": {"created_at": -1}}, "tag_ids, created_at"),
+    ("workers_search", "workers", "find",
+     lambda s: {"filter": {"$or": [{f: {"$regex": "kovacs", "$options": "i"}} for f in
+                                   ("name", "phone", "email", "address", "experience", "position")]},
+                "sort": {"created_at": -1}},
+     "text index (unanchored case-insensitive regex cannot use a B-tree index)"),
+    ("worker_by_id", "workers", "find", lambda s: {"filter": {"id": s["worker_id"]}}, "id"),
+    ("worker_project_statuses", "project_workers", "aggregate",
+     lambda s: {"pipeline": [{"$match": {"worker_id": {"$in": [s["worker_id"]]}}},
+                             {"$sort": {"updated_at": -1, "id": -1}},
+                             {"$group": {"_id": "$worker_id", "count": {"$sum": 1}}}]},
+     "worker_id, updated_at, id"),
+    ("worker_history", "project_workers", "find",
+     lambda s: {"filter": {"worker_id": s["worker_id"]}, "sort": {"updated_at": -1, "id": -1},
+                "limit": HISTORY_PAGE_SIZE + 1}, "worker_id, updated_at, id"),
+    ("projects_list", "projects", "find", lambda s: {"filter": {}, "sort": {"date": -1}}, "date"),
+    ("projects_calendar", "projects", "find",
+     lambda s: {"filter": {"date": {"$gte": s["month_start"], "$lt": s["month_end"]}}}, "date"),
+    ("projects_archive_calendar", "projects_archive", "find",
+     lambda s: {"filter": {"date": {"$gte": s["month_start"], "$lt": s["month_end"]}}}, "date"),
+    ("saved_search_open", "saved_search_members", "find",
+     lambda s: {"filter": {"search_id": ""}, "sort": {"worker_created_at": -1}, "limit": 1000},
+     "search_id, worker_created_at"),
+    ("availability_page", "workers", "find",
+     lambda s: {"filter": {"worker_type_id": s["worker_type_id"]}, "sort": {"created_at": -1, "id": -1},
+                "limit": 120}, "worker_type_id, created_at"),
+    ("availability_booked", "worker_bookings", "find",
+     lambda s: {"filter": {"worker_id": {"$in": [s["worker_id"]]}, "date": s["month_start"]},
+                "projection": {"_id": 0, "worker_id": 1}}, "worker_id, date"),
+    ("project_by_id", "projects", "find", lambda s: {"filter": {"id": s["project_id"]}}, "id"),
+    ("project_roster", "project_workers", "find",
+     lambda s: {"filter": {"project_id": s["project_id"]}}, "project_id"),
+    ("project_assignment", "project_workers", "find",
+     lambda s: {"filter": {"project_id": s["project_id"], "worker_id": s["worker_id"]}}, "project_id, worker_id"),
+    ("export_user_category", "workers", "find",
+     lambda s: {"filter": {"owner_id": s["owner_id"], "category": s["category"]}, "sort": {"name": 1}},
+     "owner_id, category, name"),
+    ("export_all_by_owner", "workers", "find",
+     lambda s: {"filter": {"owner_id": s["owner_id"]}, "sort": {"category": 1}}, "owner_id, category"),
+    ("user_stats", "recruiter_rollups", "find", lambda s: {"filter": {"day": ""}}, "day"),
+]
+
+async def _query_shape_samples() -> dict:
+    worker = await db.workers.find_one({}, {"_id": 0}) or {}
+    project = await db.projects.find_one({}, {"_id": 0}) or {}
+    user = await db.users.find_one({}, {"_id": 0, "password": 0}) or {}
+    month_start = utc_now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "email": user.get("email", ""),
+        "user_id": user.get("id", ""),
+        "owner_id": worker.get("owner_id", ""),
+        "category": worker.get("category", "Felvitt dolgozók"),
+        "worker_type_id": worker.get("worker_type_id", ""),
+        "tag_id": (worker.get("tag_ids") or [""])[0],
+        "worker_id": worker.get("id", ""),
+        "project_id": project.get("id", ""),
+        "month_start": month_start,
+        "month_end": (month_start + timedelta(days=32)).replace(day=1)
+    }
+
+def _plan_stages(plan: dict) -> list:
+    """Flatten a winningPlan tree into [(stage, indexName)] from root to leaves"""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop(0)
+        if not isinstance(node, dict):
+            continue
+        if "queryPlan" in node:
+            node = node["queryPlan"]
+        stages.append((node.get("stage", ""), node.get("indexName")))
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+    return stages
+
+def summarize_explain(explain: dict) -> dict:
+    """Index usage and docs examined vs returned from an executionStats explain"""
+    planner = explain.get("queryPlanner")
+    stats = explain.get("executionStats", {})
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor") if isinstance(stage, dict) else None
+        if cursor:
+            planner = planner or cursor.get("queryPlanner")
+            stats = stats or cursor.get("executionStats", {})
+    stages = _plan_stages((planner or {}).get("winningPlan", {}))
+    names = [name for name, _ in stages]
+    return {
+        "stages": names,
+        "indexes": sorted({index for _, index in stages if index}),
+        "collscan": "COLLSCAN" in names,
+        "uses_index": any(name in ("IXSCAN", "IDHACK", "COUNT_SCAN", "DISTINCT_SCAN") for name in names),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "n_returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis")
+    }
+
+async def explain_query_shapes() -> List[dict]:
+    samples = await _query_shape_samples()
+    report = []
+    for name, collection, kind, build, suggested_index in QUERY_SHAPES:
+        spec = build(samples)
+        if kind == "aggregate":
+            command = {"aggregate": collection, "pipeline": spec["pipeline"], "cursor": {}}
+        else:
+            command = {"find": collection, **spec}
+        entry = {"name": name, "collection": collection, "shape": _query_shape(spec)}
+        try:
+            explain = await db.command({"explain": command, "verbosity": "executionStats"})
+            entry.update(summarize_explain(explain))
+            if entry["collscan"]:
+                entry["suggested_index"] = suggested_index
+        except Exception as e:
+            entry["error"] = str(e) or type(e).__name__
+        report.append(entry)
+    return report
+
+@api_router.get("/diagnostics/queries")
+async def query_diagnostics(user: dict = Depends(require_admin)):
+    """Explain az összes jellemző lekérdezés-formára + legutóbbi lassú parancsok"""
+    return {
+        "shapes": await explain_query_shapes(),
+        "slow_commands": list(SLOW_COMMANDS),
+        "slow_command_ms": SLOW_COMMAND_MS
+    }
+
 # ==================== HEALTH ====================
 
 @api_router.get("/")
@@ -1210,24 +4376,133 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@api_router.get("/ready")
+async def ready():
+    """Readiness: a Mongo ping must succeed"""
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=2)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(e) or type(e).__name__})
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Érvénytelen token")
+    MONGO_POOL_MAX_SIZE.set(client.options.pool_options.max_pool_size)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ==================== APP CONFIG ====================
 
 app.include_router(api_router)
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """Latency/in-flight metrics plus per-request Mongo command count and time
+    as Server-Timing / X-DB-Queries headers"""
+    stats = RequestDbStats(request.url.path)
+    token = _request_db_stats.set(stats)
+    loaders_token = _request_loaders.set(RequestLoaders())
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        _request_db_stats.reset(token)
+        _request_loaders.reset(loaders_token)
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=request.method, route=route_path)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=status_code)
+        DB_COMMANDS_PER_REQUEST.observe(stats.commands, route=route_path)
+    
+    server_timing = f'db;dur={stats.total_ms:.1f};desc="{stats.commands} queries"'
+    if stats.slowest_command:
+        server_timing += f', db-slowest;dur={stats.slowest_ms:.1f};desc="{stats.slowest_command}"'
+    response.headers["Server-Timing"] = server_timing
+    response.headers["X-DB-Queries"] = str(stats.commands)
+    
+    if stats.commands > DB_QUERY_BUDGET or stats.total_ms > DB_TIME_BUDGET_MS:
+        logger.warning(
+            "DB budget exceeded: %s %s - %d queries, %.1f ms total, slowest %.1f ms (%s)",
+            request.method, request.url.path, stats.commands, stats.total_ms,
+            stats.slowest_ms, stats.slowest_command
+        )
+    return response
+
+def token_tenant(request: Request) -> Optional[str]:
+    """Tenant claim of a valid bearer (or SSE query) token; None when absent or invalid"""
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth.lower().startswith("bearer ") else request.query_params.get("token")
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM]).get("tenant")
+    except jwt.InvalidTokenError:
+        return None
+
+@app.middleware("http")
+async def route_tenant(request: Request, call_next):
+    """Resolve the tenant (token claim, then Host header) for the rest of the request"""
+    tenant = tenant_from_host(request.headers.get("host", ""))
+    claim = token_tenant(request)
+    if claim is not None:
+        if claim not in TENANTS or (tenant and claim != tenant):
+            return JSONResponse(status_code=401, content={"detail": "A token másik ügynökséghez tartozik"})
+        tenant = claim
+    tenant = tenant or DEFAULT_TENANT
+    token = _current_tenant.set(tenant)
+    try:
+        await ensure_tenant_ready(tenant)
+        async with change_scope():
+            return await call_next(request)
+    finally:
+        _current_tenant.reset(token)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Queries"],
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+@app.on_event("startup")
+async def start_event_bus():
+    await event_hub.bus.start()
+
+@app.on_event("startup")
+async def bootstrap_default_tenant():
+    # Other tenants are bootstrapped lazily by their first request
+    _ready_tenants.clear()
+    _tenant_locks.clear()
+    rollup_backfills.clear()
+    user_directories.clear()
+    worker_indexes.clear()
+    await ensure_tenant_ready(DEFAULT_TENANT)
+    if WORKER_INDEX_ENABLED:
+        worker_indexes[DEFAULT_TENANT] = WorkerIndex()
+        worker_indexes[DEFAULT_TENANT].start_build()
+
+@app.on_event("startup")
+async def start_user_directory():
+    app.state.user_directory_task = asyncio.create_task(_refresh_user_directory_forever())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    task = getattr(app.state, "user_directory_task", None)
+    if task:
+        task.cancel()
+    await event_hub.bus.stop()
+    await response_cache.close()
     client.close()
@@ -0,0 +1,252 @@
+"""
+Helpers for the in-process endpoint benchmarks (test_benchmarks.py).
+
+- seed_dataset: bulk-inserts a synthetic agency of a given size
+- CommandCounter: the server's DbCommandListener, also counting commands
+- monitored_database: fresh test database whose commands reach a listener,
+  registered on the driver for a mongod and emulated for mongomock, so query
+  budgets and the X-DB-Queries header work on both backends
+- percentile (loadtest.runner's) / summarize: latency statistics in milliseconds
+- ENFORCE_LATENCY / bench_size: wall-clock assertions and large datasets are
+  opt-in (BENCH_ENFORCE_LATENCY=1); query-count budgets always apply
+"""
+import inspect
+import itertools
+import os
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+
+from conftest import TEST_MONGO_URL, make_database
+from loadtest.runner import percentile
+from server import DbCommandListener
+
+ENFORCE_LATENCY = os.environ.get("BENCH_ENFORCE_LATENCY") == "1"
+
+
+def bench_size(env_name: str, full: int, quick: int) -> int:
+    """Dataset size for a scale test: the env override, else `full` when
+    latency is enforced and `quick` (enough to exercise the code) otherwise"""
+    return int(os.environ.get(env_name, full if ENFORCE_LATENCY else quick))
+
+
+CATEGORIES = ["Felvitt dolgozók", "Hideg jelentkező", "Űrlapon jelentkezett",
+              "Állásra jelentkezett", "Ingázó", "Szállásos"]
+
+# Motor collection method -> the command the driver sends for it
+COMMAND_METHODS = {
+    "find": "find", "find_one": "find", "aggregate": "aggregate", "count_documents": "aggregate",
+    "estimated_document_count": "count", "distinct": "distinct",
+    "insert_one": "insert", "insert_many": "insert", "update_one": "update", "update_many": "update",
+    "replace_one": "update", "delete_one": "delete", "delete_many": "delete",
+    "find_one_and_update": "findAndModify", "find_one_and_delete": "findAndModify",
+    "bulk_write": "update", "create_index": "createIndexes",
+}
+
+
+class CommandCounter(DbCommandListener):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+        self.by_collection = {}
+
+    def reset(self):
+        self.count = 0
+        self.by_collection = {}
+
+    def started(self, event):
+        super().started(event)
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "$cmd"
+        self.count += 1
+        self.by_collection[collection] = self.by_collection.get(collection, 0) + 1
+
+
+_request_ids = itertools.count(1)
+
+
+def _emit(listener, command_name: str, target, call):
+    """Run `call` between started/succeeded events, as the driver would"""
+    event = SimpleNamespace(request_id=next(_request_ids), connection_id=("mongomock", 0),
+                            command_name=command_name, command={command_name: target}, duration_micros=0)
+    listener.started(event)
+    started = time.perf_counter()
+
+    def finish():
+        event.duration_micros = int((time.perf_counter() - started) * 1e6)
+        listener.succeeded(event)
+
+    try:
+        result = call()
+    except Exception:
+        finish()
+        raise
+    if not inspect.isawaitable(result):
+        finish()
+        return result
+
+    async def awaited():
+        try:
+            return await result
+        finally:
+            finish()
+    return awaited()
+
+
+class MonitoredCollection:
+    def __init__(self, collection, listener):
+        self._collection = collection
+        self._listener = listener
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in COMMAND_METHODS:
+            return attr
+
+        def monitored(*args, **kwargs):
+            return _emit(self._listener, COMMAND_METHODS[name], self._collection.name, lambda: attr(*args, **kwargs))
+        return monitored
+
+
+class MonitoredDatabase:
+    def __init__(self, database, listener):
+        self._db = database
+        self._listener = listener
+
+    def __getitem__(self, name):
+        return MonitoredCollection(self._db[name], self._listener)
+
+    def get_collection(self, name, **options):
+        return MonitoredCollection(self._db.get_collection(name, **options), self._listener)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name == "command":
+            command = self._db.command
+
+            async def monitored(spec, *args, **kwargs):
+                command_name = spec if isinstance(spec, str) else next(iter(spec))
+                return await _emit(self._listener, command_name, 1, lambda: command(spec, *args, **kwargs))
+            return monitored
+        attr = getattr(self._db, name)
+        if hasattr(attr, "find_one"):
+            return MonitoredCollection(attr, self._listener)
+        return attr
+
+
+def monitored_database(listener: DbCommandListener):
+    if TEST_MONGO_URL:
+        return make_database(listener=listener)
+    return MonitoredDatabase(make_database(), listener)
+
+
+def _doc_id() -> str:
+    return str(uuid.uuid4())
+
+
+async def seed_dataset(db, size: int, password_hash: str) -> dict:
+    """Insert `size` workers plus proportional users, projects and assignments.
+
+    Returns the ids and credentials the benchmark needs.
+    """
+    now = datetime.now(timezone.utc)
+
+    admin = {"id": _doc_id(), "email": "admin@dolgozocrm.hu", "password": password_hash,
+             "name": "Admin", "role": "admin", "created_at": now}
+    recruiters = [
+        {"id": _doc_id(), "email": f"toborzo{i}@dolgozocrm.hu", "password": password_hash,
+         "name": f"Toborzó {i}", "role": "user", "created_at": now}
+        for i in range(3)
+    ]
+    await db.users.insert_many([admin] + recruiters)
+
+    types = [{"id": _doc_id(), "name": f"Típus {i}"} for i in range(6)]
+    await db.worker_types.insert_many(types)
+    await db.positions.insert_many([
+        {"id": _doc_id(), "name": f"Pozíció {t['name']} {j}", "worker_type_id": t["id"]}
+        for t in types for j in range(3)
+    ])
+    statuses = [{"id": _doc_id(), "name": n} for n in
+                ["Jelentkezett", "Megerősítve", "Dolgozik", "Megfelelt", "Nem felelt meg",
+                 "Lemondta", "Nem jelent meg"]]
+    await db.statuses.insert_many(statuses)
+    tags = [{"id": _doc_id(), "name": f"Jellemző {i}", "color": "#6366f1"} for i in range(5)]
+    await db.tags.insert_many(tags)
+
+    workers = []
+    for i in range(size):
+        owner = recruiters[i % len(recruiters)]
+        workers.append({
+            "id": _doc_id(),
+            "name": f"Dolgozó {i:06d}",
+            "phone": f"+3620{i:07d}",
+            "worker_type_id": types[i % len(types)]["id"],
+            "position": f"Pozíció {i % 7}",
+            "position_experience": "",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "address": f"Budapest {i % 23 + 1}. kerület",
+            "email": f"dolgozo{i}@example.hu",
+            "experience": "",
+            "notes": "",
+            "tag_ids": [tags[i % len(tags)]["id"], tags[(i + 2) % len(tags)]["id"]],
+            "owner_id": owner["id"],
+            "created_at": now - timedelta(minutes=i),
+        })
+    if workers:
+        await db.workers.insert_many(workers)
+
+    project_count = max(2, size // 10)
+    projects = []
+    for i in range(project_count):
+        projects.append({
+            "id": _doc_id(),
+            "name": f"Projekt {i}",
+            "date": (now + timedelta(days=i % 60)).replace(hour=0, minute=0, second=0, microsecond=0),
+            "location": "Győr",
+            "notes": "",
+            "expected_workers": 12,
+            "recruiter_ids": [recruiters[i % len(recruiters)]["id"]],
+            "is_closed": False,
+            "owner_id": admin["id"],
+            "created_at": now,
+        })
+    await db.projects.insert_many(projects)
+
+    assignments = []
+    for i, w in enumerate(workers):
+        ts = now - timedelta(minutes=i)
+        assignments.append({
+            "id": _doc_id(),
+            "project_id": projects[i % project_count]["id"],
+            "worker_id": w["id"],
+            "status_id": statuses[i % len(statuses)]["id"],
+            "added_by": w["owner_id"],
+            "created_at": ts,
+            "updated_at": ts,
+        })
+    if assignments:
+        await db.project_workers.insert_many(assignments)
+
+    return {
+        "admin": admin,
+        "recruiters": recruiters,
+        "project_ids": [p["id"] for p in projects],
+        "worker_ids": [w["id"] for w in workers],
+    }
+
+
+def summarize(samples_ms) -> dict:
+    return {
+        "p50": round(percentile(samples_ms, 50), 2),
+        "p95": round(percentile(samples_ms, 95), 2),
+        "p99": round(percentile(samples_ms, 99), 2),
+        "max": round(max(samples_ms), 2) if samples_ms else 0.0,
+    }
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return result, (time.perf_counter() - start) * 1000
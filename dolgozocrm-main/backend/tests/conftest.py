@@ -0,0 +1,68 @@
+"""
+In-process fixtures for the backend test suite.
+
+The FastAPI app is imported directly and its global ``db`` is swapped for either
+an in-memory mongomock-motor database (default) or a local mongod when
+``TEST_MONGO_URL`` is set. The remote-URL tests (test_rbac_features.py) do not
+use these fixtures.
+"""
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "dolgozocrm_test")
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "")
+
+
+@pytest.fixture(scope="session")
+def server_module():
+    import server
+    return server
+
+
+def make_database(name: str = None, listener=None):
+    """Fresh database on the configured backend (mongomock or local mongod)"""
+    name = name or f"dolgozocrm_test_{uuid.uuid4().hex[:8]}"
+    if TEST_MONGO_URL:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from server import DbCommandListener
+        return AsyncIOMotorClient(TEST_MONGO_URL, event_listeners=[listener or DbCommandListener()])[name]
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()[name]
+
+
+@pytest.fixture
+def app_client(server_module, tmp_path, monkeypatch):
+    """TestClient bound to an empty, seeded database"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server_module, "db", make_database())
+    monkeypatch.setattr(server_module, "EXPORTS_DIR", tmp_path)
+    with TestClient(server_module.app) as client:
+        client.post("/api/seed")
+        yield client
+
+
+def login_headers(client, email: str, password: str) -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+@pytest.fixture
+def admin_headers_local(app_client):
+    return login_headers(app_client, "admin@dolgozocrm.hu", "admin123")
+
+
+@pytest.fixture
+def recruiter_headers_local(app_client):
+    return login_headers(app_client, "toborzo@dolgozocrm.hu", "toborzo123")
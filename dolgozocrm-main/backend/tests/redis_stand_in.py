@@ -0,0 +1,71 @@
+"""
+A tiny Redis-protocol server for tests: just the commands the response cache
+uses (PING, SELECT, AUTH, HGET, HSET, EXPIRE, DEL), on its own thread and loop.
+"""
+import asyncio
+import threading
+
+
+class RedisStandIn:
+    def __init__(self):
+        self.hashes = {}
+        self.commands = []
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._serve, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        server.close()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    size = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(size + 2))[:-2])
+                writer.write(self._execute(args))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _execute(self, args) -> bytes:
+        command = args[0].decode().upper()
+        self.commands.append(command)
+        if command in ("PING", "SELECT", "AUTH"):
+            return b"+OK\r\n"
+        if command == "HGET":
+            value = self.hashes.get(args[1], {}).get(args[2])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "HSET":
+            fields = self.hashes.setdefault(args[1], {})
+            added = sum(1 for k in args[2::2] if k not in fields)
+            fields.update(zip(args[2::2], args[3::2]))
+            return b":%d\r\n" % added
+        if command == "EXPIRE":
+            return b":%d\r\n" % (args[1] in self.hashes)
+        if command == "DEL":
+            return b":%d\r\n" % sum(1 for key in args[1:] if self.hashes.pop(key, None) is not None)
+        return b"-ERR unknown command '%s'\r\n" % args[0]
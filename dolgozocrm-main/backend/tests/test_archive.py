@@ -0,0 +1,36 @@
+"""
+Archiving closed projects and reading them back with include_archived.
+"""
+
+
+def test_archive_moves_closed_projects(app_client, admin_headers_local, server_module):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Archív Anna", "phone": "+36201110000", "worker_type_id": types[0]["id"]}).json()
+    old = app_client.post("/api/projects", headers=h, json={"name": "Régi", "date": "2020-01-15"}).json()
+    still_open = app_client.post("/api/projects", headers=h, json={"name": "Nyitott", "date": "2020-01-16"}).json()
+    for project in (old, still_open):
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    app_client.put(f"/api/projects/{old['id']}", headers=h, json={"is_closed": True})
+
+    res = app_client.post("/api/projects/archive?older_than_days=30", headers=h)
+    assert res.status_code == 200, res.text
+    assert res.json() == {"projects": 1, "assignments": 1}
+
+    hot = [p["id"] for p in app_client.get("/api/projects", headers=h).json()]
+    assert old["id"] not in hot and still_open["id"] in hot
+    everything = {p["id"]: p for p in app_client.get("/api/projects?include_archived=true", headers=h).json()}
+    assert everything[old["id"]]["is_archived"] and everything[old["id"]]["worker_count"] == 1
+
+    detail = app_client.get(f"/api/projects/{old['id']}", headers=h).json()
+    assert detail["is_archived"] and [w["id"] for w in detail["workers"]] == [worker["id"]]
+
+    statuses = app_client.get(f"/api/workers/{worker['id']}", headers=h).json()["project_statuses"]
+    assert [ps["project_id"] for ps in statuses] == [still_open["id"]]
+    statuses = app_client.get(f"/api/workers/{worker['id']}?include_archived=true", headers=h).json()["project_statuses"]
+    assert [(ps["project_id"], ps["is_archived"]) for ps in statuses] == [
+        (still_open["id"], False), (old["id"], True)]
+
+    # Nothing left to move on a second run
+    assert app_client.post("/api/projects/archive?older_than_days=30", headers=h).json()["projects"] == 0
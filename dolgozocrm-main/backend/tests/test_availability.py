@@ -0,0 +1,181 @@
+"""
+Availability index: one booking per (worker, day), double-booking checks on
+single and bulk assignment and on project date changes, free-worker listing.
+"""
+
+
+def test_bookings_follow_assignments_and_dates(server_module, app_client, admin_headers_local,
+                                               recruiter_headers_local, monkeypatch):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    workers = [app_client.post("/api/workers", headers=h, json={
+        "name": f"Dolgozó {i}", "phone": f"+3620100{i:04d}", "worker_type_id": types[i % 2]["id"]}).json()
+        for i in range(5)]
+    mine = app_client.post("/api/workers", headers=r, json={
+        "name": "Saját Sára", "phone": "+36201230001", "worker_type_id": types[0]["id"]}).json()
+    morning = app_client.post("/api/projects", headers=h, json={"name": "Raktár", "date": "2026-11-02"}).json()
+    evening = app_client.post("/api/projects", headers=h, json={"name": "Rendezvény", "date": "2026-11-02"}).json()
+    later = app_client.post("/api/projects", headers=h, json={"name": "Leltár", "date": "2026-11-03"}).json()
+
+    def free(day, **params):
+        res = app_client.get("/api/availability", headers=h, params={"date": day, **params})
+        assert res.status_code == 200, res.text
+        return {w["id"] for w in res.json()}
+
+    every = {w["id"] for w in workers} | {mine["id"]}
+    assert free("2026-11-02") == every
+    assert app_client.post(f"/api/projects/{morning['id']}/workers", headers=h,
+                           json={"worker_id": workers[0]["id"]}).status_code == 200
+    clash = app_client.post(f"/api/projects/{evening['id']}/workers", headers=h, json={"worker_id": workers[0]["id"]})
+    assert clash.status_code == 409 and "Raktár" in clash.json()["detail"]
+    assert app_client.post(f"/api/projects/{later['id']}/workers", headers=h,
+                           json={"worker_id": workers[0]["id"]}).status_code == 200
+
+    bulk = app_client.post(f"/api/projects/{evening['id']}/workers/bulk", headers=h, json={
+        "worker_ids": [workers[0]["id"], workers[1]["id"], workers[2]["id"], workers[1]["id"], "nincs"]}).json()
+    assert bulk["added"] == [workers[1]["id"], workers[2]["id"]]
+    assert bulk["conflicts"] == [{"worker_id": workers[0]["id"], "project_id": morning["id"],
+                                  "project_name": "Raktár"}]
+    assert bulk["not_found"] == ["nincs"]
+    again = app_client.post(f"/api/projects/{evening['id']}/workers/bulk", headers=h,
+                            json={"worker_ids": [workers[1]["id"]]}).json()
+    assert again["already_assigned"] == [workers[1]["id"]] and again["added"] == []
+    roster = app_client.get(f"/api/projects/{evening['id']}", headers=h).json()["workers"]
+    assert {w["id"] for w in roster} == {workers[1]["id"], workers[2]["id"]}
+
+    booked = {workers[0]["id"], workers[1]["id"], workers[2]["id"]}
+    assert free("2026-11-02") == every - booked
+    assert free("2026-11-02", worker_type_id=types[0]["id"]) == {workers[4]["id"], mine["id"]}
+    assert free("2026-11-03") == every - {workers[0]["id"]}
+    # Pages of one worker each step over the booked ones, newest first
+    monkeypatch.setattr(server_module, "AVAILABILITY_PAGE_SLACK", 0)
+    newest_free = [w["id"] for w in reversed(workers + [mine]) if w["id"] not in booked]
+    assert [w["id"] for w in app_client.get("/api/availability", headers=h, params={
+        "date": "2026-11-02", "limit": 4}).json()] == newest_free
+    # Recruiters only see their own workers
+    mine_free = app_client.get("/api/availability", headers=r, params={"date": "2026-11-02"}).json()
+    assert [w["id"] for w in mine_free] == [mine["id"]]
+    assert app_client.get("/api/availability", headers=h, params={"date": "tegnap"}).status_code == 400
+
+    # Moving a project onto a day where its workers are busy is refused as a whole
+    app_client.post(f"/api/projects/{later['id']}/workers", headers=h, json={"worker_id": workers[1]["id"]})
+    moved = app_client.put(f"/api/projects/{evening['id']}", headers=h, json={"date": "2026-11-03"})
+    assert moved.status_code == 409
+    assert app_client.get(f"/api/projects/{evening['id']}", headers=h).json()["date"] == "2026-11-02"
+    app_client.delete(f"/api/projects/{morning['id']}/workers/{workers[0]['id']}", headers=h)
+    assert workers[0]["id"] in free("2026-11-02")
+    assert app_client.put(f"/api/projects/{evening['id']}", headers=h, json={"date": "2026-11-04"}).status_code == 200
+    assert free("2026-11-02") == every
+    assert free("2026-11-04") == every - {workers[1]["id"], workers[2]["id"]}
+
+    app_client.delete(f"/api/projects/{evening['id']}", headers=h)
+    app_client.delete(f"/api/workers/{workers[0]['id']}", headers=h)
+    assert free("2026-11-04") == every - {workers[0]["id"]}
+    bookings = app_client.portal.call(server_module.db.worker_bookings.distinct, "project_id")
+    assert bookings == [later["id"]]
+
+
+def test_rebuild_reports_existing_double_bookings(server_module, app_client, admin_headers_local):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Kettős Kata", "phone": "+36201230009", "worker_type_id": types[0]["id"]}).json()
+    first = app_client.post("/api/projects", headers=h, json={"name": "Első", "date": "2026-12-01"}).json()
+    second = app_client.post("/api/projects", headers=h, json={"name": "Második", "date": "2026-12-01"}).json()
+    app_client.post(f"/api/projects/{first['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    # Data from before the index existed: the second assignment was never checked
+    app_client.portal.call(server_module.db.project_workers.insert_one, {
+        "id": "regi", "project_id": second["id"], "worker_id": worker["id"], "status_id": ""})
+
+    report = app_client.portal.call(server_module.rebuild_worker_bookings)
+    assert report["bookings"] == 1
+    assert [(c["worker_id"], c["date"]) for c in report["conflicts"]] == [(worker["id"], "2026-12-01")]
+    assert app_client.get("/api/availability", headers=h, params={"date": "2026-12-01"}).json() == []
+
+
+def test_failed_assignment_releases_the_booking(server_module, app_client, admin_headers_local, monkeypatch):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Balszerencsés Béla", "phone": "+36201230010", "worker_type_id": types[0]["id"]}).json()
+    first = app_client.post("/api/projects", headers=h, json={"name": "Első", "date": "2026-12-02"}).json()
+    second = app_client.post("/api/projects", headers=h, json={"name": "Második", "date": "2026-12-02"}).json()
+
+    async def write_fails(*args, **kwargs):
+        raise RuntimeError("írás sikertelen")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server_module, "next_change_seq", write_fails)
+        for url, body in ((f"/api/projects/{first['id']}/workers", {"worker_id": worker["id"]}),
+                          (f"/api/projects/{first['id']}/workers/bulk", {"worker_ids": [worker["id"]]})):
+            try:
+                failed = app_client.post(url, headers=h, json=body).status_code
+            except RuntimeError:
+                failed = 500
+            assert failed == 500
+    assert app_client.portal.call(server_module.db.worker_bookings.count_documents, {}) == 0
+    assert app_client.post(f"/api/projects/{second['id']}/workers", headers=h,
+                           json={"worker_id": worker["id"]}).status_code == 200
+
+
+def test_date_change_racing_an_assignment(server_module, app_client, admin_headers_local, monkeypatch):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    workers = [app_client.post("/api/workers", headers=h, json={
+        "name": f"Versenyző {i}", "phone": f"+3620123002{i}", "worker_type_id": types[0]["id"]}).json()
+        for i in range(2)]
+    moving = app_client.post("/api/projects", headers=h, json={"name": "Költöző", "date": "2026-12-03"}).json()
+    other = app_client.post("/api/projects", headers=h, json={"name": "Másik", "date": "2026-12-04"}).json()
+    for worker in workers:
+        app_client.post(f"/api/projects/{moving['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    app_client.post(f"/api/projects/{other['id']}/workers", headers=h, json={"worker_id": workers[1]["id"]})
+
+    def booked_days():
+        bookings = app_client.portal.call(server_module.db.worker_bookings.find(
+            {"project_id": moving["id"]}, {"_id": 0}).to_list, None)
+        return {b["worker_id"]: server_module.to_date_str(b["date"]) for b in bookings}
+
+    async def no_conflicts(*args):
+        return []
+
+    # The clashing booking lands after the conflict check
+    with monkeypatch.context() as patch:
+        patch.setattr(server_module, "booking_conflicts", no_conflicts)
+        res = app_client.put(f"/api/projects/{moving['id']}", headers=h, json={"date": "2026-12-04"})
+    assert res.status_code == 409, res.text
+    assert app_client.get(f"/api/projects/{moving['id']}", headers=h).json()["date"] == "2026-12-03"
+    assert booked_days() == {w["id"]: "2026-12-03" for w in workers}
+
+    # The project write fails after the bookings moved
+    async def write_fails(*args, **kwargs):
+        raise RuntimeError("írás sikertelen")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server_module, "next_change_seq", write_fails)
+        try:
+            failed = app_client.put(f"/api/projects/{moving['id']}", headers=h, json={"date": "2026-12-05"}).status_code
+        except RuntimeError:
+            failed = 500
+    assert failed == 500
+    assert booked_days() == {w["id"]: "2026-12-03" for w in workers}
+
+
+def test_bulk_add_respects_recruiter_scope(server_module, app_client, admin_headers_local,
+                                           recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    theirs = app_client.post("/api/workers", headers=h, json={
+        "name": "Idegen Ilona", "phone": "+36201230030", "worker_type_id": types[0]["id"]}).json()
+    mine = app_client.post("/api/workers", headers=r, json={
+        "name": "Saját Samu", "phone": "+36201230031", "worker_type_id": types[0]["id"]}).json()
+    project = app_client.post("/api/projects", headers=h, json={"name": "Zárt", "date": "2026-12-06"}).json()
+    url = f"/api/projects/{project['id']}/workers/bulk"
+    body = {"worker_ids": [mine["id"], theirs["id"]]}
+
+    assert app_client.post(url, headers=r, json=body).status_code == 403
+    me = app_client.get("/api/auth/me", headers=r).json()
+    app_client.post(f"/api/projects/{project['id']}/recruiters", headers=h, json={"user_id": me["id"]})
+    res = app_client.post(url, headers=r, json=body).json()
+    assert res["added"] == [mine["id"]] and res["not_found"] == [theirs["id"]]
+    roster = app_client.get(f"/api/projects/{project['id']}", headers=h).json()["workers"]
+    assert [w["id"] for w in roster] == [mine["id"]]
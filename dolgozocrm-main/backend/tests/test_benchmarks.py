@@ -0,0 +1,170 @@
+"""
+In-process endpoint benchmarks with query-count budgets.
+
+Runs the FastAPI app against mongomock-motor (default) or a local mongod
+(TEST_MONGO_URL) at several dataset sizes, records latency percentiles and the
+number of DB commands per request (the X-DB-Queries header, counted by the
+server's DbCommandListener), and fails when:
+- a request issues more commands than bench_budgets.json allows,
+- p95 latency exceeds the scenario's fixed ceiling in bench_budgets.json, or
+- p95 latency regresses past a stored baseline * BENCH_LATENCY_TOLERANCE.
+The two latency checks only run with BENCH_ENFORCE_LATENCY=1 (wall-clock
+numbers depend on the machine); the query budgets always do.
+
+Environment:
+    BENCH_ENFORCE_LATENCY=1      assert the p95 ceilings and the baseline
+    BENCH_SIZES=20,100           dataset sizes (number of workers)
+    BENCH_ITERATIONS=5           timed requests per endpoint
+    BENCH_LATENCY_TOLERANCE=2.0  allowed p95 ratio against the baseline
+    BENCH_LATENCY_SLACK_MS=5     absolute slack added to the allowed p95
+    BENCH_BASELINE=path.json     baseline file (default: tests/bench_baseline.json)
+    BENCH_UPDATE_BASELINE=1      write the measured numbers as the new baseline
+    BENCH_REPORT=path.json       dump the full measurement report
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import TEST_MONGO_URL
+from bench_support import ENFORCE_LATENCY, monitored_database, seed_dataset, summarize, timed
+
+TESTS_DIR = Path(__file__).resolve().parent
+SIZES = [int(s) for s in os.environ.get("BENCH_SIZES", "20,100").split(",") if s.strip()]
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "5"))
+LATENCY_TOLERANCE = float(os.environ.get("BENCH_LATENCY_TOLERANCE", "2.0"))
+LATENCY_SLACK_MS = float(os.environ.get("BENCH_LATENCY_SLACK_MS", "5"))
+BASELINE_PATH = Path(os.environ.get("BENCH_BASELINE", TESTS_DIR / "bench_baseline.json"))
+UPDATE_BASELINE = os.environ.get("BENCH_UPDATE_BASELINE") == "1"
+REPORT_PATH = os.environ.get("BENCH_REPORT", "")
+BACKEND = "mongod" if TEST_MONGO_URL else "mongomock"
+BENCH_PASSWORD = "benchmark123"
+
+BUDGETS = json.loads((TESTS_DIR / "bench_budgets.json").read_text(encoding="utf-8"))
+BASELINE = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+REPORT = {}
+
+# name -> (method, path template, role, json body)
+SCENARIOS = {
+    "login": ("POST", "/api/auth/login", None, "login"),
+    "workers_admin": ("GET", "/api/workers", "admin", None),
+    "workers_recruiter": ("GET", "/api/workers", "recruiter", None),
+    "workers_search": ("GET", "/api/workers?search=Dolgozó 00001", "admin", None),
+    "workers_filtered": ("GET", "/api/workers?category=Ingázó&tag_id={tag_id}", "admin", None),
+    "projects_admin": ("GET", "/api/projects", "admin", None),
+    "projects_recruiter": ("GET", "/api/projects", "recruiter", None),
+    "project_detail": ("GET", "/api/projects/{project_id}", "admin", None),
+    "export_own": ("GET", "/api/export/workers", "recruiter", None),
+    "export_all": ("GET", "/api/export/all", "admin", None),
+}
+
+
+class BenchEnv:
+    def __init__(self, size, client, data, headers):
+        self.size = size
+        self.client = client
+        self.data = data
+        self.headers = headers
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda s: f"n{s}")
+def bench_env(request, server_module, tmp_path_factory):
+    size = request.param
+    database = monitored_database(server_module.DbCommandListener())
+    patch = pytest.MonkeyPatch()
+    patch.setattr(server_module, "db", database)
+    patch.setattr(server_module, "EXPORTS_DIR", tmp_path_factory.mktemp("exports"))
+    try:
+        with TestClient(server_module.app) as client:
+            password_hash = server_module.hash_password(BENCH_PASSWORD)
+            data = client.portal.call(seed_dataset, database, size, password_hash)
+            data["tag_id"] = client.portal.call(_first_tag_id, database)
+            headers = {}
+            for role, account in (("admin", data["admin"]), ("recruiter", data["recruiters"][0])):
+                res = client.post("/api/auth/login",
+                                  json={"email": account["email"], "password": BENCH_PASSWORD})
+                assert res.status_code == 200, res.text
+                headers[role] = {"Authorization": f"Bearer {res.json()['token']}"}
+            yield BenchEnv(size, client, data, headers)
+    finally:
+        patch.undo()
+        if TEST_MONGO_URL:
+            import pymongo
+            pymongo.MongoClient(TEST_MONGO_URL).drop_database(database.name)
+
+
+async def _first_tag_id(database):
+    tag = await database.tags.find_one({}, {"_id": 0})
+    return tag["id"]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_report():
+    yield
+    if REPORT_PATH:
+        Path(REPORT_PATH).write_text(json.dumps(REPORT, indent=2, ensure_ascii=False), encoding="utf-8")
+    if UPDATE_BASELINE and REPORT:
+        baseline = dict(BASELINE)
+        baseline.update({key: {"p50": r["latency_ms"]["p50"], "p95": r["latency_ms"]["p95"]}
+                         for key, r in REPORT.items()})
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def query_budget(scenario: str, size: int) -> int:
+    budget = BUDGETS["queries"][scenario]
+    return budget.get("fixed", 0) + int(budget.get("per_worker", 0) * size)
+
+
+def latency_ceiling(scenario: str) -> float:
+    return BUDGETS["p95_ms"][scenario][BACKEND]
+
+
+def _request(env: BenchEnv, scenario: str):
+    method, template, role, body = SCENARIOS[scenario]
+    path = template.format(project_id=env.data["project_ids"][0], tag_id=env.data["tag_id"])
+    if body == "login":
+        payload = {"email": env.data["recruiters"][0]["email"], "password": BENCH_PASSWORD}
+        return env.client.request(method, path, json=payload)
+    return env.client.request(method, path, headers=env.headers[role])
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_endpoint_budget(bench_env, scenario):
+    # Warm-up request: imports, lazy connections, first-touch caches
+    assert _request(bench_env, scenario).status_code == 200
+
+    latencies = []
+    query_counts = []
+    for _ in range(ITERATIONS):
+        response, elapsed_ms = timed(lambda: _request(bench_env, scenario))
+        assert response.status_code == 200, response.text
+        latencies.append(elapsed_ms)
+        query_counts.append(int(response.headers["X-DB-Queries"]))
+
+    key = f"{BACKEND}:{scenario}:n{bench_env.size}"
+    stats = summarize(latencies)
+    REPORT[key] = {"latency_ms": stats, "db_commands": max(query_counts)}
+    print(f"{key}: {stats} db_commands={max(query_counts)}")
+
+    budget = query_budget(scenario, bench_env.size)
+    assert max(query_counts) <= budget, (
+        f"{scenario} at n={bench_env.size} issued {max(query_counts)} DB commands "
+        f"(budget {budget})"
+    )
+
+    if not ENFORCE_LATENCY:
+        return
+    ceiling = latency_ceiling(scenario)
+    assert stats["p95"] <= ceiling, (
+        f"{scenario} at n={bench_env.size}: p95 {stats['p95']}ms exceeds the {ceiling}ms ceiling on {BACKEND}"
+    )
+
+    baseline = BASELINE.get(key)
+    if baseline and not UPDATE_BASELINE:
+        allowed = baseline["p95"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+        assert stats["p95"] <= allowed, (
+            f"{scenario} at n={bench_env.size}: p95 {stats['p95']}ms exceeds "
+            f"baseline {baseline['p95']}ms x {LATENCY_TOLERANCE}"
+        )
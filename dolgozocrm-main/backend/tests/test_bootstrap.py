@@ -0,0 +1,26 @@
+"""
+Combined /api/bootstrap endpoint with a bundle-wide ETag.
+"""
+
+
+def test_bootstrap_bundle_and_conditional_get(app_client, admin_headers_local, recruiter_headers_local):
+    response = app_client.get("/api/bootstrap", headers=admin_headers_local)
+    assert response.status_code == 200
+    bundle = response.json()
+    assert bundle["user"]["email"] == "admin@dolgozocrm.hu"
+    assert {"worker_types", "statuses", "tags", "users"} <= set(bundle)
+    assert all(t["positions"] for t in bundle["worker_types"])
+    etag = response.headers["ETag"]
+
+    cached = app_client.get("/api/bootstrap", headers={**admin_headers_local, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    app_client.post("/api/tags", headers=admin_headers_local, json={"name": "Új", "color": "#000000"})
+    changed = app_client.get("/api/bootstrap", headers={**admin_headers_local, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "Új" in [t["name"] for t in changed.json()["tags"]]
+
+    recruiter = app_client.get("/api/bootstrap", headers=recruiter_headers_local)
+    assert "users" not in recruiter.json()
+    assert recruiter.headers["ETag"] != changed.headers["ETag"]
@@ -0,0 +1,199 @@
+"""
+Candidate ranking for a project: feature scores from the worker index,
+availability on the project date, recruiter scope, and ranking speed (the
+ranking itself and the whole endpoint; timed with BENCH_ENFORCE_LATENCY=1).
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bench_support import ENFORCE_LATENCY, bench_size, percentile
+
+RANK_SIZE = bench_size("CANDIDATE_BENCH_SIZE", 500000, 5000)
+# The endpoint benchmark stores every worker in the test database. mongomock
+# scans a collection for every lookup, so the default size is small; with
+# TEST_MONGO_URL pointing at a mongod run it at CANDIDATE_BENCH_SIZE
+ENDPOINT_SIZE = bench_size("CANDIDATE_ENDPOINT_BENCH_SIZE", 2000, 200)
+ENDPOINT_P95_MS = float(os.environ.get("CANDIDATE_ENDPOINT_P95_MS", "300"))
+
+
+def test_candidates_ranked_by_fit_and_outcomes(server_module, app_client, admin_headers_local,
+                                                recruiter_headers_local):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    tags = app_client.get("/api/tags", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+
+    def new_worker(name, type_index, position="", headers=h):
+        return app_client.post("/api/workers", headers=headers, json={
+            "name": name, "phone": "+36201234567", "worker_type_id": types[type_index]["id"],
+            "position": position}).json()
+
+    reliable = new_worker("Megbízható Mária", 0, "Targoncás")
+    no_show = new_worker("Elmaradó Elemér", 0, "Targoncás")
+    other_type = new_worker("Másik Márton", 1, "Targoncás")
+    busy = new_worker("Foglalt Ferenc", 0, "Targoncás")
+    recruiters_own = new_worker("Saját Sándor", 1, headers=r)
+    for worker in (reliable, no_show, busy):
+        app_client.post(f"/api/workers/{worker['id']}/tags/{tags[0]['id']}", headers=h)
+
+    past = app_client.post("/api/projects", headers=h, json={"name": "Tavaszi", "date": "2026-04-01"}).json()
+    for worker, status in ((reliable, "Megfelelt"), (no_show, "Nem jelent meg")):
+        app_client.post(f"/api/projects/{past['id']}/workers", headers=h,
+                        json={"worker_id": worker["id"], "status_id": statuses[status]})
+    target = app_client.post("/api/projects", headers=h, json={"name": "Őszi", "date": "2026-10-01"}).json()
+    same_day = app_client.post("/api/projects", headers=h, json={"name": "Párhuzamos", "date": "2026-10-01"}).json()
+    app_client.post(f"/api/projects/{same_day['id']}/workers", headers=h, json={"worker_id": busy["id"]})
+
+    url = f"/api/projects/{target['id']}/candidates"
+    res = app_client.get(url, headers=h, params={
+        "worker_type_id": types[0]["id"], "position": "targonc", "tag_id": [tags[0]["id"]]})
+    assert res.status_code == 200, res.text
+    ranked = res.json()
+    ids = [c["id"] for c in ranked]
+    assert busy["id"] not in ids
+    assert ids[:3] == [reliable["id"], no_show["id"], other_type["id"]]
+    assert ranked[0]["score_breakdown"]["reliability"] > 0 > ranked[1]["score_breakdown"]["reliability"]
+    assert ranked[0]["score"] == pytest.approx(sum(ranked[0]["score_breakdown"].values()), abs=0.01)
+
+    # Workers already on the project are not suggested again
+    app_client.post(f"/api/projects/{target['id']}/workers", headers=h, json={"worker_id": reliable["id"]})
+    assert reliable["id"] not in [c["id"] for c in app_client.get(url, headers=h).json()]
+
+    # Recruiters only get their own workers, and only for projects they can open
+    assert app_client.get(url, headers=r).status_code == 403
+    me = app_client.get("/api/auth/me", headers=r).json()
+    app_client.post(f"/api/projects/{target['id']}/recruiters", headers=h, json={"user_id": me["id"]})
+    assert [c["id"] for c in app_client.get(url, headers=r).json()] == [recruiters_own["id"]]
+    assert app_client.get("/api/projects/nincs/candidates", headers=h).status_code == 404
+
+
+
+def test_archived_outcomes_still_count(server_module, app_client, admin_headers_local):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Bevált Berta", "phone": "+36201234568", "worker_type_id": types[0]["id"]}).json()
+    past = app_client.post("/api/projects", headers=h, json={"name": "Régi munka", "date": "2020-03-01"}).json()
+    app_client.post(f"/api/projects/{past['id']}/workers", headers=h,
+                    json={"worker_id": worker["id"], "status_id": statuses["Megfelelt"]})
+    app_client.put(f"/api/projects/{past['id']}", headers=h, json={"is_closed": True})
+    target = app_client.post("/api/projects", headers=h, json={"name": "Új munka", "date": "2026-11-01"}).json()
+    url = f"/api/projects/{target['id']}/candidates"
+
+    def reliability():
+        return {c["id"]: c["score_breakdown"]["reliability"]
+                for c in app_client.get(url, headers=h).json()}[worker["id"]]
+
+    before = reliability()
+    assert before > 0
+    assert app_client.post("/api/projects/archive?older_than_days=30", headers=h).json()["assignments"] == 1
+    # Caught up through the archive tombstone, and after a full rebuild
+    assert reliability() == before
+    index = server_module.worker_indexes[server_module.current_tenant()]
+    app_client.portal.call(index.load)
+    assert reliability() == before
+
+
+def test_ranking_at_scale(server_module):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    rng = random.Random(11)
+    index = server_module.WorkerIndex()
+    index.outcomes = {"ok": 1, "missed": -1}
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(RANK_SIZE):
+        index.upsert_worker({
+            "id": f"w{i}", "created_at": start + timedelta(minutes=i),
+            "worker_type_id": f"type{rng.randrange(12)}", "owner_id": f"user{rng.randrange(40)}",
+            "position": rng.choice(["Targoncás", "Raktáros", "Hegesztő", "Komissiózó", ""]),
+            "tag_ids": [f"tag{t}" for t in rng.sample(range(30), rng.randrange(4))],
+        })
+        if i % 4 == 0:
+            index.upsert_assignment({"id": f"a{i}", "worker_id": f"w{i}",
+                                     "status_id": rng.choice(["ok", "missed", "other"]),
+                                     "updated_at": start + timedelta(days=rng.randrange(900))})
+
+    criteria = {"worker_type_id": "type3", "position": "targonc", "tag_ids": ["tag1", "tag2"]}
+    busy = [f"w{i}" for i in range(0, RANK_SIZE, 97)]
+    index.rank(criteria, exclude=busy, limit=50)  # warm-up
+    started = time.perf_counter()
+    ids, scores, breakdown = index.rank(criteria, exclude=busy, limit=50)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert len(ids) == 50 and scores == sorted(scores, reverse=True)
+    assert not set(ids) & set(busy)
+    assert all(b["worker_type"] > 0 and b["position"] > 0 for b in breakdown[:10])
+    if ENFORCE_LATENCY:
+        assert elapsed_ms < 100, elapsed_ms
+
+
+def test_candidates_wait_for_the_background_build(server_module, app_client, admin_headers_local, monkeypatch):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    h = admin_headers_local
+    project = app_client.post("/api/projects", headers=h, json={"name": "Őszi", "date": "2026-10-01"}).json()
+    url = f"/api/projects/{project['id']}/candidates"
+    full_load = server_module.WorkerIndex.load
+
+    async def slow_load(index):
+        await asyncio.sleep(0.3)
+        await full_load(index)
+
+    monkeypatch.setattr(server_module.WorkerIndex, "load", slow_load)
+    monkeypatch.setattr(server_module, "WORKER_INDEX_WAIT_SECONDS", 0.01)
+    building = app_client.get(url, headers=h)
+    assert building.status_code == 503 and building.headers["Retry-After"]
+    # The build goes on without the request; later requests are served from it
+    monkeypatch.setattr(server_module, "WORKER_INDEX_WAIT_SECONDS", 2)
+    assert app_client.get(url, headers=h).status_code == 200
+
+
+def test_candidates_endpoint_at_scale(server_module, app_client, admin_headers_local):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    tags = app_client.get("/api/tags", headers=h).json()
+    template = app_client.post("/api/workers", headers=h, json={
+        "name": "Minta", "phone": "+36201234567", "worker_type_id": types[0]["id"]}).json()
+    template = app_client.portal.call(server_module.db.workers.find_one, {"id": template["id"]}, {"_id": 0})
+    rng = random.Random(13)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    workers = [{
+        **template, "id": f"w{i}", "name": f"Dolgozó {i:06d}",
+        "worker_type_id": types[rng.randrange(len(types))]["id"],
+        "position": rng.choice(["Targoncás", "Raktáros", "Hegesztő", ""]),
+        "tag_ids": [t["id"] for t in rng.sample(tags, rng.randrange(3))],
+        "created_at": start + timedelta(minutes=i),
+    } for i in range(ENDPOINT_SIZE)]
+    app_client.portal.call(server_module.db.workers.insert_many, workers)
+    project = app_client.post("/api/projects", headers=h, json={"name": "Őszi", "date": "2026-10-01"}).json()
+    url = f"/api/projects/{project['id']}/candidates"
+    params = {"worker_type_id": types[0]["id"], "position": "targonc", "tag_id": [tags[0]["id"]]}
+
+    for _ in range(50):  # first build of the index
+        res = app_client.get(url, headers=h, params=params)
+        if res.status_code != 503:
+            break
+        time.sleep(0.2)
+    assert res.status_code == 200, res.text
+    assert len(res.json()) == 50
+
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        res = app_client.get(url, headers=h, params=params)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200
+    if ENFORCE_LATENCY:
+        assert percentile(timings, 95) < ENDPOINT_P95_MS, timings
@@ -0,0 +1,112 @@
+"""
+Incremental change feed: sequence-stamped upserts, tombstones and RBAC scoping.
+"""
+
+
+def _changes(client, headers, token="", limit=None):
+    params = {"since": token, **({"limit": limit} if limit else {})}
+    res = client.get("/api/changes", headers=headers, params=params)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_feed_returns_deltas_since_token(app_client, admin_headers_local, recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    me = app_client.get("/api/auth/me", headers=r).json()
+    start = _changes(app_client, h)["next"]
+
+    mine = app_client.post("/api/workers", headers=r, json={
+        "name": "Saját Sára", "phone": "+36201230001", "worker_type_id": types[0]["id"]}).json()
+    other = app_client.post("/api/workers", headers=h, json={
+        "name": "Admin Ádám", "phone": "+36201230002", "worker_type_id": types[0]["id"]}).json()
+    project = app_client.post("/api/projects", headers=h, json={
+        "name": "Szinkron", "date": "2026-09-01", "recruiter_ids": [me["id"]]}).json()
+    for worker in (mine, other):
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+
+    admin_view = _changes(app_client, h, start)
+    assert {w["id"] for w in admin_view["workers"]} == {mine["id"], other["id"]}
+    assert [p["id"] for p in admin_view["projects"]] == [project["id"]]
+    assert len(admin_view["assignments"]) == 2 and not admin_view["has_more"]
+
+    recruiter_view = _changes(app_client, r, start)
+    assert [w["id"] for w in recruiter_view["workers"]] == [mine["id"]]
+    assert [a["worker_id"] for a in recruiter_view["assignments"]] == [mine["id"]]
+
+    # Nothing new since the last token
+    token = recruiter_view["next"]
+    assert _changes(app_client, r, token)["workers"] == []
+
+    app_client.delete(f"/api/workers/{mine['id']}", headers=h)
+    app_client.delete(f"/api/projects/{project['id']}/recruiters/{me['id']}", headers=h)
+    deltas = _changes(app_client, r, token)
+    assert {(d["kind"], d["id"]) for d in deltas["deleted"]} == {
+        ("worker", mine["id"]), ("project", project["id"]),
+        ("assignment", recruiter_view["assignments"][0]["id"])}
+
+
+def test_feed_pages_on_sequence_boundaries(app_client, admin_headers_local):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    start = _changes(app_client, h)["next"]
+    created = [app_client.post("/api/workers", headers=h, json={
+        "name": f"Lapozó {i}", "phone": f"+3620999000{i}", "worker_type_id": types[0]["id"]}).json()["id"]
+        for i in range(5)]
+
+    seen, token, pages = [], start, 0
+    while True:
+        page = _changes(app_client, h, token, limit=2)
+        seen += [w["id"] for w in page["workers"]]
+        token, pages = page["next"], pages + 1
+        if not page["has_more"]:
+            break
+    assert sorted(seen) == sorted(created) and pages >= 3
+
+    assert app_client.get("/api/changes?since=5-1", headers=h).status_code == 410
+    assert app_client.get("/api/changes?since=abc", headers=h).status_code == 400
+
+
+def test_feed_waits_for_writes_still_in_flight(server_module, app_client, admin_headers_local,
+                                               recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    start = _changes(app_client, h)["next"]
+
+    async def allocate_without_commit():
+        token = server_module._change_scope.set([])
+        try:
+            return await server_module.next_change_seq()
+        finally:
+            server_module._change_scope.reset(token)
+
+    # A slow writer holds a lower sequence while a later write commits first
+    slow_seq = app_client.portal.call(allocate_without_commit)
+    fast = app_client.post("/api/workers", headers=h, json={
+        "name": "Gyors Gábor", "phone": "+36201230003", "worker_type_id": types[0]["id"]}).json()
+    early = _changes(app_client, h, start)
+    assert early["workers"] == [] and int(early["next"].split("-")[0]) == slow_seq - 1
+
+    async def commit_slow_write():
+        await server_module.db.projects.insert_one({
+            "id": "lassu", "name": "Lassú", "date": server_module.parse_project_date("2026-09-01"),
+            "owner_id": "", "recruiter_ids": [], "change_seq": slow_seq})
+        await server_module.db.counters.update_one(
+            {"id": server_module.CHANGE_SEQUENCE}, {"$pull": {"inflight": {"seq": slow_seq}}})
+    app_client.portal.call(commit_slow_write)
+
+    late = _changes(app_client, h, early["next"])
+    assert [p["id"] for p in late["projects"]] == ["lassu"]
+    assert [w["id"] for w in late["workers"]] == [fast["id"]]
+
+    # Recruiter pages are filled with their own assignments only
+    mine = app_client.post("/api/workers", headers=r, json={
+        "name": "Saját Sára", "phone": "+36201230001", "worker_type_id": types[0]["id"]}).json()
+    others = [app_client.post("/api/workers", headers=h, json={
+        "name": f"Más {i}", "phone": f"+3620123010{i}", "worker_type_id": types[0]["id"]}).json() for i in range(3)]
+    before = _changes(app_client, r, late["next"])["next"]
+    for i, worker in enumerate(others + [mine]):
+        project = app_client.post("/api/projects", headers=h, json={"name": f"P{i}", "date": f"2026-10-0{i + 1}"}).json()
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    page = _changes(app_client, r, before, limit=1)
+    assert [a["worker_id"] for a in page["assignments"]] == [mine["id"]]
@@ -0,0 +1,72 @@
+"""
+Document versions and ETag / If-None-Match handling on polled GET endpoints.
+"""
+
+
+def _setup(client, headers):
+    types = client.get("/api/worker-types", headers=headers).json()
+    statuses = client.get("/api/statuses", headers=headers).json()
+    tags = client.get("/api/tags", headers=headers).json()
+    worker = client.post("/api/workers", headers=headers, json={
+        "name": "Teszt Elek", "phone": "+36201112233", "worker_type_id": types[0]["id"]}).json()
+    project = client.post("/api/projects", headers=headers, json={"name": "P1", "date": "2026-03-01"}).json()
+    return worker, project, statuses, tags
+
+
+def _revalidate(client, path, headers, etag):
+    return client.get(path, headers={**headers, "If-None-Match": etag})
+
+
+def test_worker_detail_versions_and_304(app_client, admin_headers_local):
+    worker, project, statuses, tags = _setup(app_client, admin_headers_local)
+    path = f"/api/workers/{worker['id']}"
+    assert worker["version"] == 1 and worker["updated_at"]
+
+    first = app_client.get(path, headers=admin_headers_local)
+    etag = first.headers["ETag"]
+    assert _revalidate(app_client, path, admin_headers_local, etag).status_code == 304
+
+    app_client.post(f"/api/workers/{worker['id']}/tags/{tags[0]['id']}", headers=admin_headers_local)
+    second = _revalidate(app_client, path, admin_headers_local, etag)
+    assert second.status_code == 200
+    assert second.json()["version"] == 2
+
+    # Assignment changes are part of the worker payload (project_statuses)
+    app_client.post(f"/api/projects/{project['id']}/workers", headers=admin_headers_local,
+                    json={"worker_id": worker["id"]})
+    third = _revalidate(app_client, path, admin_headers_local, second.headers["ETag"])
+    assert third.status_code == 200
+    assert third.json()["project_statuses"][0]["project_id"] == project["id"]
+
+    # Renaming the project changes the embedded project name
+    app_client.put(f"/api/projects/{project['id']}", headers=admin_headers_local, json={"name": "P2"})
+    assert _revalidate(app_client, path, admin_headers_local, third.headers["ETag"]).status_code == 200
+
+
+def test_list_and_project_detail_304(app_client, admin_headers_local, recruiter_headers_local):
+    worker, project, statuses, _ = _setup(app_client, admin_headers_local)
+
+    workers = app_client.get("/api/workers", headers=admin_headers_local)
+    assert _revalidate(app_client, "/api/workers", admin_headers_local, workers.headers["ETag"]).status_code == 304
+    # Same data, different caller: the ETag must differ
+    mine = app_client.get("/api/workers", headers=recruiter_headers_local)
+    assert mine.headers["ETag"] != workers.headers["ETag"]
+
+    detail_path = f"/api/projects/{project['id']}"
+    detail = app_client.get(detail_path, headers=admin_headers_local)
+    assert _revalidate(app_client, detail_path, admin_headers_local, detail.headers["ETag"]).status_code == 304
+    projects = app_client.get("/api/projects", headers=admin_headers_local)
+
+    app_client.post(detail_path + "/workers", headers=admin_headers_local,
+                    json={"worker_id": worker["id"], "status_id": statuses[0]["id"]})
+    app_client.put(f"{detail_path}/workers/{worker['id']}/status", headers=admin_headers_local,
+                   json={"status_id": statuses[1]["id"]})
+
+    changed = _revalidate(app_client, detail_path, admin_headers_local, detail.headers["ETag"])
+    assert changed.status_code == 200
+    assert changed.json()["workers"][0]["status_id"] == statuses[1]["id"]
+    assert changed.json()["version"] == 3
+    assert _revalidate(app_client, "/api/projects", admin_headers_local,
+                       projects.headers["ETag"]).json()[0]["worker_count"] == 1
+    assert _revalidate(app_client, "/api/workers", admin_headers_local,
+                       workers.headers["ETag"]).status_code == 200
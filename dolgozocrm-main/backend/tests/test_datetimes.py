@@ -0,0 +1,50 @@
+"""
+BSON datetime storage and the string-timestamp migration.
+"""
+from datetime import datetime
+
+
+def test_new_documents_store_datetimes(app_client, admin_headers_local, server_module):
+    res = app_client.post("/api/projects", headers=admin_headers_local,
+                          json={"name": "Dátum teszt", "date": "2026-03-02", "location": "Győr"})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["date"] == "2026-03-02"
+    assert body["created_at"].startswith(str(datetime.now().year))
+
+    stored = app_client.portal.call(server_module.db.projects.find_one, {"id": body["id"]})
+    assert isinstance(stored["date"], datetime)
+    assert isinstance(stored["created_at"], datetime)
+
+    bad = app_client.post("/api/projects", headers=admin_headers_local,
+                          json={"name": "Rossz dátum", "date": "jövő hét"})
+    assert bad.status_code == 400
+
+
+def test_migration_converts_legacy_strings(app_client, admin_headers_local, server_module):
+    db = server_module.db
+    legacy = {"id": "legacy-project", "name": "Régi projekt", "date": "2024-05-17", "location": "",
+              "notes": "", "expected_workers": 0, "recruiter_ids": [], "is_closed": False,
+              "owner_id": "", "created_at": "2024-05-01T08:30:00+00:00", "updated_at": "nem dátum"}
+    app_client.portal.call(db.projects.insert_one, legacy)
+
+    # Unmigrated documents still serialize as before
+    listed = {p["id"]: p for p in app_client.get("/api/projects", headers=admin_headers_local).json()}
+    assert listed["legacy-project"]["date"] == "2024-05-17"
+
+    report = app_client.portal.call(server_module.migrate_timestamps, 1)
+    assert report["projects"]["updated"] >= 1
+    assert report["projects"]["skipped"] == 1
+    assert report["users"]["updated"] == 0
+
+    stored = app_client.portal.call(db.projects.find_one, {"id": "legacy-project"})
+    assert isinstance(stored["date"], datetime) and isinstance(stored["created_at"], datetime)
+    assert stored["updated_at"] == "nem dátum"
+
+    listed = {p["id"]: p for p in app_client.get("/api/projects", headers=admin_headers_local).json()}
+    assert listed["legacy-project"]["date"] == "2024-05-17"
+    assert listed["legacy-project"]["created_at"].startswith("2024-05-01T08:30:00")
+
+    # Re-running only revisits the unparseable leftovers
+    again = app_client.portal.call(server_module.migrate_timestamps, 100)
+    assert again["projects"] == {"scanned": 1, "updated": 0, "skipped": 1}
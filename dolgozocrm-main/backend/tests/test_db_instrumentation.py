@@ -0,0 +1,63 @@
+"""
+Per-request DB command instrumentation (listener + middleware headers).
+"""
+import logging
+from types import SimpleNamespace
+
+
+def _event(request_id, name, collection=None, micros=0, **command):
+    return SimpleNamespace(request_id=request_id, connection_id=("localhost", 27017),
+                           command_name=name, command={name: collection, **command},
+                           duration_micros=micros)
+
+
+def test_listener_accumulates_only_inside_request_context(server_module):
+    listener = server_module.DbCommandListener()
+    # Outside a request nothing is recorded and nothing breaks
+    listener.started(_event(1, "find", "workers"))
+    listener.succeeded(_event(1, "find", micros=1000))
+
+    stats = server_module.RequestDbStats()
+    token = server_module._request_db_stats.set(stats)
+    try:
+        listener.started(_event(2, "find", "workers"))
+        listener.started(_event(3, "aggregate", "project_workers"))
+        listener.succeeded(_event(3, "aggregate", micros=9000))
+        listener.failed(_event(2, "find", micros=1500))
+    finally:
+        server_module._request_db_stats.reset(token)
+
+    assert stats.commands == 2
+    assert round(stats.total_ms, 1) == 10.5
+    assert stats.slowest_ms == 9.0
+    assert stats.slowest_command == "aggregate project_workers"
+
+
+def test_responses_carry_db_timing_headers(app_client):
+    response = app_client.get("/api/health")
+    assert response.headers["X-DB-Queries"].isdigit()
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_requests_over_budget_are_logged(app_client, server_module, monkeypatch, caplog):
+    monkeypatch.setattr(server_module, "DB_TIME_BUDGET_MS", -1.0)
+    with caplog.at_level(logging.WARNING, logger=server_module.logger.name):
+        app_client.get("/api/health")
+    assert any("DB budget exceeded" in r.getMessage() and "/api/health" in r.getMessage()
+               for r in caplog.records)
+
+
+def test_slow_commands_are_logged_with_their_shape(server_module, monkeypatch):
+    monkeypatch.setattr(server_module, "SLOW_COMMAND_MS", 5.0)
+    monkeypatch.setattr(server_module, "SLOW_COMMANDS", server_module.deque(maxlen=10))
+    listener = server_module.DbCommandListener()
+
+    listener.started(_event(1, "find", "workers", filter={"owner_id": "u1", "tag_ids": "t1"}))
+    listener.succeeded(_event(1, "find", micros=20000))
+    listener.started(_event(2, "find", "tags", filter={"id": "t1"}))
+    listener.succeeded(_event(2, "find", micros=1000))
+
+    assert len(server_module.SLOW_COMMANDS) == 1
+    entry = server_module.SLOW_COMMANDS[0]
+    assert entry["command"] == "find workers"
+    assert entry["shape"] == {"filter": {"owner_id": "?", "tag_ids": "?"}}
@@ -0,0 +1,81 @@
+"""
+Offline geocoding against the bundled gazetteer and the nearby-workers search.
+$geoNear needs a real mongod (TEST_MONGO_URL); mongomock does not implement it.
+"""
+import pytest
+
+from conftest import TEST_MONGO_URL
+
+
+@pytest.mark.parametrize("text, place", [
+    ("9024 Győr, Szent István út 5.", "Győr"),
+    ("gyor, kossuth u 1", "Győr"),
+    ("Budapest XI. ker., Irinyi József u. 4", "Budapest"),
+    ("1117 Irinyi József u. 4", "Budapest"),
+    ("Kecskeméti út 3, Szeged", "Szeged"),
+    ("Hajdúszoboszló", "Hajdúszoboszló"),
+    ("Ismeretlen utca 1", None),
+    # Streets named after other settlements
+    ("Eger utca 5, Pécs", "Pécs"),
+    ("Szeged utca 2, 7621 Pécs", "Pécs"),
+    ("Mohács utca 12 Pécs", "Pécs"),
+    # Names that differ only in accents, and a postcode shared by several villages
+    ("Kömlő, Fő út 1", "Kömlő"),
+    ("7300 Komlo, Pécsi út 1", "Komló"),
+    ("7678 Husztót, Petőfi u. 3", "Husztót"),
+])
+def test_gazetteer_lookup(server_module, text, place):
+    found = server_module.gazetteer().lookup(text)
+    assert (found[0] if found else None) == place
+
+
+def test_write_paths_store_points(server_module, app_client, admin_headers_local, recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    worker = app_client.post("/api/workers", headers=r, json={
+        "name": "Vidéki Vilma", "phone": "+36301112222", "worker_type_id": types[0]["id"],
+        "address": "6000 Kecskemét, Fő tér 1"}).json()
+    project = app_client.post("/api/projects", headers=h, json={
+        "name": "Nincs helyszín", "date": "2026-09-01", "location": "Telephely"}).json()
+
+    doc = app_client.portal.call(server_module.db.workers.find_one, {"id": worker["id"]})
+    assert doc["geo_place"] == "Kecskemét" and doc["geo"]["type"] == "Point"
+    app_client.put(f"/api/workers/{worker['id']}", headers=r, json={"address": "Szeged, Tisza Lajos krt. 2"})
+    doc = app_client.portal.call(server_module.db.workers.find_one, {"id": worker["id"]})
+    assert doc["geo_place"] == "Szeged"
+
+    url = f"/api/projects/{project['id']}/nearby-workers"
+    assert app_client.get(url, headers=h).status_code == 400
+    assert app_client.get(url, headers=r).status_code == 403
+    app_client.put(f"/api/projects/{project['id']}", headers=h, json={"location": "Szeged, Ipari park"})
+    located = app_client.portal.call(server_module.db.projects.find_one, {"id": project["id"]})
+    assert located["geo_place"] == "Szeged"
+
+
+@pytest.mark.skipif(not TEST_MONGO_URL, reason="$geoNear needs a real mongod (TEST_MONGO_URL)")
+def test_nearby_workers_by_distance(app_client, admin_headers_local, recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    me = app_client.get("/api/auth/me", headers=r).json()
+
+    def worker(headers, name, address, category="Ingázó"):
+        return app_client.post("/api/workers", headers=headers, json={
+            "name": name, "phone": "+36301112222", "worker_type_id": types[0]["id"],
+            "address": address, "category": category}).json()
+
+    local = worker(r, "Helyi", "Érd, Fő u. 1")                  # ~15 km
+    commuter = worker(r, "Ingázó", "Vác, Széchenyi u. 2")         # ~33 km
+    far = worker(r, "Messzi", "Debrecen, Piac u. 3")              # ~195 km
+    others = worker(h, "Adminé", "Budaörs, Szabadság út 4")       # ~8 km, not the recruiter's
+    worker(r, "Szállásos", "Szentendre", category="Szállásos")
+    project = app_client.post("/api/projects", headers=h, json={
+        "name": "Fővárosi raktár", "date": "2026-09-01", "location": "Budapest, Könyves Kálmán krt.",
+        "recruiter_ids": [me["id"]]}).json()
+    url = f"/api/projects/{project['id']}/nearby-workers"
+
+    nearby = app_client.get(url, headers=r, params={"radius_km": 40, "category": "Ingázó"}).json()
+    assert [w["id"] for w in nearby] == [local["id"], commuter["id"]]
+    assert nearby[0]["distance_km"] < nearby[1]["distance_km"] < 40
+    admin_view = app_client.get(url, headers=h, params={"radius_km": 40, "category": "Ingázó"}).json()
+    assert [w["id"] for w in admin_view][0] == others["id"]
+    assert far["id"] not in {w["id"] for w in admin_view}
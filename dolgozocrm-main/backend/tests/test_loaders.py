@@ -0,0 +1,57 @@
+"""
+Request-scoped batching loaders.
+"""
+import asyncio
+
+from bench_support import CommandCounter, monitored_database
+
+
+def test_concurrent_loads_collapse_into_one_query(server_module, monkeypatch):
+    counter = CommandCounter()
+    database = monitored_database(counter)
+    monkeypatch.setattr(server_module, "db", database)
+
+    async def scenario():
+        await database.tags.insert_many([{"id": "t1", "name": "A"}, {"id": "t2", "name": "B"}])
+        counter.reset()
+        loader = server_module.BatchLoader("tags")
+
+        first = await asyncio.gather(loader.load("t1"), loader.load("t2"), loader.load("t1"),
+                                     loader.load("missing"))
+        after_batch = counter.count
+        again = await loader.load_many(["t2", "t1"])
+        return first, after_batch, again
+
+    first, after_batch, again = asyncio.run(scenario())
+
+    assert [d and d["name"] for d in first] == ["A", "B", "A", None]
+    assert after_batch == 1
+    assert [d["name"] for d in again] == ["B", "A"]
+    assert counter.count == 1  # memoized: no second round trip
+
+
+def test_worker_list_matches_per_row_enrichment(app_client, admin_headers_local):
+    types = app_client.get("/api/worker-types", headers=admin_headers_local).json()
+    tags = app_client.get("/api/tags", headers=admin_headers_local).json()
+    statuses = app_client.get("/api/statuses", headers=admin_headers_local).json()
+    worker = app_client.post("/api/workers", headers=admin_headers_local, json={
+        "name": "Teszt Elek", "phone": "+36201112233", "worker_type_id": types[0]["id"],
+    }).json()
+    app_client.post(f"/api/workers/{worker['id']}/tags/{tags[0]['id']}", headers=admin_headers_local)
+    project = app_client.post("/api/projects", headers=admin_headers_local,
+                              json={"name": "P1", "date": "2026-03-01"}).json()
+    app_client.post(f"/api/projects/{project['id']}/workers", headers=admin_headers_local,
+                    json={"worker_id": worker["id"], "status_id": statuses[0]["id"]})
+
+    listed = app_client.get("/api/workers", headers=admin_headers_local).json()[0]
+    detail = app_client.get(f"/api/workers/{worker['id']}", headers=admin_headers_local).json()
+    assert listed == detail
+    assert listed["worker_type_name"] == types[0]["name"]
+    assert [t["id"] for t in listed["tags"]] == [tags[0]["id"]]
+    assert listed["project_statuses"][0]["status_name"] == statuses[0]["name"]
+    assert listed["owner_name"] == "Admin"
+
+    roster = app_client.get(f"/api/projects/{project['id']}", headers=admin_headers_local).json()
+    assert roster["worker_count"] == 1
+    assert roster["workers"][0]["worker_type_name"] == types[0]["name"]
+    assert roster["owner_name"] == "Admin"
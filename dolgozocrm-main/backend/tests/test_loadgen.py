@@ -0,0 +1,29 @@
+"""
+Smoke test for the load generator: a short run against the in-process app.
+"""
+import asyncio
+
+import httpx
+
+from conftest import make_database
+from loadtest.runner import format_report, run_load
+
+
+def test_load_run_reports_per_route_stats(server_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(server_module, "db", make_database())
+    monkeypatch.setattr(server_module, "EXPORTS_DIR", tmp_path)
+
+    async def _run():
+        transport = httpx.ASGITransport(app=server_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_load(client, recruiters=2, admins=1, duration=1.5, think_time=0.01, seed=7)
+
+    report = asyncio.run(_run())
+
+    assert report["requests"] > 0
+    assert report["error_rate"] == 0.0, report
+    assert "POST /api/auth/login" in report["routes"]
+    assert "GET /api/export/all" in report["routes"]
+    for route in report["routes"].values():
+        assert route["p50_ms"] <= route["p95_ms"] <= route["p99_ms"] <= route["max_ms"]
+    assert "Route" in format_report(report)
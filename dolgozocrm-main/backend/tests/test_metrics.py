@@ -0,0 +1,48 @@
+"""
+/metrics exposition and the Mongo readiness probe.
+"""
+
+
+def test_metrics_exposes_route_latency_and_bcrypt_time(app_client, admin_headers_local):
+    app_client.get("/api/workers", headers=admin_headers_local)
+    app_client.get("/api/export/all", headers=admin_headers_local)
+
+    response = app_client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/workers"}' in body
+    assert 'http_requests_total{method="GET",route="/api/workers",status="200"}' in body
+    assert "http_requests_in_flight" in body
+    assert 'export_duration_seconds_count{kind="all"}' in body
+    assert 'password_hash_seconds_count{operation="verify"}' in body
+    assert "mongo_pool_max_size" in body
+
+
+def test_metrics_token(app_client, server_module, monkeypatch):
+    monkeypatch.setattr(server_module, "METRICS_TOKEN", "s3cret")
+    assert app_client.get("/metrics").status_code == 401
+    assert app_client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_histogram_buckets_are_cumulative(server_module):
+    hist = server_module.MetricHistogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    hist.observe(0.05, route="/a")
+    hist.observe(0.5, route="/a")
+    samples = {(name, labels.get("le")): value for name, labels, value in hist.samples()}
+    assert samples[("t_seconds_bucket", "0.1")] == 1
+    assert samples[("t_seconds_bucket", "1.0")] == 2
+    assert samples[("t_seconds_bucket", "+Inf")] == 2
+    assert samples[("t_seconds_count", None)] == 2
+
+
+def test_readiness_pings_mongo(app_client, server_module, monkeypatch):
+    assert app_client.get("/api/ready").json() == {"status": "ready"}
+
+    class DownDatabase:
+        async def command(self, *args, **kwargs):
+            raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(server_module, "db", DownDatabase())
+    response = app_client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
@@ -0,0 +1,64 @@
+"""
+Per-day project calendar buckets.
+"""
+
+
+def _project(client, headers, name, date, expected, recruiter_ids=()):
+    res = client.post("/api/projects", headers=headers, json={
+        "name": name, "date": date, "expected_workers": expected, "recruiter_ids": list(recruiter_ids)})
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_calendar_buckets_and_rbac(app_client, admin_headers_local, recruiter_headers_local):
+    types = app_client.get("/api/worker-types", headers=admin_headers_local).json()
+    me = app_client.get("/api/auth/me", headers=recruiter_headers_local).json()
+    a = _project(app_client, admin_headers_local, "Reggel", "2026-03-02", 5, [me["id"]])
+    _project(app_client, admin_headers_local, "Délután", "2026-03-02", 3)
+    _project(app_client, admin_headers_local, "Később", "2026-03-20", 4)
+    _project(app_client, admin_headers_local, "Kívül", "2026-04-01", 9)
+    worker = app_client.post("/api/workers", headers=admin_headers_local, json={
+        "name": "Naptár Nándor", "phone": "+36201234567", "worker_type_id": types[0]["id"]}).json()
+    app_client.post(f"/api/projects/{a['id']}/workers", headers=admin_headers_local,
+                    json={"worker_id": worker["id"]})
+
+    res = app_client.get("/api/projects/calendar?from=2026-03-01&to=2026-03-31", headers=admin_headers_local)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["from"], body["to"]) == ("2026-03-01", "2026-03-31")
+    days = {d["date"]: d for d in body["days"]}
+    assert list(days) == ["2026-03-02", "2026-03-20"]
+    assert (days["2026-03-02"]["expected"], days["2026-03-02"]["assigned"]) == (8, 1)
+    assert {p["name"] for p in days["2026-03-02"]["projects"]} == {"Reggel", "Délután"}
+
+    own = app_client.get("/api/projects/calendar?from=2026-03-01&to=2026-03-31",
+                         headers=recruiter_headers_local).json()
+    assert [p["name"] for d in own["days"] for p in d["projects"]] == ["Reggel"]
+
+    etag = res.headers["ETag"]
+    again = app_client.get("/api/projects/calendar?from=2026-03-01&to=2026-03-31",
+                           headers={**admin_headers_local, "If-None-Match": etag})
+    assert again.status_code == 304
+
+    bad = app_client.get("/api/projects/calendar?from=2026-03-31&to=2026-03-01", headers=admin_headers_local)
+    assert bad.status_code == 400
+
+
+def test_calendar_includes_archived_projects(app_client, admin_headers_local, recruiter_headers_local):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    me = app_client.get("/api/auth/me", headers=recruiter_headers_local).json()
+    old = _project(app_client, h, "Régi", "2025-02-10", 6, [me["id"]])
+    _project(app_client, h, "Nyitott", "2025-02-10", 2)
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Archív Anna", "phone": "+36201234568", "worker_type_id": types[0]["id"]}).json()
+    app_client.post(f"/api/projects/{old['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    app_client.put(f"/api/projects/{old['id']}", headers=h, json={"is_closed": True})
+    assert app_client.post("/api/projects/archive?older_than_days=30", headers=h).json()["projects"] == 1
+
+    url = "/api/projects/calendar?from=2025-02-01&to=2025-02-28"
+    day, = app_client.get(url, headers=h).json()["days"]
+    assert (day["date"], day["expected"], day["assigned"]) == ("2025-02-10", 8, 1)
+    assert [(p["name"], p["archived"]) for p in day["projects"]] == [("Nyitott", False), ("Régi", True)]
+    own = app_client.get(url, headers=recruiter_headers_local).json()
+    assert [p["name"] for d in own["days"] for p in d["projects"]] == ["Régi"]
@@ -0,0 +1,57 @@
+"""
+Live project events: hub fan-out from the roster endpoints and per-user filtering.
+"""
+import json
+
+
+def test_roster_writes_publish_events(app_client, admin_headers_local, server_module):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = app_client.get("/api/statuses", headers=h).json()
+    project = app_client.post("/api/projects", headers=h, json={"name": "Élő", "date": "2026-08-01"}).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Élő Elemér", "phone": "+36207770000", "worker_type_id": types[0]["id"]}).json()
+
+    channel = server_module.project_channel(project["id"])
+    queue = server_module.event_hub.subscribe(channel)
+    try:
+        path = f"/api/projects/{project['id']}/workers"
+        app_client.post(path, headers=h, json={"worker_id": worker["id"]})
+        app_client.put(f"{path}/{worker['id']}/status", headers=h, json={"status_id": statuses[0]["id"]})
+        app_client.delete(f"{path}/{worker['id']}", headers=h)
+        events = [queue.get_nowait() for _ in range(3)]
+    finally:
+        server_module.event_hub.unsubscribe(channel, queue)
+
+    assert [e["type"] for e in events] == ["worker_added", "status_changed", "worker_removed"]
+    assert events[0]["worker"]["name"] == "Élő Elemér"
+    assert events[1]["status_name"] == statuses[0]["name"]
+
+
+def test_stream_filters_other_recruiters_workers(server_module, app_client):
+    hub = server_module.event_hub
+    recruiter = {"id": "r1", "role": "user"}
+
+    async def _read():
+        stream = server_module.project_event_stream(None, "project:x", recruiter)
+        assert (await stream.__anext__()).startswith("retry:")
+        pending = stream.__anext__()
+        await hub.publish("project:x", {"type": "worker_removed", "worker_id": "w0", "owner_id": "r2"})
+        await hub.publish("project:x", {"type": "worker_removed", "worker_id": "w1", "owner_id": "r1"})
+        frame = await pending
+        await stream.aclose()
+        return frame
+
+    frame = app_client.portal.call(_read)
+    event_line, data_line = frame.strip().split("\n")
+    assert event_line == "event: worker_removed"
+    assert json.loads(data_line[len("data: "):]) == {"type": "worker_removed", "worker_id": "w1"}
+
+
+def test_events_endpoint_checks_access(app_client, recruiter_headers_local, admin_headers_local):
+    assert app_client.get("/api/projects/nincs/events").status_code == 401
+    assert app_client.get("/api/projects/nincs/events", headers=admin_headers_local).status_code == 404
+    project = app_client.post("/api/projects", headers=admin_headers_local,
+                              json={"name": "Zárt", "date": "2026-08-02"}).json()
+    assert app_client.get(f"/api/projects/{project['id']}/events",
+                          headers=recruiter_headers_local).status_code == 403
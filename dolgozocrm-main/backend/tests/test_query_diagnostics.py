@@ -0,0 +1,47 @@
+"""
+Explain summaries for the canonical query shapes.
+"""
+
+FIND_EXPLAIN = {
+    "queryPlanner": {"winningPlan": {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "owner_id_1_created_at_-1"},
+    }},
+    "executionStats": {"nReturned": 12, "totalDocsExamined": 12, "totalKeysExamined": 12,
+                       "executionTimeMillis": 1},
+}
+
+AGGREGATE_EXPLAIN = {
+    "stages": [
+        {"$cursor": {
+            "queryPlanner": {"winningPlan": {"stage": "PROJECTION_SIMPLE",
+                                             "inputStage": {"stage": "COLLSCAN"}}},
+            "executionStats": {"nReturned": 500, "totalDocsExamined": 500, "totalKeysExamined": 0},
+        }},
+        {"$group": {"_id": "$owner_id"}},
+    ]
+}
+
+
+def test_summarize_index_scan(server_module):
+    summary = server_module.summarize_explain(FIND_EXPLAIN)
+    assert summary["stages"] == ["FETCH", "IXSCAN"]
+    assert summary["uses_index"] and not summary["collscan"]
+    assert summary["indexes"] == ["owner_id_1_created_at_-1"]
+    assert (summary["docs_examined"], summary["n_returned"]) == (12, 12)
+
+
+def test_summarize_aggregate_collscan(server_module):
+    summary = server_module.summarize_explain(AGGREGATE_EXPLAIN)
+    assert summary["collscan"] and not summary["uses_index"]
+    assert summary["docs_examined"] == 500
+
+
+def test_diagnostics_endpoint_is_admin_only(app_client, admin_headers_local, recruiter_headers_local, server_module):
+    assert app_client.get("/api/diagnostics/queries", headers=recruiter_headers_local).status_code == 403
+
+    response = app_client.get("/api/diagnostics/queries", headers=admin_headers_local)
+    assert response.status_code == 200
+    body = response.json()
+    assert [s["name"] for s in body["shapes"]] == [s[0] for s in server_module.QUERY_SHAPES]
+    assert "slow_commands" in body
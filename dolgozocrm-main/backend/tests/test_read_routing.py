@@ -0,0 +1,71 @@
+"""
+Read routing per query class. With TEST_MONGO_URL pointing at a local replica
+set (mongodb://localhost:27017/?replicaSet=rs0) the reporting reads really go
+through the secondary-preferred path; on mongomock only the wiring is checked.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import TEST_MONGO_URL, login_headers, make_database
+
+
+def test_read_preference_from_settings(server_module):
+    pref = server_module.build_read_preference("secondary", 120, "nodeType:ANALYTICS")
+    assert pref.mongos_mode == "secondary"
+    assert pref.max_staleness == 120
+    assert pref.tag_sets == [{"nodeType": "ANALYTICS"}, {}]
+    assert server_module.build_read_preference("primary").mongos_mode == "primary"
+    with pytest.raises(ValueError):
+        server_module.build_read_preference("secondry")
+
+
+def test_reports_use_reporting_preference(server_module, app_client, admin_headers_local, monkeypatch):
+    reporting = server_module.build_read_preference("secondaryPreferred", 90)
+    monkeypatch.setitem(server_module.READ_PREFERENCES, "reporting", reporting)
+    assert server_module.reporting_collection("workers").read_preference == reporting
+    assert server_module.db.workers.read_preference != reporting
+
+    for path in ("/api/export/all", "/api/export/workers", "/api/users/stats",
+                 "/api/users/leaderboard", "/api/analytics/status-flow"):
+        assert app_client.get(path, headers=admin_headers_local).status_code == 200, path
+
+
+@pytest.mark.skipif("replicaSet=" not in TEST_MONGO_URL, reason="needs TEST_MONGO_URL with a replica set")
+def test_reporting_reads_hit_a_secondary(server_module, tmp_path, monkeypatch):
+    import pymongo
+
+    class ServerRecorder(server_module.DbCommandListener):
+        """(command, collection) -> the members that served it"""
+        def __init__(self):
+            super().__init__()
+            self.served = {}
+
+        def started(self, event):
+            super().started(event)
+            key = (event.command_name, event.command.get(event.command_name))
+            self.served.setdefault(key, set()).add("%s:%s" % event.connection_id)
+
+    primary = pymongo.MongoClient(TEST_MONGO_URL).admin.command("hello")["primary"]
+    recorder = ServerRecorder()
+    monkeypatch.setattr(server_module, "db", make_database(listener=recorder))
+    monkeypatch.setattr(server_module, "EXPORTS_DIR", tmp_path)
+    monkeypatch.setitem(server_module.READ_PREFERENCES, "reporting",
+                        server_module.build_read_preference("secondary", 90))
+    with TestClient(server_module.app) as client:
+        client.post("/api/seed")
+        h = login_headers(client, "admin@dolgozocrm.hu", "admin123")
+        types = client.get("/api/worker-types", headers=h).json()
+        worker = client.post("/api/workers", headers=h, json={
+            "name": "Másodlagos Mária", "phone": "+36201230020", "worker_type_id": types[0]["id"]}).json()
+
+        # Read-your-writes: the worker page right after an update comes from the primary
+        recorder.served.clear()
+        client.put(f"/api/workers/{worker['id']}", headers=h, json={"notes": "frissítve"})
+        assert client.get(f"/api/workers/{worker['id']}", headers=h).json()["notes"] == "frissítve"
+        assert recorder.served[("find", "workers")] == {primary}
+
+        recorder.served.clear()
+        assert client.get("/api/export/all", headers=h).status_code == 200
+        assert recorder.served[("find", "workers")] and primary not in recorder.served[("find", "workers")]
+        # The login check itself stays on the primary
+        assert primary in recorder.served[("find", "users")]
@@ -0,0 +1,90 @@
+"""
+Recruiter leaderboard rollups: maintained on the write paths and rebuildable.
+"""
+
+
+def _snapshot(client, headers):
+    board = client.get("/api/users/leaderboard", headers=headers).json()["recruiters"]
+    return {e["user_email"]: {k: e[k] for k in ("worker_count", "workers_added", "placements", "no_shows",
+                                                 "category_mix")} for e in board}
+
+
+def test_leaderboard_tracks_writes(app_client, admin_headers_local, recruiter_headers_local, server_module):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+    me = app_client.get("/api/auth/me", headers=r).json()
+    project = app_client.post("/api/projects", headers=h, json={
+        "name": "Ranglista", "date": "2026-07-01", "recruiter_ids": [me["id"]]}).json()
+
+    ids = []
+    for i, category in enumerate(["Ingázó", "Ingázó", "Szállásos"]):
+        ids.append(app_client.post("/api/workers", headers=r, json={
+            "name": f"Rangsor {i}", "phone": f"+3630111000{i}", "worker_type_id": types[0]["id"],
+            "category": category}).json()["id"])
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=r,
+                        json={"worker_id": ids[-1], "status_id": statuses["Megerősítve"]})
+    path = f"/api/projects/{project['id']}/workers"
+    app_client.put(f"{path}/{ids[0]}/status", headers=r, json={"status_id": statuses["Dolgozik"]})
+    # Dolgozik -> Megfelelt is the same placement
+    app_client.put(f"{path}/{ids[0]}/status", headers=r, json={"status_id": statuses["Megfelelt"]})
+    app_client.put(f"{path}/{ids[1]}/status", headers=r, json={"status_id": statuses["Nem jelent meg"]})
+    app_client.put(f"/api/workers/{ids[2]}", headers=r, json={"category": "Ingázó"})
+    app_client.delete(f"/api/workers/{ids[1]}", headers=h)
+
+    snapshot = _snapshot(app_client, h)
+    assert snapshot["toborzo@dolgozocrm.hu"] == {
+        "worker_count": 2, "workers_added": 3, "placements": 1, "no_shows": 1, "category_mix": {"Ingázó": 2}}
+    stats = app_client.get("/api/users/stats", headers=h).json()
+    assert [(s["user_email"], s["worker_count"]) for s in stats] == [("toborzo@dolgozocrm.hu", 2)]
+
+    # The deleted worker's no-show is not reconstructible; everything else is
+    app_client.portal.call(server_module.rebuild_recruiter_rollups)
+    rebuilt = _snapshot(app_client, h)["toborzo@dolgozocrm.hu"]
+    assert rebuilt == {**snapshot["toborzo@dolgozocrm.hu"], "workers_added": 2, "no_shows": 0}
+
+    weekly = app_client.get("/api/users/leaderboard?period=week", headers=h).json()
+    assert weekly["recruiters"][0]["series"][0]["period"].count("-W") == 1
+    assert app_client.get("/api/users/leaderboard", headers=r).status_code == 403
+
+
+def test_existing_workers_are_backfilled(app_client, admin_headers_local, recruiter_headers_local, server_module):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    for i in range(2):
+        app_client.post("/api/workers", headers=r, json={
+            "name": f"Régi {i}", "phone": f"+3630111100{i}", "worker_type_id": types[0]["id"]})
+
+    async def before_rollups():
+        # A database from before the rollups existed
+        await server_module.db.recruiter_rollups.delete_many({})
+        await server_module.db.counters.delete_one({"id": server_module.ROLLUPS_BUILT_COUNTER})
+    app_client.portal.call(before_rollups)
+
+    # Live counts until the rollups are built
+    stats = app_client.get("/api/users/stats", headers=h).json()
+    assert [(s["user_email"], s["worker_count"]) for s in stats] == [("toborzo@dolgozocrm.hu", 2)]
+
+    # Another process holds the backfill lease
+    async def lease_held():
+        await server_module.db.counters.insert_one({
+            "id": server_module.ROLLUPS_BUILT_COUNTER,
+            "lease_until": server_module.utc_now() + server_module.timedelta(minutes=5)})
+    app_client.portal.call(lease_held)
+    assert app_client.portal.call(server_module.backfill_recruiter_rollups) is False
+    assert app_client.portal.call(server_module.db.recruiter_rollups.count_documents, {}) == 0
+    app_client.portal.call(server_module.db.counters.update_one, {"id": server_module.ROLLUPS_BUILT_COUNTER},
+                           {"$set": {"lease_until": server_module.utc_now()}})
+
+    # The tenant's next first request (e.g. after a restart) starts the backfill
+    # in the background once the lease has expired
+    server_module._ready_tenants.clear()
+    app_client.get("/api/auth/me", headers=h)
+
+    async def backfilled():
+        return await server_module.rollup_backfills[server_module.DEFAULT_TENANT]
+    assert app_client.portal.call(backfilled) is True
+    assert _snapshot(app_client, h)["toborzo@dolgozocrm.hu"]["worker_count"] == 2
+    assert app_client.portal.call(server_module.db.recruiter_rollups.count_documents, {"day": ""}) == 1
+    # Built: nobody takes the lease again
+    assert app_client.portal.call(server_module.backfill_recruiter_rollups) is False
@@ -0,0 +1,79 @@
+"""
+Response cache: role/ownership-scoped entries, fingerprint validation,
+invalidation from writes and the shared Redis-protocol tier.
+"""
+import asyncio
+
+import pytest
+
+from redis_stand_in import RedisStandIn
+
+
+def test_project_page_cached_per_scope_and_invalidated_by_writes(
+        server_module, app_client, admin_headers_local, recruiter_headers_local, monkeypatch):
+    h, r = admin_headers_local, recruiter_headers_local
+    cache = server_module.LocalResponseCache(100)
+    monkeypatch.setattr(server_module, "response_cache", cache)
+    renders = []
+    load_recruiters = server_module.load_recruiters
+    async def counting_load_recruiters(ids):
+        renders.append(ids)
+        return await load_recruiters(ids)
+    monkeypatch.setattr(server_module, "load_recruiters", counting_load_recruiters)
+
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = app_client.get("/api/statuses", headers=h).json()
+    me = app_client.get("/api/auth/me", headers=r).json()
+    mine = app_client.post("/api/workers", headers=r, json={
+        "name": "Saját Sára", "phone": "+36201230001", "worker_type_id": types[0]["id"]}).json()
+    other = app_client.post("/api/workers", headers=h, json={
+        "name": "Admin Ádám", "phone": "+36201230002", "worker_type_id": types[0]["id"]}).json()
+    project = app_client.post("/api/projects", headers=h, json={
+        "name": "Rendezvény", "date": "2026-09-01", "recruiter_ids": [me["id"]]}).json()
+    for worker in (mine, other):
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+    url = f"/api/projects/{project['id']}"
+
+    first = app_client.get(url, headers=h).json()
+    assert app_client.get(url, headers=h).json() == first
+    assert len(renders) == 1
+
+    # Recruiters get their own entry with only their workers
+    assert [w["id"] for w in app_client.get(url, headers=r).json()["workers"]] == [mine["id"]]
+    entity = server_module.response_entity("project", project["id"])
+    assert cache.scopes[entity] == {"admin", f"recruiter:{me['id']}"}
+
+    app_client.put(f"{url}/workers/{other['id']}/status", headers=h, json={"status_id": statuses[0]["id"]})
+    assert entity not in cache.scopes
+    fresh = app_client.get(url, headers=h).json()
+    assert {w["id"]: w["status_id"] for w in fresh["workers"]}[other["id"]] == statuses[0]["id"]
+    assert len(renders) == 3
+
+
+@pytest.fixture
+def redis_stand_in():
+    stand_in = RedisStandIn().start()
+    yield stand_in
+    stand_in.stop()
+
+
+def test_shared_tier_serves_other_processes(server_module, redis_stand_in):
+    async def scenario():
+        first = server_module.RedisResponseCache(redis_stand_in.url, 10, 60)
+        second = server_module.RedisResponseCache(redis_stand_in.url, 10, 60)
+        await first.set("t:project:p1", "admin", "v1", {"name": "Rendezvény"})
+        assert await second.get("t:project:p1", "admin", "v1") == {"name": "Rendezvény"}
+        assert await second.get("t:project:p1", "admin", "v2") is None
+
+        await first.invalidate("t:project:p1")
+        third = server_module.RedisResponseCache(redis_stand_in.url, 10, 60)
+        assert await third.get("t:project:p1", "admin", "v1") is None
+        for cache in (first, second, third):
+            await cache.close()
+
+        # An unreachable shared tier is just a miss
+        offline = server_module.RedisResponseCache("redis://127.0.0.1:1/0", 10, 60)
+        assert await offline.get("t:project:p1", "admin", "v1") is None
+
+    asyncio.run(scenario())
+    assert {"HSET", "EXPIRE", "HGET", "DEL"} <= set(redis_stand_in.commands)
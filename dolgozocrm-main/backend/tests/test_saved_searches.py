@@ -0,0 +1,67 @@
+"""
+Saved searches: membership computed once, then kept current by the worker
+write paths; opening a list reads the membership rows.
+"""
+
+
+def _members(client, headers, search_id):
+    res = client.get(f"/api/saved-searches/{search_id}/workers", headers=headers)
+    assert res.status_code == 200, res.text
+    return {w["id"] for w in res.json()}
+
+
+def _count(client, headers, search_id):
+    return next(s["worker_count"] for s in client.get("/api/saved-searches", headers=headers).json()
+                if s["id"] == search_id)
+
+
+def test_membership_follows_worker_writes(app_client, admin_headers_local, recruiter_headers_local):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    tags = app_client.get("/api/tags", headers=h).json()
+    forklift, own_car = tags[0]["id"], tags[1]["id"]
+
+    def new_worker(headers, name, category="Ingázó", position="Targoncás"):
+        return app_client.post("/api/workers", headers=headers, json={
+            "name": name, "phone": "+36201234567", "worker_type_id": types[0]["id"],
+            "category": category, "position": position}).json()
+
+    first, second, third = (new_worker(r, f"Jelölt {i}") for i in range(3))
+    admins_worker = new_worker(h, "Admin jelöltje")
+    for worker in (first, second, admins_worker):
+        for tag in (forklift, own_car):
+            app_client.post(f"/api/workers/{worker['id']}/tags/{tag}", headers=h)
+
+    created = app_client.post("/api/saved-searches", headers=r, json={
+        "name": "Targoncás + Saját autó", "category": "Ingázó", "tag_ids": [forklift, own_car],
+        "position": "targonc"})
+    assert created.status_code == 200, created.text
+    search = created.json()
+    # Recruiters only ever match their own workers
+    assert search["worker_count"] == 2 and search["owner_id"]
+    assert _members(app_client, r, search["id"]) == {second["id"], first["id"]}
+
+    app_client.post(f"/api/workers/{third['id']}/tags/{forklift}", headers=r)
+    assert _count(app_client, r, search["id"]) == 2
+    app_client.post(f"/api/workers/{third['id']}/tags/{own_car}", headers=r)
+    assert _members(app_client, r, search["id"]) == {third["id"], second["id"], first["id"]}
+
+    app_client.put(f"/api/workers/{first['id']}", headers=r, json={"category": "Szállásos"})
+    app_client.delete(f"/api/workers/{second['id']}/tags/{own_car}", headers=r)
+    assert _members(app_client, r, search["id"]) == {third["id"]}
+    app_client.put(f"/api/workers/{first['id']}", headers=r, json={"category": "Ingázó"})
+    app_client.put(f"/api/workers/{third['id']}", headers=r, json={"position": "Hegesztő"})
+    assert _members(app_client, r, search["id"]) == {first["id"]}
+
+    new_worker(r, "Új jelölt")  # no tags yet
+    app_client.delete(f"/api/workers/{first['id']}", headers=h)
+    assert _members(app_client, r, search["id"]) == set()
+    assert _count(app_client, r, search["id"]) == 0
+
+    # Admin searches span every owner; other users' searches are private
+    everyone = app_client.post("/api/saved-searches", headers=h, json={
+        "name": "Mindenki", "tag_ids": [forklift]}).json()
+    assert _members(app_client, h, everyone["id"]) == {second["id"], third["id"], admins_worker["id"]}
+    assert app_client.get(f"/api/saved-searches/{everyone['id']}/workers", headers=r).status_code == 403
+    assert app_client.delete(f"/api/saved-searches/{search['id']}", headers=r).status_code == 200
+    assert app_client.get("/api/saved-searches", headers=r).json() == []
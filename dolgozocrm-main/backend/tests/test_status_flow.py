@@ -0,0 +1,67 @@
+"""
+Status-transition log and the time-in-stage / conversion rollups.
+"""
+
+
+def test_transitions_feed_rollups(app_client, admin_headers_local, recruiter_headers_local, server_module):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+    project = app_client.post("/api/projects", headers=h, json={"name": "Folyamat", "date": "2026-06-01"}).json()
+    path = f"/api/projects/{project['id']}/workers"
+    workers = []
+    for i in range(2):
+        worker = app_client.post("/api/workers", headers=h, json={
+            "name": f"Átmenet {i}", "phone": f"+3620555000{i}", "worker_type_id": types[0]["id"]}).json()
+        app_client.post(path, headers=h, json={"worker_id": worker["id"], "status_id": statuses["Jelentkezett"]})
+        workers.append(worker["id"])
+
+    app_client.put(f"{path}/{workers[0]}/status", headers=h, json={"status_id": statuses["Megerősítve"]})
+    app_client.put(f"{path}/{workers[1]}/status", headers=h, json={"status_id": statuses["Nem jelent meg"]})
+    # Notes-only update keeps the status: no transition
+    app_client.put(f"{path}/{workers[1]}/status", headers=h,
+                   json={"status_id": statuses["Nem jelent meg"], "notes": "Nem vette fel"})
+    app_client.delete(f"{path}/{workers[1]}", headers=h)
+
+    log = app_client.portal.call(lambda: server_module.db.status_transitions.count_documents({}))
+    assert log == 5
+
+    flow = app_client.get(f"/api/analytics/status-flow?project_id={project['id']}", headers=h).json()
+    stages = {s["status_name"]: s for s in flow["stages"]}
+    applied = stages["Jelentkezett"]
+    assert (applied["entered"], applied["exited"], applied["current"]) == (2, 2, 0)
+    assert applied["avg_days_in_stage"] is not None
+    assert {c["to_status_name"]: c["rate"] for c in applied["conversions"]} == {
+        "Megerősítve": 0.5, "Nem jelent meg": 0.5}
+    assert stages["Nem jelent meg"]["conversions"][0]["to_status_name"] == "Eltávolítva"
+    assert sum(d["entered"] for d in flow["daily"] if d["status_name"] == "Jelentkezett") == 2
+
+    overall = app_client.get("/api/analytics/status-flow", headers=h).json()
+    assert {s["status_name"]: s["entered"] for s in overall["stages"]}["Megerősítve"] == 1
+    assert app_client.get("/api/analytics/status-flow", headers=recruiter_headers_local).status_code == 403
+    assert app_client.get(f"/api/analytics/status-flow?project_id={project['id']}",
+                          headers=recruiter_headers_local).status_code == 403
+
+
+def test_status_since_moves_only_with_the_status(app_client, admin_headers_local, server_module):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+    project = app_client.post("/api/projects", headers=h, json={"name": "Szakasz", "date": "2026-06-02"}).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Szakasz Sára", "phone": "+36205550100", "worker_type_id": types[0]["id"]}).json()
+    path = f"/api/projects/{project['id']}/workers"
+    app_client.post(path, headers=h, json={"worker_id": worker["id"], "status_id": statuses["Jelentkezett"]})
+
+    def assignment():
+        return app_client.portal.call(server_module.db.project_workers.find_one,
+                                      {"worker_id": worker["id"]}, {"_id": 0})
+
+    app_client.put(f"{path}/{worker['id']}/status", headers=h, json={"status_id": statuses["Megerősítve"]})
+    changed = assignment()
+    assert changed["status_since"] == changed["updated_at"]
+    app_client.put(f"{path}/{worker['id']}/status", headers=h,
+                   json={"status_id": statuses["Megerősítve"], "notes": "$nem mezőnév"})
+    noted = assignment()
+    assert noted["notes"] == "$nem mezőnév" and noted["updated_at"] > changed["updated_at"]
+    assert noted["status_since"] == changed["status_since"]
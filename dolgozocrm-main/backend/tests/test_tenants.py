@@ -0,0 +1,54 @@
+"""
+Tenant routing: one shared client, one database per tenant, chosen by the
+Host header or the token's tenant claim.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def tenant_client(server_module, tmp_path, monkeypatch):
+    from mongomock_motor import AsyncMongoMockClient
+
+    shared = AsyncMongoMockClient()
+    monkeypatch.setattr(server_module, "TENANTS", {
+        server_module.DEFAULT_TENANT: "tenant_default", "acme": "tenant_acme"})
+    monkeypatch.setattr(server_module, "client", shared)
+    monkeypatch.setattr(server_module, "db", server_module.TenantDatabase(shared))
+    monkeypatch.setattr(server_module, "EXPORTS_DIR", tmp_path)
+    with TestClient(server_module.app) as client:
+        yield client, shared
+
+
+def _login(client, host):
+    res = client.post("/api/auth/login", headers={"Host": host},
+                      json={"email": "admin@dolgozocrm.hu", "password": "admin123"})
+    assert res.status_code == 200, res.text
+    return {"Authorization": f"Bearer {res.json()['token']}"}
+
+
+def test_requests_are_routed_to_the_tenant_database(tenant_client):
+    client, shared = tenant_client
+    acme_host = "acme.crm.example.hu"
+    for host in ("testserver", acme_host):
+        assert client.post("/api/seed", headers={"Host": host}).status_code == 200
+
+    default_h = _login(client, "testserver")
+    acme_h = _login(client, acme_host)
+    types = client.get("/api/worker-types", headers=acme_h).json()
+    created = client.post("/api/workers", headers=acme_h, json={
+        "name": "Acme Aladár", "phone": "+36201110000", "worker_type_id": types[0]["id"]})
+    assert created.status_code == 200, created.text
+
+    # The token carries the tenant, so the host is not needed afterwards
+    assert [w["name"] for w in client.get("/api/workers", headers=acme_h).json()] == ["Acme Aladár"]
+    assert client.get("/api/workers", headers=default_h).json() == []
+
+    # A token of one tenant is rejected on another tenant's host
+    assert client.get("/api/workers", headers={**default_h, "Host": acme_host}).status_code == 401
+
+    # Both databases live on the shared client; acme got its indexes on first use
+    acme, default = shared["tenant_acme"], shared["tenant_default"]
+    assert client.portal.call(acme.workers.count_documents, {}) == 1
+    assert client.portal.call(default.workers.count_documents, {}) == 0
+    assert len(client.portal.call(acme.workers.index_information)) > 1
@@ -0,0 +1,48 @@
+"""
+In-memory user directory for owner/recruiter name resolution.
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from bench_support import CommandCounter, monitored_database
+from conftest import login_headers, make_database
+
+
+def test_name_resolution_does_not_query_users(server_module, tmp_path, monkeypatch):
+    counter = CommandCounter()
+    monkeypatch.setattr(server_module, "db", monitored_database(counter))
+    monkeypatch.setattr(server_module, "EXPORTS_DIR", tmp_path)
+    with TestClient(server_module.app) as client:
+        client.post("/api/seed")
+        admin = login_headers(client, "admin@dolgozocrm.hu", "admin123")
+        types = client.get("/api/worker-types", headers=admin).json()
+        client.post("/api/workers", headers=admin, json={
+            "name": "Teszt Elek", "phone": "+36201112233", "worker_type_id": types[0]["id"]})
+
+        counter.reset()
+        workers = client.get("/api/workers", headers=admin).json()
+        assert workers[0]["owner_name"] == "Admin"
+        # Only get_current_user reads the users collection
+        assert counter.by_collection.get("users") == 1
+
+        client.put("/api/auth/profile", headers=admin, json={"name": "Fő Admin"})
+        assert client.get("/api/workers", headers=admin).json()[0]["owner_name"] == "Fő Admin"
+
+
+def test_other_process_picks_up_changes_via_counter(server_module, monkeypatch):
+    monkeypatch.setattr(server_module, "db", make_database())
+
+    async def scenario():
+        db = server_module.db
+        await db.users.insert_one({"id": "u1", "email": "a@x.hu", "name": "A", "role": "user"})
+        other = server_module.UserDirectory()
+        await other.reload()
+        assert not await other.refresh_if_changed()
+
+        await db.users.update_one({"id": "u1"}, {"$set": {"name": "B"}})
+        await server_module.bump_counter("users")
+        assert await other.refresh_if_changed()
+        return other.get("u1")
+
+    assert asyncio.run(scenario())["name"] == "B"
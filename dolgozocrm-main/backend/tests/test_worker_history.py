@@ -0,0 +1,60 @@
+"""
+Paged worker history and the short status preview on worker payloads.
+"""
+
+
+def test_history_pages_and_preview(app_client, admin_headers_local, recruiter_headers_local):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Előzmény Éva", "phone": "+36209990000", "worker_type_id": types[0]["id"]}).json()
+    project_ids = []
+    for i in range(7):
+        project = app_client.post("/api/projects", headers=h, json={"name": f"P{i}", "date": f"2026-05-{i + 1:02d}"}).json()
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h, json={"worker_id": worker["id"]})
+        project_ids.append(project["id"])
+
+    detail = app_client.get(f"/api/workers/{worker['id']}", headers=h).json()
+    assert detail["project_count"] == 7
+    assert len(detail["project_statuses"]) == 5
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = app_client.get(f"/api/workers/{worker['id']}/history", headers=h, params=params).json()
+        seen += [e["project_id"] for e in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert pages == 3 and len(seen) == 7 and set(seen) == set(project_ids)
+    assert page["items"][0]["status_name"] == "Hozzárendelve"
+
+    # Recruiters cannot read other recruiters' workers, and tokens are validated
+    assert app_client.get(f"/api/workers/{worker['id']}/history", headers=recruiter_headers_local).status_code == 404
+    assert app_client.get(f"/api/workers/{worker['id']}/history?cursor=nem-token", headers=h).status_code == 400
+
+
+def test_problem_count_covers_the_whole_history(app_client, admin_headers_local):
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    statuses = {s["name"]: s["id"] for s in app_client.get("/api/statuses", headers=h).json()}
+    worker = app_client.post("/api/workers", headers=h, json={
+        "name": "Problémás Péter", "phone": "+36209990001", "worker_type_id": types[0]["id"]}).json()
+    for i in range(25):
+        project = app_client.post("/api/projects", headers=h, json={"name": f"P{i}", "date": f"2025-03-{i + 1:02d}"}).json()
+        status = "Nem jelent meg" if i < 3 else "Megfelelt"
+        app_client.post(f"/api/projects/{project['id']}/workers", headers=h,
+                        json={"worker_id": worker["id"], "status_id": statuses[status]})
+        if i == 0:
+            app_client.put(f"/api/projects/{project['id']}", headers=h, json={"is_closed": True})
+    app_client.post("/api/projects/archive?older_than_days=30", headers=h)
+
+    url = f"/api/workers/{worker['id']}/history"
+    first = app_client.get(url, headers=h).json()
+    # The no-shows are past the first page, and one of them is archived
+    assert [e["status_name"] for e in first["items"]].count("Nem jelent meg") == 0
+    assert first["problem_count"] == 3
+    assert app_client.get(url, headers=h, params={"cursor": first["next_cursor"]}).json()["problem_count"] is None
+    rest = app_client.get(url, headers=h, params={"cursor": first["next_cursor"], "include_archived": True}).json()
+    assert [e["is_archived"] for e in rest["items"]] == [False] * 4 + [True]
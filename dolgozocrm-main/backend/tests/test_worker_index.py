@@ -0,0 +1,134 @@
+"""
+Columnar worker index: same answers as the Mongo path, facet counts, catching
+up with writes, and query speed at scale (timed with BENCH_ENFORCE_LATENCY=1).
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bench_support import ENFORCE_LATENCY, bench_size
+
+INDEX_SIZE = bench_size("WORKER_INDEX_BENCH_SIZE", 100000, 5000)
+
+
+def test_index_matches_mongo_and_follows_writes(server_module, app_client, admin_headers_local,
+                                                 recruiter_headers_local, monkeypatch):
+    h, r = admin_headers_local, recruiter_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    tags = app_client.get("/api/tags", headers=h).json()
+    statuses = app_client.get("/api/statuses", headers=h).json()
+    project = app_client.post("/api/projects", headers=h, json={"name": "Szezon", "date": "2026-09-01"}).json()
+
+    workers = []
+    for i in range(12):
+        headers = r if i % 3 == 0 else h
+        w = app_client.post("/api/workers", headers=headers, json={
+            "name": f"Dolgozó {i}", "phone": f"+3620100{i:04d}", "worker_type_id": types[i % 2]["id"],
+            "category": ["Ingázó", "Szállásos", "Felvitt dolgozók"][i % 3]}).json()
+        if i % 2:
+            app_client.post(f"/api/workers/{w['id']}/tags/{tags[0]['id']}", headers=h)
+        if i % 4 == 0:
+            app_client.post(f"/api/projects/{project['id']}/workers", headers=h,
+                            json={"worker_id": w["id"], "status_id": statuses[0]["id"]})
+        workers.append(w)
+
+    combos = [{}, {"category": "Ingázó"}, {"worker_type_id": types[1]["id"], "tag_id": tags[0]["id"]},
+              {"status_id": statuses[0]["id"]}, {"category": "Szállásos", "tag_id": tags[0]["id"]}]
+
+    def listing(headers, params):
+        return [w["id"] for w in app_client.get("/api/workers", headers=headers, params=params).json()]
+
+    expected = {(who, i): listing(hd, p) for who, hd in (("admin", h), ("recruiter", r)) for i, p in enumerate(combos)}
+    monkeypatch.setattr(server_module, "WORKER_INDEX_ENABLED", True)
+    for who, headers in (("admin", h), ("recruiter", r)):
+        for i, params in enumerate(combos):
+            assert listing(headers, params) == expected[(who, i)], (who, params)
+
+    facets = app_client.get("/api/workers/facets", headers=h, params={"category": "Ingázó"}).json()
+    assert facets["total"] == 4 and len(facets["ids"]) == 4
+    # A dimension's own filter does not narrow its own counts
+    assert facets["facets"]["category"] == {"Ingázó": 4, "Szállásos": 4, "Felvitt dolgozók": 4}
+    assert facets["facets"]["tag_id"] == {tags[0]["id"]: 2}
+    assert facets["facets"]["status_id"] == {statuses[0]["id"]: 1}
+    mine = app_client.get("/api/workers/facets", headers=r).json()
+    assert mine["total"] == 4 and list(mine["facets"]["owner_id"].values()) == [4]
+    assert sum(mine["facets"]["category"].values()) == 4
+
+    # Writes made through the API are visible on the next query
+    moved, tagged, assigned = workers[0], workers[1], workers[4]
+    app_client.put(f"/api/workers/{moved['id']}", headers=h, json={"category": "Szállásos"})
+    app_client.delete(f"/api/workers/{tagged['id']}/tags/{tags[0]['id']}", headers=h)
+    app_client.delete(f"/api/projects/{project['id']}/workers/{assigned['id']}", headers=h)
+    app_client.delete(f"/api/workers/{workers[2]['id']}", headers=h)
+    after = app_client.get("/api/workers/facets", headers=h).json()
+    assert after["total"] == 11
+    assert after["facets"]["category"] == {"Ingázó": 3, "Szállásos": 5, "Felvitt dolgozók": 3}
+    assert after["facets"]["tag_id"] == {tags[0]["id"]: 5}
+    assert after["facets"]["status_id"] == {statuses[0]["id"]: 2}
+
+
+def test_index_answers_at_scale(server_module):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    rng = random.Random(7)
+    index = server_module.WorkerIndex()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(INDEX_SIZE):
+        index.upsert_worker({
+            "id": f"w{i}", "created_at": start + timedelta(minutes=i),
+            "category": f"cat{rng.randrange(6)}", "worker_type_id": f"type{rng.randrange(12)}",
+            "owner_id": f"user{rng.randrange(40)}",
+            "tag_ids": [f"tag{t}" for t in rng.sample(range(30), rng.randrange(4))],
+        })
+        if i % 3 == 0:
+            index.upsert_assignment({"id": f"a{i}", "worker_id": f"w{i}", "status_id": f"status{rng.randrange(8)}"})
+
+    filters = {"category": "cat1", "tag_id": "tag3", "status_id": "status2"}
+    started = time.perf_counter()
+    total, ids = index.search(filters, limit=50)
+    facets = index.facets(filters)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert 0 < total < INDEX_SIZE and len(ids) == min(total, 50)
+    assert ids == sorted(ids, key=lambda i: -int(i[1:]))
+    assert sum(facets["category"].values()) >= total
+    if ENFORCE_LATENCY:
+        assert elapsed_ms < 250, elapsed_ms
+
+
+def test_refresh_waits_for_writes_still_in_flight(server_module, app_client, admin_headers_local):
+    if server_module.np is None:
+        pytest.skip("numpy is not installed")
+    h = admin_headers_local
+    types = app_client.get("/api/worker-types", headers=h).json()
+    index = server_module.WorkerIndex()
+    app_client.portal.call(index.load)
+
+    async def allocate_without_commit():
+        token = server_module._change_scope.set([])
+        try:
+            return await server_module.next_change_seq()
+        finally:
+            server_module._change_scope.reset(token)
+
+    # A slow writer holds a lower sequence while a later write commits first
+    slow_seq = app_client.portal.call(allocate_without_commit)
+    fast = app_client.post("/api/workers", headers=h, json={
+        "name": "Gyors Gábor", "phone": "+36201230003", "worker_type_id": types[0]["id"]}).json()
+    app_client.portal.call(index.refresh)
+    assert index.applied_seq == slow_seq - 1
+
+    async def commit_slow_write():
+        await server_module.db.workers.insert_one({
+            "id": "lassu", "name": "Lassú Lajos", "worker_type_id": types[1]["id"], "category": "Ingázó",
+            "owner_id": "", "tag_ids": [], "created_at": server_module.utc_now(), "change_seq": slow_seq})
+        await server_module.db.counters.update_one(
+            {"id": server_module.CHANGE_SEQUENCE}, {"$pull": {"inflight": {"seq": slow_seq}}})
+    app_client.portal.call(commit_slow_write)
+
+    app_client.portal.call(index.refresh)
+    total, ids = index.search({}, limit=10)
+    assert {"lassu", fast["id"]} <= set(ids)
+    assert index.search({"worker_type_id": types[1]["id"]}, limit=10)[1] == ["lassu"]
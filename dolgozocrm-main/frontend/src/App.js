@@ -27,6 +27,7 @@ export const useAuth = () => useContext(AuthContext);
 
 export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
+  const [reference, setReference] = useState(null);
   const [token, setToken] = useState(localStorage.getItem("token"));
   const [loading, setLoading] = useState(true);
 
@@ -39,10 +40,14 @@ export const AuthProvider = ({ children }) => {
     }
   }, [token]);
 
+  // Egyetlen kérés: felhasználó + törzsadatok (típusok pozíciókkal, státuszok, jellemzők, admin: felhasználók).
+  // A szerver ETag-et küld, így a böngésző meleg betöltéskor csak egy feltételes kérést indít.
   const fetchUser = async () => {
     try {
-      const res = await axios.get(`${API}/auth/me`);
-      setUser(res.data);
+      const res = await axios.get(`${API}/bootstrap`);
+      const { user: userData, ...referenceData } = res.data;
+      setUser(userData);
+      setReference(referenceData);
     } catch (e) {
       console.error("Auth error:", e);
       logout();
@@ -72,10 +77,11 @@ export const AuthProvider = ({ children }) => {
     delete axios.defaults.headers.common["Authorization"];
     setToken(null);
     setUser(null);
+    setReference(null);
   };
 
   return (
-    <AuthContext.Provider value={{ user, token, loading, login, logout, fetchUser }}>
+    <AuthContext.Provider value={{ user, reference, token, loading, login, logout, fetchUser }}>
       {children}
     </AuthContext.Provider>
   );
@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import axios from "axios";
-import { API } from "@/App";
+import { API, useAuth } from "@/App";
 import { toast } from "sonner";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -22,11 +22,12 @@ import {
 } from "lucide-react";
 
 export default function AdminPage() {
-  const [workerTypes, setWorkerTypes] = useState([]);
-  const [positions, setPositions] = useState([]);
-  const [statuses, setStatuses] = useState([]);
-  const [tags, setTags] = useState([]);
-  const [users, setUsers] = useState([]);
+  // Törzsadatok és felhasználók a bootstrap válaszból; módosítás után újratöltjük
+  const { reference, fetchUser } = useAuth();
+  const workerTypes = reference?.worker_types || [];
+  const statuses = reference?.statuses || [];
+  const tags = reference?.tags || [];
+  const users = reference?.users || [];
   const [userStats, setUserStats] = useState([]);
   
   const [newType, setNewType] = useState("");
@@ -38,24 +39,15 @@ export default function AdminPage() {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetchAllData();
+    fetchAllData(false);
   }, []);
 
-  const fetchAllData = async () => {
+  const fetchAllData = async (withReference = true) => {
     try {
-      const [typesRes, positionsRes, statusesRes, tagsRes, usersRes, statsRes] = await Promise.all([
-        axios.get(`${API}/worker-types`),
-        axios.get(`${API}/positions`),
-        axios.get(`${API}/statuses`),
-        axios.get(`${API}/tags`),
-        axios.get(`${API}/users`),
-        axios.get(`${API}/users/stats`)
+      const [statsRes] = await Promise.all([
+        axios.get(`${API}/users/stats`),
+        withReference ? fetchUser() : null
       ]);
-      setWorkerTypes(typesRes.data);
-      setPositions(positionsRes.data);
-      setStatuses(statusesRes.data);
-      setTags(tagsRes.data);
-      setUsers(usersRes.data);
       setUserStats(statsRes.data);
     } catch (e) {
       toast.error("Hiba az adatok betöltésekor");
@@ -184,10 +176,10 @@ export default function AdminPage() {
     }
   };
 
-  // Group positions by type
+  // A bootstrap típusonként adja a pozíciókat
   const positionsByType = workerTypes.map(type => ({
     ...type,
-    positions: positions.filter(p => p.worker_type_id === type.id)
+    positions: type.positions || []
   }));
 
   if (loading) {
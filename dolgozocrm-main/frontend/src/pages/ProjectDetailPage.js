@@ -43,11 +43,11 @@ const getStatusColor = (statusName) => {
 export default function ProjectDetailPage() {
   const { id } = useParams();
   const navigate = useNavigate();
-  const { user } = useAuth();
+  const { user, reference } = useAuth();
   const [project, setProject] = useState(null);
-  const [statuses, setStatuses] = useState([]);
+  const statuses = reference?.statuses || [];
+  const allUsers = (reference?.users || []).filter(u => u.role === "user");
   const [availableWorkers, setAvailableWorkers] = useState([]);
-  const [allUsers, setAllUsers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showAddWorker, setShowAddWorker] = useState(false);
   const [showAddRecruiter, setShowAddRecruiter] = useState(false);
@@ -62,24 +62,44 @@ export default function ProjectDetailPage() {
     fetchData();
   }, [id]);
 
+  // Élő frissítés: a névsor változásait a szerver küldi (SSE), nem kell újratölteni
+  useEffect(() => {
+    const token = localStorage.getItem("token");
+    if (!token) return;
+    const source = new EventSource(`${API}/projects/${id}/events?token=${encodeURIComponent(token)}`);
+    const patchWorkers = (update) => setProject(prev => {
+      if (!prev) return prev;
+      const workers = update(prev.workers);
+      return { ...prev, workers, worker_count: prev.worker_count + workers.length - prev.workers.length };
+    });
+    source.addEventListener("worker_added", (e) => {
+      const { worker } = JSON.parse(e.data);
+      patchWorkers(ws => ws.some(w => w.id === worker.id) ? ws : [...ws, worker]);
+      setAvailableWorkers(prev => prev.filter(w => w.id !== worker.id));
+    });
+    source.addEventListener("worker_removed", (e) => {
+      const { worker_id } = JSON.parse(e.data);
+      patchWorkers(ws => ws.filter(w => w.id !== worker_id));
+    });
+    source.addEventListener("status_changed", (e) => {
+      const { worker_id, status_id, status_name, notes } = JSON.parse(e.data);
+      patchWorkers(ws => ws.map(w => w.id === worker_id ? { ...w, status_id, status_name, notes } : w));
+    });
+    source.addEventListener("resync", () => fetchData());
+    return () => source.close();
+  }, [id]);
+
   const fetchData = async () => {
     try {
-      const [projectRes, statusesRes, workersRes] = await Promise.all([
+      const [projectRes, workersRes] = await Promise.all([
         axios.get(`${API}/projects/${id}`),
-        axios.get(`${API}/statuses`),
         axios.get(`${API}/workers`)
       ]);
       
       setProject(projectRes.data);
-      setStatuses(statusesRes.data);
       
       const projectWorkerIds = projectRes.data.workers.map(w => w.id);
       setAvailableWorkers(workersRes.data.filter(w => !projectWorkerIds.includes(w.id)));
-      
-      if (user?.role === "admin") {
-        const usersRes = await axios.get(`${API}/users`);
-        setAllUsers(usersRes.data.filter(u => u.role === "user"));
-      }
     } catch (e) {
       toast.error("Projekt nem található");
       navigate("/projects");
@@ -14,10 +14,11 @@ import { ArrowLeft, Save, Calendar, Users, X, Plus } from "lucide-react";
 export default function ProjectFormPage() {
   const { id } = useParams();
   const navigate = useNavigate();
-  const { user } = useAuth();
+  const { user, reference } = useAuth();
   const isEdit = !!id;
   
-  const [allUsers, setAllUsers] = useState([]);
+  // Csak toborzók (a felhasználólistát adminnak a bootstrap adja)
+  const allUsers = (reference?.users || []).filter(u => u.role === "user");
   const [loading, setLoading] = useState(false);
   const [formData, setFormData] = useState({
     name: "",
@@ -34,12 +35,6 @@ export default function ProjectFormPage() {
 
   const fetchInitialData = async () => {
     try {
-      // Get users if admin
-      if (user?.role === "admin") {
-        const usersRes = await axios.get(`${API}/users`);
-        setAllUsers(usersRes.data.filter(u => u.role === "user")); // Csak toborzók
-      }
-      
       if (isEdit) {
         const res = await axios.get(`${API}/projects/${id}`);
         setFormData({
@@ -7,6 +7,8 @@ import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
+import { Switch } from "@/components/ui/switch";
+import { Label } from "@/components/ui/label";
 import {
   ArrowLeft,
   Edit2,
@@ -50,24 +52,38 @@ const getStatusColor = (statusName) => {
 export default function WorkerDetailPage() {
   const { id } = useParams();
   const navigate = useNavigate();
-  const { user } = useAuth();
+  const { user, reference } = useAuth();
   const [worker, setWorker] = useState(null);
-  const [allTags, setAllTags] = useState([]);
+  const allTags = reference?.tags || [];
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState("info");
+  const [history, setHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [problemCount, setProblemCount] = useState(0);
+  const [includeArchived, setIncludeArchived] = useState(false);
 
   useEffect(() => {
     fetchData();
   }, [id]);
 
+  useEffect(() => {
+    if (!loading) fetchHistory();
+  }, [includeArchived]);
+
+  const applyHistory = (data) => {
+    setHistory(data.items);
+    setHistoryCursor(data.next_cursor);
+    setProblemCount(data.problem_count || 0);
+  };
+
   const fetchData = async () => {
     try {
-      const [workerRes, tagsRes] = await Promise.all([
+      const [workerRes, historyRes] = await Promise.all([
         axios.get(`${API}/workers/${id}`),
-        axios.get(`${API}/tags`)
+        axios.get(`${API}/workers/${id}/history`, { params: { include_archived: includeArchived } })
       ]);
       setWorker(workerRes.data);
-      setAllTags(tagsRes.data);
+      applyHistory(historyRes.data);
     } catch (e) {
       toast.error("Dolgozó nem található");
       navigate("/workers");
@@ -76,6 +92,27 @@ export default function WorkerDetailPage() {
     }
   };
 
+  const fetchHistory = async () => {
+    try {
+      const res = await axios.get(`${API}/workers/${id}/history`, { params: { include_archived: includeArchived } });
+      applyHistory(res.data);
+    } catch (e) {
+      toast.error("Hiba történt");
+    }
+  };
+
+  const loadMoreHistory = async () => {
+    try {
+      const res = await axios.get(`${API}/workers/${id}/history`, {
+        params: { cursor: historyCursor, include_archived: includeArchived }
+      });
+      setHistory(prev => [...prev, ...res.data.items]);
+      setHistoryCursor(res.data.next_cursor);
+    } catch (e) {
+      toast.error("Hiba történt");
+    }
+  };
+
   const handleDelete = async () => {
     if (!window.confirm("Biztosan törlöd ezt a dolgozót?")) return;
     try {
@@ -118,9 +155,6 @@ export default function WorkerDetailPage() {
   if (!worker) return null;
 
   const availableTags = allTags.filter(t => !worker.tags?.some(wt => wt.id === t.id));
-  const negativeStatuses = worker.project_statuses?.filter(ps => 
-    ["Nem jelent meg", "Nem felelt meg", "Lemondta"].includes(ps.status_name)
-  ) || [];
 
   return (
     <div className="max-w-4xl mx-auto space-y-6">
@@ -148,10 +182,10 @@ export default function WorkerDetailPage() {
             {worker.position && (
               <Badge variant="outline" className="bg-indigo-50">{worker.position}</Badge>
             )}
-            {negativeStatuses.length > 0 && (
+            {problemCount > 0 && (
               <Badge className="bg-red-100 text-red-700 border-red-200 gap-1">
                 <AlertCircle className="w-3 h-3" />
-                {negativeStatuses.length}x probléma
+                {problemCount}x probléma
               </Badge>
             )}
           </div>
@@ -189,9 +223,9 @@ export default function WorkerDetailPage() {
           <TabsTrigger value="history" className="gap-2" data-testid="history-tab">
             <History className="w-4 h-4" />
             Előzmények
-            {worker.project_statuses?.length > 0 && (
+            {worker.project_count > 0 && (
               <Badge variant="secondary" className="ml-1 h-5 w-5 p-0 justify-center">
-                {worker.project_statuses.length}
+                {worker.project_count}
               </Badge>
             )}
           </TabsTrigger>
@@ -341,7 +375,7 @@ export default function WorkerDetailPage() {
                   </div>
                   <div className="flex justify-between">
                     <span className="text-slate-500">Projektek</span>
-                    <span className="text-slate-800">{worker.project_statuses?.length || 0}</span>
+                    <span className="text-slate-800">{worker.project_count || 0}</span>
                   </div>
                 </div>
               </div>
@@ -354,12 +388,21 @@ export default function WorkerDetailPage() {
           <div className="bg-white rounded-xl border border-slate-200 p-6">
             <div className="flex items-center gap-2 mb-6">
               <History className="w-5 h-5 text-indigo-600" />
-              <h2 className="font-semibold text-slate-800">Projekt előzmények</h2>
+              <h2 className="font-semibold text-slate-800 flex-1">Projekt előzmények</h2>
+              <Switch
+                checked={includeArchived}
+                onCheckedChange={setIncludeArchived}
+                id="include-archived"
+                data-testid="history-archived-switch"
+              />
+              <Label htmlFor="include-archived" className="text-sm text-slate-600 cursor-pointer">
+                Archivált projektek is
+              </Label>
             </div>
             
-            {worker.project_statuses?.length > 0 ? (
+            {history.length > 0 ? (
               <div className="space-y-4">
-                {worker.project_statuses.map((ps, i) => (
+                {history.map((ps, i) => (
                   <div
                     key={`${ps.project_id}-${i}`}
                     className={`p-4 rounded-lg border ${getStatusColor(ps.status_name)}`}
@@ -377,6 +420,9 @@ export default function WorkerDetailPage() {
                           <Badge className={getStatusColor(ps.status_name)}>
                             {ps.status_name}
                           </Badge>
+                          {ps.is_archived && (
+                            <Badge variant="outline" className="text-slate-500">Archivált</Badge>
+                          )}
                         </div>
                         
                         <div className="flex items-center gap-3 mt-1 text-sm text-slate-500">
@@ -401,6 +447,11 @@ export default function WorkerDetailPage() {
                     </div>
                   </div>
                 ))}
+                {historyCursor && (
+                  <Button variant="outline" className="w-full" onClick={loadMoreHistory} data-testid="history-more-btn">
+                    Továbbiak betöltése
+                  </Button>
+                )}
               </div>
             ) : (
               <div className="text-center py-8">
@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import axios from "axios";
-import { API } from "@/App";
+import { API, useAuth } from "@/App";
 import { toast } from "sonner";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -25,7 +25,8 @@ export default function WorkerFormPage() {
   const navigate = useNavigate();
   const isEdit = !!id;
   
-  const [workerTypes, setWorkerTypes] = useState([]);
+  const { reference } = useAuth();
+  const workerTypes = reference?.worker_types || [];
   const [loading, setLoading] = useState(false);
   const [formData, setFormData] = useState({
     name: "",
@@ -46,9 +47,6 @@ export default function WorkerFormPage() {
 
   const fetchInitialData = async () => {
     try {
-      const typesRes = await axios.get(`${API}/worker-types`);
-      setWorkerTypes(typesRes.data);
-      
       if (isEdit) {
         const workerRes = await axios.get(`${API}/workers/${id}`);
         setFormData({
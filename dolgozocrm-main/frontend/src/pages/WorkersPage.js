@@ -42,13 +42,13 @@ const getCategoryLabel = (cat) => {
 };
 
 export default function WorkersPage() {
-  const { user } = useAuth();
+  const { user, reference } = useAuth();
   const navigate = useNavigate();
   const [workers, setWorkers] = useState([]);
-  const [workerTypes, setWorkerTypes] = useState([]);
-  const [tags, setTags] = useState([]);
+  const workerTypes = reference?.worker_types || [];
+  const tags = reference?.tags || [];
   const [projects, setProjects] = useState([]);
-  const [users, setUsers] = useState([]);
+  const users = reference?.users || [];
   const [loading, setLoading] = useState(true);
   
   // Filters
@@ -76,22 +76,13 @@ export default function WorkersPage() {
       if (tagFilter) params.append("tag_id", tagFilter);
       if (ownerFilter) params.append("owner_id", ownerFilter);
 
-      const [workersRes, typesRes, tagsRes, projectsRes] = await Promise.all([
+      const [workersRes, projectsRes] = await Promise.all([
         axios.get(`${API}/workers?${params}`),
-        axios.get(`${API}/worker-types`),
-        axios.get(`${API}/tags`),
         axios.get(`${API}/projects`),
       ]);
       
       setWorkers(workersRes.data);
-      setWorkerTypes(typesRes.data);
-      setTags(tagsRes.data);
       setProjects(projectsRes.data.filter(p => !p.is_closed));
-
-      if (user?.role === "admin") {
-        const usersRes = await axios.get(`${API}/users`);
-        setUsers(usersRes.data);
-      }
     } catch (e) {
       toast.error("Hiba az adatok betöltésekor");
     } finally {